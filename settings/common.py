@@ -79,6 +79,9 @@ DJMAIL_MAX_RETRY_NUMBER = 3
 DJMAIL_TEMPLATE_EXTENSION = "jinja"
 
 # Events backend
+# Other backends: "taiga.events.backends.unix_socket.EventsPushBackend" (with
+# EVENTS_PUSH_BACKEND_OPTIONS = {"path": "/tmp/taiga-events.sock"}) and, for
+# tests, "taiga.events.backends.memory.EventsPushBackend".
 EVENTS_PUSH_BACKEND = "taiga.events.backends.postgresql.EventsPushBackend"
 
 # Message System
@@ -121,6 +124,7 @@ MIDDLEWARE_CLASSES = [
     "taiga.base.middleware.cors.CoorsMiddleware",
     "taiga.domains.middleware.DomainsMiddleware",
     "taiga.events.middleware.SessionIDMiddleware",
+    "taiga.events.middleware.EventsBufferMiddleware",
 
     # Common middlewares
     "django.middleware.common.CommonMiddleware",
@@ -260,6 +264,52 @@ GRAPPELLI_INDEX_DASHBOARD = "taiga.dashboard.CustomIndexDashboard"
 
 MAX_SEARCH_RESULTS = 100
 
+# Threads used to run concurrently the searches of each type (with
+# their own database connections). With 0 they run on the request.
+SEARCH_EXECUTOR_WORKERS = 4
+
+# Seconds that the users authenticated with a token are kept in
+# the cache (None disables it). The changes of the users only remove
+# them from the cache of the process that makes them, so it needs a
+# default cache shared by all the processes (like memcached).
+AUTH_USER_CACHE_TIMEOUT = None
+
+# Increase the version to revoke all the issued auth tokens.
+AUTH_TOKEN_VERSION = 1
+
+# Seconds that an auth token is valid (None for no expiration).
+AUTH_TOKEN_MAX_AGE = None
+
+# Seconds that the permissions of a user on a project are kept in
+# the cache. With None they are only memoized for each request. The
+# changes of the memberships and roles only remove them from the cache
+# of the process that makes them, so it needs a default cache shared by
+# all the processes (like memcached).
+PROJECT_PERMISSIONS_CACHE_TIMEOUT = None
+
+# Seconds that the statuses, points, priorities, severities, types and
+# roles of a project are kept on the memory of each process (None
+# disables it). They are invalidated through the django cache when
+# they change, so it needs a default cache shared by all the processes
+# (like memcached).
+PROJECT_LOOKUPS_CACHE_TIMEOUT = None
+
+# Queue the notification emails on the outbox, to be sent by the
+# send_notifications command, instead of sending them on the request.
+NOTIFICATIONS_SEND_ASYNC = True
+
+# Number of notifications sent by the send_notifications command on
+# each batch and the email backend used (None for EMAIL_BACKEND). All
+# the emails of a batch are sent through the same connection.
+NOTIFICATIONS_BATCH_SIZE = 100
+NOTIFICATIONS_EMAIL_BACKEND = None
+
+# Seconds that the update notifications of an object are held on the
+# outbox to send, to each watcher, only one email with all the changes.
+# Only with NOTIFICATIONS_SEND_ASYNC (otherwise they are sent on the
+# request, one for each change).
+NOTIFICATIONS_DIGEST_WINDOW = 60
+
 # FIXME: this seems not be used by any module
 API_LIMIT_PER_PAGE = 0
 
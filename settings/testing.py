@@ -4,6 +4,12 @@ from .development import *
 SKIP_SOUTH_TESTS = True
 SOUTH_TESTS_MIGRATE = False
 
+NOTIFICATIONS_SEND_ASYNC = False
+
+# The data of the tests (on a transaction) isn't visible from the
+# connections of other threads.
+SEARCH_EXECUTOR_WORKERS = 0
+
 INSTALLED_APPS += [
     "taiga.projects.mixins.blocked.tests.foo",
 ]
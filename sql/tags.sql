@@ -1,12 +1,3 @@
-CREATE LANGUAGE plpythonu;
-
-CREATE OR REPLACE FUNCTION unpickle (data text)
-  RETURNS text[]
-AS $$
-    import base64
-    import pickle
-
-    return pickle.loads(base64.b64decode(data))
-$$ LANGUAGE plpythonu IMMUTABLE;
-
-CREATE INDEX issues_unpickle_tags_index ON issues_issue USING btree (unpickle(tags));
+CREATE INDEX issues_issue_tags_gin_index ON issues_issue USING gin (tags);
+CREATE INDEX userstories_userstory_tags_gin_index ON userstories_userstory USING gin (tags);
+CREATE INDEX projects_project_tags_gin_index ON projects_project USING gin (tags);
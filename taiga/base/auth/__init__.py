@@ -2,12 +2,17 @@
 
 import base64
 import re
+import time
 
+from django.conf import settings
 from django.core import signing
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
 from django.db.models import get_model
 from rest_framework.authentication import BaseAuthentication
 
 import taiga.base.exceptions as exc
+from taiga.base.utils.cache import get_shared_cache_timeout
 
 
 class Session(BaseAuthentication):
@@ -32,20 +37,91 @@ class Session(BaseAuthentication):
 
 
 def get_token_for_user(user):
-    data = {"user_id": user.id}
+    data = {
+        "user_id": user.id,
+        "iat": int(time.time()),
+        "v": getattr(settings, "AUTH_TOKEN_VERSION", 1),
+    }
     return signing.dumps(data)
 
 
+def _get_user_cache_key(user_id):
+    return "auth-user:{0}".format(user_id)
+
+
+def _get_user_cache_timeout():
+    return get_shared_cache_timeout("AUTH_USER_CACHE_TIMEOUT")
+
+
+def invalidate_cached_user(user_id):
+    if _get_user_cache_timeout() is not None:
+        cache.delete(_get_user_cache_key(user_id))
+
+
+def _get_cached_user_fields(model_cls):
+    # All the concrete fields but the password hash
+    return [field.attname for field in model_cls._meta.concrete_fields
+                if field.attname != "password"]
+
+
+def _get_user(user_id):
+    """
+    Get an user by id from the cache, if AUTH_USER_CACHE_TIMEOUT
+    is not None, or from the database.
+
+    The password hashes aren't kept on the cache: the users
+    loaded from it have an empty one, that is never saved.
+    """
+    model_cls = get_model("users", "User")
+    timeout = _get_user_cache_timeout()
+    cache_key = _get_user_cache_key(user_id)
+
+    values = cache.get(cache_key) if timeout is not None else None
+    if values is not None:
+        user = model_cls(**values)
+        user._state.adding = False
+        user._state.db = DEFAULT_DB_ALIAS
+        user._without_password = True
+        return user
+
+    user = model_cls.objects.get(pk=user_id)
+    if timeout is not None:
+        values = {attname: getattr(user, attname)
+                  for attname in _get_cached_user_fields(model_cls)}
+        cache.set(cache_key, values, timeout)
+    return user
+
+
+def _is_revoked(data):
+    """
+    Check, without touching the database, if a token payload has
+    been revoked changing AUTH_TOKEN_VERSION or has expired
+    (AUTH_TOKEN_MAX_AGE). Tokens without version or issued at
+    were created before them and belong to the first version.
+    """
+    if data.get("v", 1) < getattr(settings, "AUTH_TOKEN_VERSION", 1):
+        return True
+
+    max_age = getattr(settings, "AUTH_TOKEN_MAX_AGE", None)
+    if max_age is not None and "iat" in data:
+        return data["iat"] + max_age < time.time()
+
+    return False
+
+
 def get_user_for_token(token):
     try:
         data = signing.loads(token)
     except signing.BadSignature:
         raise exc.NotAuthenticated("Invalid token")
 
+    if _is_revoked(data):
+        raise exc.NotAuthenticated("Invalid token")
+
     model_cls = get_model("users", "User")
 
     try:
-        user = model_cls.objects.get(pk=data["user_id"])
+        user = _get_user(data["user_id"])
     except model_cls.DoesNotExist:
         raise exc.NotAuthenticated("Invalid token")
     else:
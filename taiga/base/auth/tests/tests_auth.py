@@ -2,11 +2,16 @@
 
 import uuid
 import json
+from unittest.mock import patch
 
 from django.core.urlresolvers import reverse
 from django.conf.urls import patterns, include, url
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
 from django import test
+from django.db import connection
 from django.db.models import get_model
+from django.test.utils import override_settings, CaptureQueriesContext
 
 from rest_framework.views import APIView
 from rest_framework import viewsets
@@ -51,6 +56,69 @@ class TokenAuthTests(test.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.content, b'"ok"')
 
+    # The local cache of the tests is only used by one process
+    @patch("taiga.base.utils.cache.LOCAL_CACHE_BACKENDS", ())
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60)
+    def test_token_auth_user_is_cached(self):
+        token = auth.get_token_for_user(self.user1)
+        auth.invalidate_cached_user(self.user1.id)
+
+        queries = []
+        for x in range(3):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(reverse("test-token-auth"),
+                                           HTTP_AUTHORIZATION="Bearer {}".format(token))
+            self.assertEqual(response.status_code, 200)
+            queries.append(len(context.captured_queries))
+
+        # Only the first request loads the user from the database.
+        self.assertEqual(queries, [queries[0], queries[0] - 1, queries[0] - 1])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(auth.get_user_for_token(token), self.user1)
+
+        self.user1.first_name = "Changed"
+        self.user1.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(auth.get_user_for_token(token).first_name, "Changed")
+
+    # The local cache of the tests is only used by one process
+    @patch("taiga.base.utils.cache.LOCAL_CACHE_BACKENDS", ())
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60)
+    def test_token_auth_cached_user_without_password(self):
+        token = auth.get_token_for_user(self.user1)
+        auth.invalidate_cached_user(self.user1.id)
+        auth.get_user_for_token(token)
+
+        self.assertNotIn("password", cache.get("auth-user:{0}".format(self.user1.id)))
+
+        user = auth.get_user_for_token(token)
+        user.first_name = "Changed"
+        user.save()
+
+        user = user.__class__.objects.get(id=self.user1.id)
+        self.assertEqual(user.first_name, "Changed")
+        self.assertTrue(user.check_password(self.user1.username))
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=60)
+    def test_token_auth_user_cache_needs_a_shared_cache(self):
+        token = auth.get_token_for_user(self.user1)
+        with self.assertRaises(ImproperlyConfigured):
+            auth.get_user_for_token(token)
+
+    def test_token_auth_revoked_tokens(self):
+        token = auth.get_token_for_user(self.user1)
+
+        with override_settings(AUTH_TOKEN_VERSION=2):
+            response = self.client.get(reverse("test-token-auth"),
+                                        HTTP_AUTHORIZATION="Bearer {}".format(token))
+            self.assertEqual(response.status_code, 401)
+
+        with override_settings(AUTH_TOKEN_MAX_AGE=-1):
+            response = self.client.get(reverse("test-token-auth"),
+                                        HTTP_AUTHORIZATION="Bearer {}".format(token))
+            self.assertEqual(response.status_code, 401)
+
 
 class RegisterTests(test.TestCase):
     fixtures = ["initial_domains.json",]
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from django.db import models
+
+from picklefield.fields import dbsafe_decode
+
+
+class TagsField(models.Field, metaclass=models.SubfieldBase):
+    """
+    List of tags stored on a native postgresql text array
+    column, so it can be filtered with the array operators
+    (&&, @>) and indexed with a GIN index.
+    """
+    description = "List of tags"
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("default", list)
+        kwargs.setdefault("blank", True)
+        super().__init__(*args, **kwargs)
+
+    def db_type(self, connection):
+        return "text[]"
+
+    def to_python(self, value):
+        if value is None:
+            return []
+
+        if isinstance(value, str):
+            return self._parse_string(value)
+
+        return list(value)
+
+    def _parse_string(self, value):
+        if not value:
+            return []
+
+        try:
+            tags = json.loads(value)
+        except ValueError:
+            # Historical versions (reversion) store the
+            # values of the old pickled tags fields.
+            try:
+                tags = dbsafe_decode(value)
+            except Exception:
+                tags = None
+
+        if isinstance(tags, (list, tuple)):
+            return list(tags)
+
+        return [tag.strip() for tag in value.split(",") if tag.strip()]
+
+    def get_prep_value(self, value):
+        return self.to_python(value)
+
+    def value_to_string(self, obj):
+        return json.dumps(self._get_val_from_obj(obj))
+
+
+try:
+    from south.modelsinspector import add_introspection_rules
+except ImportError:
+    pass
+else:
+    add_introspection_rules([], [r"^taiga\.base\.fields\.TagsField"])
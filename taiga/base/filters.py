@@ -79,7 +79,7 @@ class IsProjectMemberFilterBackend(FilterBackend):
 
 
 class TagsFilter(FilterBackend):
-    FILTER_TAGS_SQL = "unpickle({table}.tags) && %s"
+    FILTER_TAGS_SQL = "{table}.tags && %s::text[]"
 
     def __init__(self, filter_name='tags'):
         self.filter_name = filter_name
@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
-from django.db.models import Q
+from contextlib import closing
+
+from django.db import connections
+from django.db import models
+from django.db.models.fields import FieldDoesNotExist
+from django.dispatch import receiver
 
 # Patch api view for correctly return 401 responses on
 # request is authenticated instead of 403
@@ -8,6 +13,7 @@ monkey.patch_api_view()
 monkey.patch_serializer()
 monkey.patch_import_module()
 monkey.patch_south_hacks()
+monkey.patch_atomic()
 
 
 class NeighborsMixin:
@@ -15,6 +21,10 @@ class NeighborsMixin:
     def get_neighbors(self, queryset=None):
         """Get the objects around this object.
 
+        The ids of both neighbors are found with only one query, with the LAG
+        and LEAD window functions over the ordered queryset (and this object,
+        even if it doesn't match the queryset filters).
+
         :param queryset: A queryset object to use as a starting point. Useful if you need to
         pre-filter the neighbor candidates.
 
@@ -22,73 +32,141 @@ class NeighborsMixin:
         """
         if queryset is None:
             queryset = type(self).objects.get_queryset()
-        queryset = queryset.order_by(*self._get_order_by(queryset))
-        queryset = queryset.filter(~Q(id=self.id))
 
-        return self._get_previous_neighbor(queryset), self._get_next_neighbor(queryset)
+        previous_id, next_id = self._get_neighbor_ids(queryset)
+        ids = [id for id in (previous_id, next_id) if id is not None]
+        neighbors = queryset.model.objects.in_bulk(ids)
+        return neighbors.get(previous_id, None), neighbors.get(next_id, None)
 
     def _get_queryset_order_by(self, queryset):
         return queryset.query.order_by
 
     def _get_order_by(self, queryset):
-        return self._get_queryset_order_by(queryset) or self._meta.ordering
-
-    def _get_order_field_value(self, field):
-        field = field.lstrip("-")
-        obj = self
-        for attr in field.split("__"):
-            value = getattr(obj, attr, None)
-            if value is None:
-                break
-            obj = value
-
-        return value
-
-    def _transform_order_field_into_lookup(self, field, operator, operator_if_order_desc):
-        if field.startswith("-"):
-            field = field[1:]
-            operator = operator_if_order_desc
-        return field, operator
-
-    def _format(self, value):
-        if hasattr(value, "format"):
-            value = value.format(obj=self)
-        return value
-
-    def _or(self, conditions):
-        result = Q()
-        for condition in conditions:
-            result |= Q(**{key: self._format(condition[key]) for key in condition})
-        return result
-
-    def _get_neighbor_filters(self, queryset, operator, operator_if_order_desc):
-        conds = []
-        for field in self._get_queryset_order_by(queryset):
-            value = self._get_order_field_value(field)
-            if value is None:
-                continue
-            lookup_field, operator = self._transform_order_field_into_lookup(
-                field, operator, operator_if_order_desc)
-            lookup = "{}__{}".format(lookup_field, operator)
-            conds.append({lookup: value})
-        return conds
-
-    def _get_prev_neighbor_filters(self, queryset):
-        return self._get_neighbor_filters(queryset, "lte", "gte")
-
-    def _get_next_neighbor_filters(self, queryset):
-        return self._get_neighbor_filters(queryset, "gte", "lte")
-
-    def _get_previous_neighbor(self, queryset):
-        queryset = queryset.filter(self._or(self._get_prev_neighbor_filters(queryset)))
-        try:
-            return queryset.reverse()[0]
-        except IndexError:
-            return None
-
-    def _get_next_neighbor(self, queryset):
-        queryset = queryset.filter(self._or(self._get_next_neighbor_filters(queryset)))
-        try:
-            return queryset[0]
-        except IndexError:
-            return None
+        """
+        Get the ordering of the queryset (or the default one of the model)
+        with the default ordering and the primary key as tiebreakers, so
+        there is only one possible order.
+        """
+        ordering = list(self._get_queryset_order_by(queryset) or self._meta.ordering)
+        return ordering + list(self._meta.ordering) + [self._meta.pk.name]
+
+    def _expand_order_field(self, field, descending, seen=()):
+        """
+        Get the `(lookup, descending)` columns of an order field. The relations
+        are sorted by the ordering of the related model (as django does), and
+        the fields that aren't model fields (like "?") are ignored.
+        """
+        opts, names, model_field = self._meta, [], None
+        for name in field.split("__"):
+            if model_field is not None:
+                if model_field.rel is None:
+                    return []
+                opts = model_field.rel.to._meta
+
+            if name == "pk":
+                name = opts.pk.name
+
+            try:
+                model_field, model, direct, m2m = opts.get_field_by_name(name)
+            except FieldDoesNotExist:
+                return []
+
+            if not direct or m2m:
+                return []
+            names.append(name)
+
+        lookup = "__".join(names)
+        if model_field.rel is None:
+            return [(lookup, descending)]
+
+        related_opts = model_field.rel.to._meta
+        if not related_opts.ordering or related_opts in seen:
+            return [(lookup, descending)]
+
+        columns = []
+        for related_field in related_opts.ordering:
+            columns += self._expand_order_field("{0}__{1}".format(lookup, related_field.lstrip("-")),
+                                                descending != related_field.startswith("-"),
+                                                tuple(seen) + (related_opts,))
+        return columns
+
+    def _get_order_columns(self, ordering):
+        columns, lookups = [], set()
+        for field in ordering:
+            for lookup, descending in self._expand_order_field(field.lstrip("-"),
+                                                               field.startswith("-")):
+                # Only the first one of each column changes the order
+                if lookup not in lookups:
+                    lookups.add(lookup)
+                    columns.append((lookup, descending))
+        return columns
+
+    def _get_neighbor_ids(self, queryset):
+        """
+        Get the ids `(previous, next)` of the neighbors of this object on
+        the queryset. The NULL values are sorted as postgresql does on the
+        list queries: after the other values, or before them when the
+        order is descending.
+        """
+        columns = self._get_order_columns(self._get_order_by(queryset))
+        lookups = [lookup for lookup, descending in columns]
+        aliases = ["c{0}".format(i) for i in range(len(columns))]
+        pk_alias = aliases[lookups.index(self._meta.pk.name)]
+
+        candidates_sql, candidates_params = (queryset.order_by().values_list(*lookups)
+                                                     .query.sql_with_params())
+        self_qs = type(self).objects.filter(pk=self.pk).order_by().values_list(*lookups)
+        self_sql, self_params = self_qs.query.sql_with_params()
+
+        window_order = ", ".join("{0} {1}".format(alias, "DESC NULLS FIRST" if descending
+                                                            else "ASC NULLS LAST")
+                                 for alias, (lookup, descending) in zip(aliases, columns))
+
+        sql = """
+            SELECT previous_id, next_id
+            FROM (
+                SELECT {pk},
+                       LAG({pk}) OVER w AS previous_id,
+                       LEAD({pk}) OVER w AS next_id
+                FROM (({candidates}) UNION ({self})) AS candidates ({aliases})
+                WINDOW w AS (ORDER BY {order})
+            ) AS neighbors
+            WHERE {pk} = %s
+        """.format(pk=pk_alias, candidates=candidates_sql, self=self_sql,
+                   aliases=", ".join(aliases), order=window_order)
+
+        params = tuple(candidates_params) + tuple(self_params) + (self.pk,)
+        with closing(connections[queryset.db].cursor()) as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+
+        return row if row is not None else (None, None)
+
+
+def get_stored_values(instance):
+    """
+    Get a dict {attname: value} with the values stored on the
+    database of an instance that is going to be saved (None for
+    new instances).
+
+    They are fetched with one query on the first call and kept
+    during the save, so all the pre_save handlers of the same
+    save share them.
+    """
+    if instance.pk is None:
+        return None
+
+    if "_stored_values" not in instance.__dict__:
+        qs = instance.__class__._default_manager.filter(pk=instance.pk)
+        fields = [field.attname for field in instance._meta.concrete_fields]
+        instance._stored_values = qs.values(*fields).first()
+    return instance._stored_values
+
+
+# Discard the stored values of a previous save (it may have failed
+# before post_save). The models modules import this one before they
+# connect their handlers, so it runs before them.
+@receiver(models.signals.pre_save, dispatch_uid="clear_stored_values_pre_save")
+@receiver(models.signals.post_save, dispatch_uid="clear_stored_values_post_save")
+def clear_stored_values(sender, instance, **kwargs):
+    instance.__dict__.pop("_stored_values", None)
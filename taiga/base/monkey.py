@@ -81,3 +81,56 @@ def patch_south_hacks():
 
     django_1_0.Hacks.set_installed_apps = set_installed_apps
     django_1_0.Hacks._redo_app_cache = _redo_app_cache
+
+
+def patch_atomic():
+    """
+    Add ``transaction.on_commit`` (as on newer versions of Django): the
+    function is called when the transaction of the atomic block that is
+    running commits (or immediately, out of an atomic block) and never if
+    it (or the savepoint where it is registered) is rolled back.
+    """
+    from django.db import transaction
+
+    if hasattr(transaction, "on_commit"):
+        return
+
+    original_exit = transaction.Atomic.__exit__
+
+    def on_commit(func, using=None):
+        connection = transaction.get_connection(using)
+        if not connection.in_atomic_block:
+            func()
+            return
+
+        # Each function is kept with the depth of the savepoint
+        # where it's registered (0 for the outermost block).
+        if not hasattr(connection, "run_on_commit"):
+            connection.run_on_commit = []
+        connection.run_on_commit.append((len(connection.savepoint_ids), func))
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        connection = transaction.get_connection(self.using)
+        depth = len(connection.savepoint_ids)
+        rolled_back = (exc_type is not None or connection.needs_rollback or
+                       getattr(connection, "closed_in_transaction", False))
+        try:
+            original_exit(self, exc_type, exc_value, traceback)
+        except Exception:
+            rolled_back = True
+            raise
+        finally:
+            run_on_commit = getattr(connection, "run_on_commit", [])
+            if rolled_back:
+                connection.run_on_commit = [(d, f) for d, f in run_on_commit if d < depth]
+            elif depth > 0:
+                connection.run_on_commit = [(min(d, depth - 1), f) for d, f in run_on_commit]
+            else:
+                connection.run_on_commit = []
+
+        if depth == 0 and not rolled_back:
+            for _, func in run_on_commit:
+                func()
+
+    transaction.on_commit = on_commit
+    transaction.Atomic.__exit__ = __exit__
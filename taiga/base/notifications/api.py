@@ -7,6 +7,7 @@ class NotificationSenderMixin(object):
     create_notification_template = None
     update_notification_template = None
     destroy_notification_template = None
+    bulk_create_notification_template = None
     notification_service = services.NotificationService()
 
     def _post_save_notification_sender(self, obj, created=False):
@@ -14,16 +15,33 @@ class NotificationSenderMixin(object):
         comment = self.request.DATA.get("comment", None)
         context = {'changer': self.request.user, "comment": comment, 'object': obj}
 
+        # The emails are rendered later, with the values of the object on this change
         if created:
             self.notification_service.send_notification_email(self.create_notification_template,
-                                                              users=users, context=context)
+                                                              users=users, context=context,
+                                                              snapshot=True)
         else:
             changed_fields = obj.get_changed_fields_list(self.request.DATA)
 
             if changed_fields:
                 context["changed_fields"] = changed_fields
                 self.notification_service.send_notification_email(self.update_notification_template,
-                                                                  users=users, context=context)
+                                                                  users=users, context=context,
+                                                                  snapshot=True, coalesce=True)
+
+    def _bulk_create_notification_sender(self, objs):
+        """
+        Queue only one notification for some objects created
+        together (they have the same project, owner and watchers).
+        """
+        if not objs or not self.bulk_create_notification_template:
+            return
+
+        users = objs[0].get_watchers_to_notify(self.request.user)
+        context = {"changer": self.request.user, "object": objs[0].project,
+                   "objects": [{"ref": obj.ref, "subject": obj.subject} for obj in objs]}
+        self.notification_service.send_notification_email(self.bulk_create_notification_template,
+                                                          users=users, context=context)
 
     def post_save(self, obj, created=False):
         super().post_save(obj, created)
@@ -35,6 +53,7 @@ class NotificationSenderMixin(object):
 
         context = {'changer': self.request.user, 'object': obj}
         self.notification_service.send_notification_email(self.destroy_notification_template,
-                                                          users=users, context=context)
+                                                          users=users, context=context,
+                                                          snapshot=True)
 
         return super().destroy(request, *args, **kwargs)
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+from optparse import make_option
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from taiga.base.notifications.services import send_queued_notifications
+
+
+class Command(BaseCommand):
+    help = "Send, in batches, the notification emails queued on the notifications outbox."
+
+    option_list = BaseCommand.option_list + (
+        make_option("--batch-size", action="store", type="int", dest="batch_size",
+                    default=None, help="Number of notifications sent on each batch."),
+        make_option("--loop", action="store_true", dest="loop", default=False,
+                    help="Keep running, waiting for new notifications."),
+        make_option("--interval", action="store", type="float", dest="interval",
+                    default=5, help="Seconds between checks of the outbox with --loop."),
+    )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size is not None and batch_size <= 0:
+            raise CommandError("Invalid batch size: {0}".format(batch_size))
+
+        while True:
+            count = send_queued_notifications(batch_size)
+            if count:
+                self.stdout.write("Processed {0} notifications".format(count))
+                continue
+
+            if not options["loop"]:
+                break
+
+            time.sleep(options["interval"])
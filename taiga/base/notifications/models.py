@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
 
+from django.conf import settings
+from django.contrib.contenttypes import generic
 from django.db import models
+from django.dispatch import receiver
 from django.db.models.fields import FieldDoesNotExist
 from django.utils.translation import ugettext_lazy as _
 
+from picklefield.fields import PickledObjectField
+
+import collections
+import copy
 import reversion
 
 
@@ -73,9 +80,14 @@ class WatchedMixin(models.Model):
         else:
             changed_data = data_dict
 
+        # The values of the fields on the snapshot are compared first
+        # (for the foreign keys, their ids) to skip the unchanged ones.
+        changed_data = {k:v for k, v in changed_data.items() if self._may_have_changed(k)}
+        old_values = self._get_changed_fields_old_values(changed_data.keys())
+
         fields_list = []
         for field_name, data_value in changed_data.items():
-            field_dict = self._get_changed_field(field_name, data_value)
+            field_dict = self._get_changed_field(field_name, data_value, old_values)
             if field_dict["old_value"] != field_dict["new_value"]:
                 fields_list.append(field_dict)
 
@@ -113,25 +125,78 @@ class WatchedMixin(models.Model):
 
         return watchers_to_notify
 
+    @classmethod
+    def _get_notifiable_attnames(cls):
+        if "_notifiable_attnames" not in cls.__dict__:
+            cls._notifiable_attnames = tuple(
+                field.attname for field in cls._meta.concrete_fields
+                if not cls.notifiable_fields or field.name in cls.notifiable_fields)
+        return cls._notifiable_attnames
+
+    def _take_notifiable_snapshot(self):
+        """
+        Keep a copy of the loaded values of the notifiable concrete
+        fields, used as the old values of the changed fields of the
+        notifications.
+        """
+        self._notifiable_snapshot = {attname: copy.copy(self.__dict__[attname])
+                                     for attname in self._get_notifiable_attnames()
+                                     if attname in self.__dict__}
+
+    def _may_have_changed(self, field_name):
+        snapshot = getattr(self, "_notifiable_snapshot", {})
+        try:
+            attname = self._meta.get_field(field_name).attname
+        except FieldDoesNotExist:
+            return True
+
+        if attname not in snapshot or attname not in self.__dict__:
+            return True
+        return snapshot[attname] != self.__dict__[attname]
+
     def _get_changed_field_verbose_name(self, field_name):
         try:
             return self._meta.get_field(field_name).verbose_name
         except FieldDoesNotExist:
             return field_name
 
-    def _get_changed_field_old_value(self, field_name, data_value):
-        value = (self.last_version.field_dict.get(field_name, data_value)
-                    if self.last_version else None)
-        field = self.__class__._meta.get_field_by_name(field_name)[0] or None
+    def _get_changed_fields_old_values(self, field_names):
+        """
+        Get the old values of the given fields from the snapshot
+        (None for the fields that aren't on it, like the m2m ones).
+        The old instances of the foreign keys are fetched with one
+        query for each related model.
+        """
+        snapshot = getattr(self, "_notifiable_snapshot", {})
+        old_values = {}
+        foreign_keys = {}
+        related_ids = collections.defaultdict(set)
+
+        for field_name in field_names:
+            try:
+                field = self._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                old_values[field_name] = None
+                continue
+
+            value = snapshot.get(field.attname, None)
+            old_values[field_name] = value
 
-        if value and field:
-            # Get the old value from a ForeignKey
-            if type(field) is models.fields.related.ForeignKey:
-                try:
-                    value = field.related.parent_model.objects.get(pk=value)
-                except field.related.parent_model.DoesNotExist:
-                    pass
+            if isinstance(field, models.ForeignKey) and value is not None:
+                foreign_keys[field_name] = field
+                related_ids[field.rel.to].add(value)
 
+        related_objects = {model: model.objects.in_bulk(list(ids))
+                           for model, ids in related_ids.items()}
+
+        for field_name, field in foreign_keys.items():
+            value = old_values[field_name]
+            old_values[field_name] = related_objects[field.rel.to].get(value, value)
+
+        return old_values
+
+    def _get_changed_field_old_value(self, field_name, old_values):
+        value = old_values.get(field_name, None)
         display_method = getattr(self,"get_notifiable_{field_name}_display".format(
                                                               field_name=field_name) ,None)
         return display_method(value) if display_method else value
@@ -142,9 +207,9 @@ class WatchedMixin(models.Model):
                                                               field_name=field_name) ,None)
         return display_method(value) if display_method else value
 
-    def _get_changed_field(self, field_name, data_value):
+    def _get_changed_field(self, field_name, data_value, old_values):
         verbose_name = self._get_changed_field_verbose_name(field_name)
-        old_value = self._get_changed_field_old_value(field_name, None)
+        old_value = self._get_changed_field_old_value(field_name, old_values)
         new_value = self._get_changed_field_new_value(field_name, data_value)
 
         return {
@@ -168,3 +233,66 @@ class WatchedMixin(models.Model):
         """
         raise NotImplementedError("You must subclass WatchedMixin and provide "
                                   "_get_watchers_by_role method")
+
+
+class QueuedNotification(models.Model):
+    """
+    Notification emails waiting on the outbox to be rendered and
+    sent (by the send_notifications command) to its recipients.
+    """
+    STATUS_CHOICES = (
+        ("pending", _(u"Pending")),
+        ("sending", _(u"Sending")),
+        ("sent", _(u"Sent")),
+        ("discarded", _(u"Discarded")),
+        ("failed", _(u"Failed")),
+    )
+
+    template_method = models.CharField(max_length=255, null=False, blank=False,
+                                       verbose_name=_(u"template method"))
+    recipients = PickledObjectField(null=False, blank=True, default=list, editable=False,
+                                    verbose_name=_(u"recipients"))
+    changer = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True,
+                                on_delete=models.SET_NULL, related_name="+",
+                                verbose_name=_(u"changer"))
+    content_type = models.ForeignKey("contenttypes.ContentType", null=False, blank=False,
+                                     related_name="+", verbose_name=_(u"content type"))
+    object_id = models.PositiveIntegerField(null=False, blank=False,
+                                            verbose_name=_(u"object id"))
+    content_object = generic.GenericForeignKey("content_type", "object_id")
+    object_snapshot = PickledObjectField(null=True, blank=True, default=None, editable=False,
+                                         verbose_name=_(u"object snapshot"))
+    context = PickledObjectField(null=False, blank=True, default=dict, editable=False,
+                                 verbose_name=_(u"context"))
+    coalesce = models.BooleanField(null=False, blank=True, default=False,
+                                   verbose_name=_(u"coalesce"))
+    status = models.CharField(max_length=16, null=False, blank=False, default="pending",
+                              choices=STATUS_CHOICES, db_index=True,
+                              verbose_name=_(u"status"))
+    retry_count = models.PositiveSmallIntegerField(null=False, blank=False, default=0,
+                                                   verbose_name=_(u"retry count"))
+    created_date = models.DateTimeField(auto_now_add=True, null=False, blank=False,
+                                        verbose_name=_(u"created date"))
+    sent_date = models.DateTimeField(null=True, blank=True, default=None,
+                                     verbose_name=_(u"sent date"))
+
+    class Meta:
+        verbose_name = "queued notification"
+        verbose_name_plural = "queued notifications"
+        ordering = ["id"]
+
+    def __str__(self):
+        return "{0} ({1}:{2})".format(self.template_method, self.content_type_id,
+                                      self.object_id)
+
+
+# Model related signals handlers
+def _watched_post_init_handler(sender, instance, **kwargs):
+    instance._take_notifiable_snapshot()
+
+
+@receiver(models.signals.class_prepared, dispatch_uid="watched_mixin_class_prepared_handler")
+def watched_mixin_class_prepared_handler(sender, **kwargs):
+    if issubclass(sender, WatchedMixin) and not sender._meta.abstract:
+        models.signals.post_init.connect(_watched_post_init_handler, sender=sender,
+                                         dispatch_uid="watched_post_init_handler")
@@ -1,19 +1,337 @@
 # -*- coding: utf-8 -*-
 
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core import mail
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.loading import get_model
+from django.utils import timezone
+
 from djmail import template_mail
 
 import collections
+import datetime
+import functools
+import logging
+import operator
+
+log = logging.getLogger("taiga.notifications")
+
+
+def _get_notified_objects(notifications):
+    """
+    Get a dict {(content type id, object id): object} with the
+    notified objects of the notifications without a snapshot,
+    with one query for each content type.
+    """
+    ids_by_content_type = collections.defaultdict(set)
+    for notification in notifications:
+        if notification.object_snapshot is None:
+            ids_by_content_type[notification.content_type_id].add(notification.object_id)
+
+    objects = {}
+    for content_type_id, ids in ids_by_content_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        for object_id, obj in model.objects.in_bulk(list(ids)).items():
+            objects[(content_type_id, object_id)] = obj
+    return objects
+
+
+def _get_notified_users(notifications):
+    user_ids = set()
+    for notification in notifications:
+        user_ids.update(notification.recipients)
+        user_ids.add(notification.changer_id)
+    user_ids.discard(None)
+
+    user_model = get_model("users", "User")
+    return user_model.objects.in_bulk(list(user_ids))
+
+
+def _render_notification(mails, notification, obj, users):
+    """
+    Render the email of each recipient of a notification. Return
+    a list of (message, recipient id, notifications).
+    """
+    context = dict(notification.context)
+    context["changer"] = users[notification.changer_id]
+    context["changers"] = [context["changer"]]
+    context["object"] = obj
+
+    template = getattr(mails, notification.template_method)
+    return [(template(users[user_id], context), user_id, [notification])
+                for user_id in notification.recipients if user_id in users]
+
+
+def _merge_changed_fields(notifications):
+    fields = collections.OrderedDict()
+    for notification in notifications:
+        for field in notification.context.get("changed_fields", []):
+            if field["name"] in fields:
+                fields[field["name"]]["new_value"] = field["new_value"]
+            else:
+                fields[field["name"]] = dict(field)
+
+    return [field for field in fields.values() if field["old_value"] != field["new_value"]]
+
+
+def _merge_contexts(notifications):
+    comments = [n.context["comment"] for n in notifications if n.context.get("comment")]
+
+    context = dict(notifications[-1].context)
+    context["comment"] = "\n\n".join(comments) or None
+    context["changed_fields"] = _merge_changed_fields(notifications)
+    return context
+
+
+def _render_digest(mails, notifications, obj, users):
+    """
+    Render, for each recipient, one email with the merged
+    changes of the notifications of the object it receives.
+    Changes that have been reverted are not notified. The email
+    has all the users that made the changes ("changers", in order)
+    and the last one ("changer"). Return a list of (message,
+    recipient id, notifications).
+    """
+    template = getattr(mails, notifications[0].template_method)
+    recipients = set()
+    for notification in notifications:
+        recipients.update(notification.recipients)
+
+    messages = []
+    for user_id in sorted(recipients & set(users)):
+        user_notifications = [n for n in notifications if user_id in n.recipients]
+        context = _merge_contexts(user_notifications)
+        if not context["changed_fields"] and not context["comment"]:
+            continue
+
+        changer_ids = collections.OrderedDict.fromkeys(n.changer_id for n in user_notifications)
+        context["changers"] = [users[changer_id] for changer_id in changer_ids]
+        context["changer"] = context["changers"][-1]
+        context["object"] = obj
+        messages.append((template(users[user_id], context), user_id, user_notifications))
+    return messages
+
+
+def _group_notifications(notifications):
+    """
+    Group the notifications that are coalesced by their object
+    and template, keeping the order of the first of each group.
+    """
+    groups = collections.OrderedDict()
+    for notification in sorted(notifications, key=lambda n: n.id):
+        if notification.coalesce:
+            key = (notification.content_type_id, notification.object_id,
+                   notification.template_method)
+        else:
+            key = notification.id
+        groups.setdefault(key, []).append(notification)
+    return list(groups.values())
+
+
+def _mark_as_failed(notification):
+    """
+    Keep a notification on the outbox to retry it (only with the
+    recipients that haven't received it), up to the maximum
+    number of retries.
+    """
+    notification.retry_count += 1
+    if notification.retry_count >= settings.DJMAIL_MAX_RETRY_NUMBER:
+        notification.status = "failed"
+    else:
+        notification.status = "pending"
+    notification.save(update_fields=["status", "retry_count", "recipients"])
+
+
+def _send_messages(messages):
+    """
+    Send the rendered (message, recipient id, notifications)
+    through the same email backend connection, one by one.
+    Return a dict {notification id: recipient ids} with the
+    recipients whose email has failed.
+    """
+    failed_recipients = collections.defaultdict(set)
+
+    connection = mail.get_connection(backend=settings.NOTIFICATIONS_EMAIL_BACKEND)
+    try:
+        connection.open()
+    except Exception:
+        log.exception("Error opening the email connection")
+        for message, user_id, notifications in messages:
+            for notification in notifications:
+                failed_recipients[notification.id].add(user_id)
+        return failed_recipients
+
+    try:
+        for message, user_id, notifications in messages:
+            try:
+                connection.send_messages([message])
+            except Exception:
+                log.exception("Error sending a notification email to the user %s", user_id)
+                for notification in notifications:
+                    failed_recipients[notification.id].add(user_id)
+    finally:
+        connection.close()
+
+    return failed_recipients
+
+
+def _send_notifications(notifications):
+    """
+    Render the emails of the given notifications and send them
+    all through the same email backend connection.
+
+    The emails of each template are rendered with the same mail
+    builder, so its templates are only compiled once (they are
+    kept on the jinja environment cache of the process).
+
+    The emails are rendered with the object snapshot of the
+    notifications (the last one for the digests), or the current
+    object if they don't have one.
+    """
+    notification_model = get_model("notifications", "QueuedNotification")
+    users = _get_notified_users(notifications)
+    objects = _get_notified_objects(notifications)
+    mails = template_mail.MagicMailBuilder()
+
+    messages, rendered, discarded = [], [], []
+    for group in _group_notifications(notifications):
+        obj = group[-1].object_snapshot
+        if obj is None:
+            obj = objects.get((group[0].content_type_id, group[0].object_id), None)
+
+        if obj is None or any(n.changer_id not in users for n in group):
+            discarded.extend(n.id for n in group)
+            continue
+
+        try:
+            if group[0].coalesce:
+                messages.extend(_render_digest(mails, group, obj, users))
+            else:
+                messages.extend(_render_notification(mails, group[0], obj, users))
+        except Exception:
+            log.exception("Error rendering the notifications %s", [n.id for n in group])
+            for notification in group:
+                _mark_as_failed(notification)
+        else:
+            rendered.extend(group)
+
+    if discarded:
+        notification_model.objects.filter(id__in=discarded).update(status="discarded")
+
+    failed_recipients = _send_messages(messages) if messages else {}
+
+    sent = []
+    for notification in rendered:
+        if notification.id in failed_recipients:
+            notification.recipients = sorted(failed_recipients[notification.id])
+            _mark_as_failed(notification)
+        else:
+            sent.append(notification.id)
+
+    if sent:
+        qs = notification_model.objects.filter(id__in=sent)
+        qs.update(status="sent", sent_date=timezone.now())
+
+
+def _get_pending_notifications(batch_size):
+    """
+    Get (and lock) the oldest pending notifications that are
+    ready to be sent. The coalesced ones are held while the
+    NOTIFICATIONS_DIGEST_WINDOW of its oldest change is open and
+    then all the pending ones of the same object are sent
+    together.
+    """
+    notification_model = get_model("notifications", "QueuedNotification")
+    window = datetime.timedelta(seconds=settings.NOTIFICATIONS_DIGEST_WINDOW)
+    window_start = timezone.now() - window
+
+    qs = notification_model.objects.filter(status="pending").order_by("id")
+    ready_qs = qs.filter(Q(coalesce=False) | Q(created_date__lte=window_start))
+    notifications = list(ready_qs.select_for_update()[:batch_size])
+
+    keys = set((n.content_type_id, n.object_id, n.template_method)
+                   for n in notifications if n.coalesce)
+    if keys:
+        keys_q = functools.reduce(operator.or_, [Q(content_type=content_type_id,
+                                                   object_id=object_id,
+                                                   template_method=template_method)
+                                                 for content_type_id, object_id, template_method
+                                                 in keys])
+        siblings_qs = qs.filter(keys_q, coalesce=True)
+        siblings_qs = siblings_qs.exclude(id__in=[n.id for n in notifications])
+        notifications.extend(siblings_qs.select_for_update())
+
+    return notifications
+
+
+def send_queued_notifications(batch_size=None):
+    """
+    Send a batch of the pending notifications of the outbox (the
+    oldest first) and return the number of processed notifications.
+
+    The batch is claimed (marked as sending) on its own transaction
+    before sending it, so some workers can run at the same time
+    without sending the same emails twice, and the emails are sent
+    without holding any lock. The notifications of a worker that
+    dies while sending them are kept as sending, not sent again.
+    """
+    batch_size = batch_size or settings.NOTIFICATIONS_BATCH_SIZE
+    notification_model = get_model("notifications", "QueuedNotification")
+
+    with transaction.atomic():
+        notifications = _get_pending_notifications(batch_size)
+        if notifications:
+            qs = notification_model.objects.filter(id__in=[n.id for n in notifications])
+            qs.update(status="sending")
+
+    if notifications:
+        _send_notifications(notifications)
+
+    return len(notifications)
 
 
 class NotificationService(object):
-    def send_notification_email(self, template_method, users=None, context=None):
+    def send_notification_email(self, template_method, users=None, context=None,
+                                snapshot=False, coalesce=False):
+        """
+        Queue a notification email for the given users on the outbox.
+
+        The context must have the "changer" and the notified
+        "object". With snapshot=True, a copy of the object is
+        stored with the notification and the email shows it as it
+        was (even if it's changed or deleted meanwhile). With
+        coalesce=True, the notifications of the same object and
+        template queued on the digest window are sent as one email
+        for each recipient, with all the changed fields and the
+        users that made them. If NOTIFICATIONS_SEND_ASYNC is False,
+        the notification is sent immediately (so it's never
+        coalesced).
+        """
         if not users:
             return
 
         if not isinstance(users, collections.Iterable):
             users = (users,)
 
-        mails = template_mail.MagicMailBuilder()
-        for user in users:
-            email = getattr(mails, template_method)(user, context)
-            email.send()
+        context = dict(context or {})
+        changer = context.pop("changer")
+        obj = context.pop("object")
+
+        notification_model = get_model("notifications", "QueuedNotification")
+        notification = notification_model.objects.create(
+            template_method=template_method,
+            recipients=sorted(user.id for user in users),
+            changer=changer,
+            content_type=ContentType.objects.get_for_model(obj),
+            object_id=obj.pk,
+            object_snapshot=obj if snapshot else None,
+            context=context,
+            coalesce=coalesce,
+        )
+
+        if not settings.NOTIFICATIONS_SEND_ASYNC:
+            _send_notifications([notification])
+
+        return notification
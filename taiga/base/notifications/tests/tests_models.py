@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+from django import test
+
+from taiga.base.users.tests import create_user
+from taiga.projects.tests import create_project, add_membership
+from taiga.projects.issues.models import Issue
+from taiga.projects.issues.tests import create_issue
+
+
+class WatchedChangedFieldsTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1)
+        self.user2 = create_user(2)
+        self.project1 = create_project(1, self.user1)
+        add_membership(self.project1, self.user1)
+        add_membership(self.project1, self.user2)
+        self.issue1 = create_issue(1, self.user1, self.project1)
+
+    def test_changed_fields_list(self):
+        old_status, new_status = self.project1.issue_statuses.all()[:2]
+        issue = Issue.objects.get(pk=self.issue1.pk)
+
+        issue.subject = "New subject"
+        issue.status = new_status
+        issue.assigned_to = self.user2
+        issue.tags = ["foo", "bar"]
+        data = {"subject": "New subject", "status": new_status.id, "assigned_to": self.user2.id,
+                "tags": ["foo", "bar"], "description": issue.description}
+
+        with self.assertNumQueries(1):
+            changed_fields = issue.get_changed_fields_list(data)
+
+        self.assertEqual([(f["name"], f["old_value"], f["new_value"]) for f in changed_fields], [
+            ("subject", "Issue 1", "New subject"),
+            ("assigned_to", "Unassigned", self.user2.get_full_name()),
+            ("status", old_status, new_status),
+            ("tags", "", "foo, bar"),
+        ])
+
+    def test_changed_fields_list_without_changes(self):
+        issue = Issue.objects.get(pk=self.issue1.pk)
+        data = {"subject": issue.subject, "status": issue.status_id}
+
+        with self.assertNumQueries(0):
+            self.assertEqual(issue.get_changed_fields_list(data), [])
+
+    def test_snapshot_has_only_the_notifiable_fields(self):
+        issue = Issue.objects.get(pk=self.issue1.pk)
+        self.assertIn("status_id", issue._notifiable_snapshot)
+        self.assertNotIn("ref", issue._notifiable_snapshot)
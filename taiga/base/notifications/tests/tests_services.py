@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+from django import test
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.db.models import get_model
+from django.test.utils import override_settings
+
+from taiga.base.users.tests import create_user
+from taiga.base.notifications.services import NotificationService, send_queued_notifications
+from taiga.projects.tests import create_project, add_membership
+from taiga.projects.issues.tests import create_issue
+
+
+class FailingEmailBackend(locmem.EmailBackend):
+    """
+    Email backend of the tests that fails to send the emails
+    to the addresses of failing_addresses.
+    """
+    failing_addresses = set()
+
+    def send_messages(self, messages):
+        if any(address in self.failing_addresses for m in messages for address in m.to):
+            raise OSError("Failing address")
+        return super().send_messages(messages)
+
+
+@override_settings(NOTIFICATIONS_SEND_ASYNC=True,
+                   NOTIFICATIONS_EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class NotificationsOutboxTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1)
+        self.user2 = create_user(2)
+        self.user3 = create_user(3)
+        self.project1 = create_project(1, self.user1)
+        add_membership(self.project1, self.user1)
+        add_membership(self.project1, self.user2)
+        add_membership(self.project1, self.user3)
+        self.issue1 = create_issue(1, self.user1, self.project1)
+        self.service = NotificationService()
+        self.model = get_model("notifications", "QueuedNotification")
+
+    def test_queue_notification(self):
+        context = {"changer": self.user1, "object": self.issue1, "comment": "Hello"}
+        self.service.send_notification_email("create_issue_notification",
+                                             users=[self.user3, self.user2], context=context)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(self.model.objects.count(), 1)
+
+        notification = self.model.objects.get()
+        self.assertEqual(notification.status, "pending")
+        self.assertEqual(notification.recipients, [self.user2.id, self.user3.id])
+        self.assertEqual(notification.changer, self.user1)
+        self.assertEqual(notification.content_object, self.issue1)
+        self.assertEqual(notification.context, {"comment": "Hello"})
+        self.assertEqual(notification.object_snapshot, None)
+
+    def test_send_queued_notifications(self):
+        context = {"changer": self.user1, "object": self.issue1}
+        self.service.send_notification_email("create_issue_notification",
+                                             users=[self.user2, self.user3], context=context)
+        self.service.send_notification_email("create_issue_notification",
+                                             users=[self.user2], context=context)
+
+        self.assertEqual(send_queued_notifications(batch_size=1), 1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(self.model.objects.filter(status="pending").count(), 1)
+
+        self.assertEqual(send_queued_notifications(), 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(self.model.objects.filter(status="sent").count(), 2)
+        self.assertEqual(self.model.objects.filter(sent_date__isnull=True).count(), 0)
+
+        self.assertEqual(send_queued_notifications(), 0)
+        self.assertEqual(len(mail.outbox), 3)
+
+    @override_settings(NOTIFICATIONS_EMAIL_BACKEND="taiga.base.notifications.tests."
+                                                   "tests_services.FailingEmailBackend")
+    def test_only_the_failed_recipients_are_retried(self):
+        context = {"changer": self.user1, "object": self.issue1}
+        self.service.send_notification_email("create_issue_notification",
+                                             users=[self.user2, self.user3], context=context)
+
+        FailingEmailBackend.failing_addresses = set([self.user3.email])
+        try:
+            self.assertEqual(send_queued_notifications(), 1)
+        finally:
+            FailingEmailBackend.failing_addresses = set()
+
+        self.assertEqual([m.to for m in mail.outbox], [[self.user2.email]])
+        notification = self.model.objects.get()
+        self.assertEqual(notification.status, "pending")
+        self.assertEqual(notification.recipients, [self.user3.id])
+        self.assertEqual(notification.retry_count, 1)
+
+        self.assertEqual(send_queued_notifications(), 1)
+        self.assertEqual([m.to for m in mail.outbox], [[self.user2.email], [self.user3.email]])
+        self.assertEqual(self.model.objects.get().status, "sent")
+
+    def test_send_notification_with_the_object_snapshot(self):
+        context = {"changer": self.user1, "object": self.issue1}
+        self.service.send_notification_email("create_issue_notification",
+                                             users=[self.user2], context=context,
+                                             snapshot=True)
+        self.issue1.subject = "Changed subject"
+        self.issue1.save()
+
+        self.assertEqual(send_queued_notifications(), 1)
+        self.assertIn("Issue 1", mail.outbox[0].body)
+        self.assertNotIn("Changed subject", mail.outbox[0].body)
+
+    def test_send_notification_of_deleted_object(self):
+        context = {"changer": self.user1, "object": self.issue1}
+        self.service.send_notification_email("update_issue_notification",
+                                             users=[self.user2], context=context)
+        self.service.send_notification_email("destroy_issue_notification",
+                                             users=[self.user2], context=context,
+                                             snapshot=True)
+        self.issue1.delete()
+
+        self.assertEqual(send_queued_notifications(), 2)
+        self.assertEqual(len(mail.outbox), 1)
+
+        statuses = self.model.objects.values_list("template_method", "status")
+        self.assertEqual(dict(statuses), {"update_issue_notification": "discarded",
+                                          "destroy_issue_notification": "sent"})
+
+    @override_settings(NOTIFICATIONS_SEND_ASYNC=False)
+    def test_send_notification_immediately(self):
+        context = {"changer": self.user1, "object": self.issue1}
+        self.service.send_notification_email("create_issue_notification",
+                                             users=[self.user2, self.user3], context=context)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(self.model.objects.get().status, "sent")
+
+    def _queue_update(self, changer, users, *changed_fields, comment=None):
+        context = {"changer": changer, "object": self.issue1, "comment": comment,
+                   "changed_fields": [{"name": name, "verbose_name": name,
+                                       "old_value": old_value, "new_value": new_value}
+                                      for name, old_value, new_value in changed_fields]}
+        self.service.send_notification_email("update_issue_notification", users=users,
+                                             context=context, coalesce=True)
+
+    @override_settings(NOTIFICATIONS_DIGEST_WINDOW=0)
+    def test_send_digest_notifications(self):
+        self._queue_update(self.user1, [self.user2, self.user3], ("status", "New", "Open"))
+        self._queue_update(self.user1, [self.user2, self.user3], ("status", "Open", "Closed"),
+                           ("subject", "Foo", "Bar"))
+        self._queue_update(self.user3, [self.user2], ("subject", "Bar", "Foo"),
+                           comment="Reverted")
+
+        self.assertEqual(send_queued_notifications(), 3)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(self.model.objects.filter(status="sent").count(), 3)
+
+        user2_mail, user3_mail = sorted(mail.outbox, key=lambda m: m.to)
+        self.assertIn("Updated by {0}, {1}".format(self.user1.get_full_name(),
+                                                   self.user3.get_full_name()), user2_mail.body)
+        self.assertIn("Updated by {0}".format(self.user1.get_full_name()), user3_mail.body)
+        self.assertNotIn(self.user3.get_full_name(), user3_mail.body)
+        self.assertIn("from 'New' to 'Closed'", user2_mail.body)
+        self.assertNotIn("from 'Foo' to 'Bar'", user2_mail.body)
+        self.assertIn("Reverted", user2_mail.body)
+        self.assertIn("from 'New' to 'Closed'", user3_mail.body)
+        self.assertIn("from 'Foo' to 'Bar'", user3_mail.body)
+
+    @override_settings(NOTIFICATIONS_DIGEST_WINDOW=3600)
+    def test_hold_digest_notifications_on_the_window(self):
+        self._queue_update(self.user1, [self.user2], ("status", "New", "Open"))
+        context = {"changer": self.user1, "object": self.issue1}
+        self.service.send_notification_email("create_issue_notification",
+                                             users=[self.user2], context=context)
+
+        self.assertEqual(send_queued_notifications(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(self.model.objects.get(coalesce=True).status, "pending")
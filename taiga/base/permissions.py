@@ -1,21 +1,69 @@
 # -*- coding: utf-8 -*-
 
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+
 from rest_framework import permissions
 
-from taiga.projects.models import Membership
+from taiga.base.utils.cache import get_shared_cache_timeout
 
 
-def has_project_perm(user, project, perm):
-    if user.is_authenticated():
-        try:
-            membership = Membership.objects.get(project=project, user=user)
-            if membership.role.permissions.filter(codename=perm).count() > 0:
-                return True
+def _get_project_perms_cache_key(user_id, project_id):
+    return "project-perms:{0}:{1}".format(user_id, project_id)
+
+
+def _get_project_perms_cache_timeout():
+    return get_shared_cache_timeout("PROJECT_PERMISSIONS_CACHE_TIMEOUT")
+
+
+def get_project_perms(user, project):
+    """
+    Get the set of permission codenames that a user has on a
+    project through the roles of its memberships.
+
+    The result is memoized on the user instance (so, for each
+    request) and, if PROJECT_PERMISSIONS_CACHE_TIMEOUT is not
+    None, it's also kept on the django cache.
+    """
+    if not user.is_authenticated():
+        return frozenset()
+
+    project_id = getattr(project, "id", project)
+    memoized_perms = user.__dict__.setdefault("_project_perms", {})
+    if project_id in memoized_perms:
+        return memoized_perms[project_id]
+
+    timeout = _get_project_perms_cache_timeout()
+    cache_key = _get_project_perms_cache_key(user.id, project_id)
 
-        except Membership.DoesNotExist:
-            pass
+    perms = cache.get(cache_key) if timeout is not None else None
+    if perms is None:
+        qs = Permission.objects.filter(roles__memberships__project_id=project_id,
+                                       roles__memberships__user_id=user.id)
+        perms = frozenset(qs.values_list("codename", flat=True))
+        if timeout is not None:
+            cache.set(cache_key, perms, timeout)
 
-    return False
+    memoized_perms[project_id] = perms
+    return perms
+
+
+def invalidate_project_perms(memberships):
+    """
+    Remove from the cache the permissions of the given
+    list of (user_id, project_id).
+    """
+    if _get_project_perms_cache_timeout() is None:
+        return
+
+    keys = [_get_project_perms_cache_key(user_id, project_id)
+            for user_id, project_id in memberships if user_id is not None]
+    if keys:
+        cache.delete_many(keys)
+
+
+def has_project_perm(user, project, perm):
+    return perm in get_project_perms(user, project)
 
 
 class BasePermission(permissions.BasePermission):
@@ -33,15 +81,16 @@ class BasePermission(permissions.BasePermission):
             return True
 
         # Object owner
-        if getattr(obj, "owner", None) == request.user:
+        if (request.user.is_authenticated() and
+                getattr(obj, "owner_id", None) == request.user.id):
             return True
 
         project_obj = obj
         for attrib in self.path_to_project:
             project_obj = getattr(project_obj, attrib)
 
-        # Project owner
-        if project_obj.owner == request.user:
+        # Project owner (compared by id, the owner instance is not needed)
+        if request.user.is_authenticated() and project_obj.owner_id == request.user.id:
             return True
 
         # Members permissions
@@ -57,5 +106,3 @@ class BasePermission(permissions.BasePermission):
             return has_project_perm(request.user, project_obj, self.delete_permission)
 
         return False
-
-
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+from optparse import make_option
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.loading import get_model
+
+from taiga.base.searches import services
+from taiga.domains import get_active_domain
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed eiusmod tempor "
+         "incididunt labore dolore magna aliqua enim minim veniam quis nostrud "
+         "exercitation ullamco laboris nisi aliquip commodo consequat duis aute irure "
+         "reprehenderit voluptate velit esse cillum fugiat nulla pariatur excepteur sint "
+         "occaecat cupidatat proident sunt culpa officia deserunt mollit anim").split()
+
+LEGACY_WHERE_CLAUSES = {
+    "userstories_userstory": ("to_tsvector(userstories_userstory.subject || "
+                              "userstories_userstory.description) @@ plainto_tsquery(%s)"),
+    "tasks_task": "to_tsvector(tasks_task.subject || tasks_task.description) @@ plainto_tsquery(%s)",
+    "issues_issue": "to_tsvector(issues_issue.subject || issues_issue.description) @@ plainto_tsquery(%s)",
+    "wiki_wikipage": "to_tsvector(wiki_wikipage.slug || wiki_wikipage.content) @@ plainto_tsquery(%s)",
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def _get_text(words):
+    return " ".join(random.choice(WORDS) for i in range(words))
+
+
+class Command(BaseCommand):
+    help = ("Measure the latency of the searches on a project with a lot of items (created "
+            "on a transaction that is rolled back), with the stored search vectors and with "
+            "the old inline ones.")
+
+    option_list = BaseCommand.option_list + (
+        make_option("--items", action="store", type="int", dest="items", default=100000,
+                    help="Total number of user stories, tasks, issues and wiki pages."),
+        make_option("--searches", action="store", type="int", dest="searches", default=20,
+                    help="Number of searches of each type."),
+    )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                project = self._create_project(options["items"])
+                self._benchmark(project, options["searches"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def _create_project(self, items):
+        user_model = get_model("users", "User")
+        project_model = get_model("projects", "Project")
+
+        user = user_model.objects.create(username="search-benchmark-{0}".format(time.time()))
+        project = project_model.objects.create(name="Search benchmark", description="",
+                                               owner=user, domain=get_active_domain())
+
+        start = time.time()
+        items_per_type = items // 4
+        self._bulk_create(get_model("userstories", "UserStory"), items_per_type,
+                          project=project, status=project.us_statuses.all()[0])
+        self._bulk_create(get_model("tasks", "Task"), items_per_type,
+                          project=project, status=project.task_statuses.all()[0])
+        self._bulk_create(get_model("issues", "Issue"), items_per_type,
+                          project=project, status=project.issue_statuses.all()[0],
+                          severity=project.severities.all()[0],
+                          priority=project.priorities.all()[0],
+                          type=project.issue_types.all()[0])
+        self._bulk_create(get_model("wiki", "WikiPage"), items_per_type, project=project)
+
+        self.stdout.write("Created {0} items in {1:.1f} s".format(items_per_type * 4,
+                                                                  time.time() - start))
+        return project
+
+    def _bulk_create(self, model_cls, count, **kwargs):
+        batch_size = 1000
+        for offset in range(0, count, batch_size):
+            objects = []
+            for i in range(offset, min(offset + batch_size, count)):
+                if model_cls._meta.db_table == "wiki_wikipage":
+                    obj = model_cls(slug="page-{0}".format(i), content=_get_text(50), **kwargs)
+                else:
+                    obj = model_cls(ref=i, subject=_get_text(6), description=_get_text(50),
+                                    **kwargs)
+                objects.append(obj)
+            model_cls.objects.bulk_create(objects)
+
+    def _benchmark(self, project, searches):
+        model_classes = [get_model("userstories", "UserStory"), get_model("tasks", "Task"),
+                         get_model("issues", "Issue"), get_model("wiki", "WikiPage")]
+        texts = [_get_text(random.randint(1, 2)) for i in range(searches)]
+
+        for model_cls in model_classes:
+            table = model_cls._meta.db_table
+            legacy_where = LEGACY_WHERE_CLAUSES[table]
+
+            legacy_time = ranked_time = 0
+            for text in texts:
+                start = time.time()
+                list(model_cls.objects.filter(project_id=project.pk)
+                                      .extra(where=[legacy_where], params=[text])[:50])
+                legacy_time += time.time() - start
+
+                # Prefix search, with the last word incomplete
+                start = time.time()
+                list(services.search(model_cls, project, text[:-2]))
+                ranked_time += time.time() - start
+
+            self.stdout.write("{0:24} inline: {1:8.1f} ms   stored and ranked: {2:8.1f} ms".format(
+                table, legacy_time * 1000 / searches, ranked_time * 1000 / searches))
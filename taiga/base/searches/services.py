@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import base64
+import binascii
+import json
+import re
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models.loading import get_model
+
+# Text search configuration of the search_vector columns (kept by
+# the triggers of the <app>/sql/<model>.sql files and migrations).
+SEARCH_CONFIG = "pg_catalog.simple"
+
+# (result name, app label, model name, fields of the results)
+SEARCH_TYPES = (
+    ("userstories", "userstories", "UserStory", ("id", "ref", "subject")),
+    ("tasks", "tasks", "Task", ("id", "ref", "subject")),
+    ("issues", "issues", "Issue", ("id", "ref", "subject")),
+    ("wikipages", "wiki", "WikiPage", ("id", "slug")),
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_prefix_query(text):
+    """
+    Get a tsquery that matches the documents with words that start
+    with each one of the words of the text, or None if the text has
+    no words.
+    """
+    words = re.findall(r"\w+", text, re.UNICODE)
+    if not words:
+        return None
+    return " & ".join("'{0}':*".format(word.lower()) for word in words)
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Get the values of a cursor. Raise ValueError if it's not
+    a valid one.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except (TypeError, UnicodeError, ValueError, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, dict) or not isinstance(values.get("id", None), int):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _get_search_queryset(model_cls, project, text, cursor=None):
+    queryset = model_cls.objects.filter(project_id=project.pk)
+
+    query = get_prefix_query(text)
+    if query is None:
+        return queryset.none()
+
+    table = model_cls._meta.db_table
+    tsquery = "to_tsquery('{0}', %s)".format(SEARCH_CONFIG)
+    rank_select = "ts_rank({0}.search_vector, {1})".format(table, tsquery)
+    where_clauses = ["{0}.search_vector @@ {1}".format(table, tsquery)]
+    params = [query]
+
+    if cursor is not None:
+        # The results after the last one of the previous page, with its rank
+        # computed again (a real doesn't survive the cursor exactly) by an
+        # uncorrelated subquery (run once). If it was deleted, the results
+        # with a greater id.
+        where_clauses.append("coalesce(({rank}, -{table}.id) < (SELECT ts_rank(c.search_vector, "
+                             "{tsquery}), -c.id FROM {table} c WHERE c.id = %s), {table}.id > %s)"
+                                 .format(rank=rank_select, tsquery=tsquery, table=table))
+        params += [query, query, cursor["id"], cursor["id"]]
+
+    return queryset.extra(select={"rank": rank_select}, select_params=[query],
+                          where=where_clauses, params=params, order_by=["-rank", "id"])
+
+
+def search(model_cls, project, text, limit=None):
+    """
+    Get the objects of a project that match the text, sorted
+    by rank (up to limit, MAX_SEARCH_RESULTS by default).
+    """
+    limit = limit or settings.MAX_SEARCH_RESULTS
+    return _get_search_queryset(model_cls, project, text)[:limit]
+
+
+def search_page(model_cls, fields, project, text, get_all=False, cursor=None, limit=None):
+    """
+    Get a page of (up to limit) results, with only the given
+    fields, and the cursor of the next page (None if it's the
+    last one).
+
+    With get_all and an empty text, all the objects of the
+    project are returned (paginated too), sorted by id.
+
+    The cursor only keeps the id of the last result of the page.
+    If that object is deleted, the next page of a search has the
+    results with a greater id.
+    """
+    limit = limit or settings.MAX_SEARCH_RESULTS
+    cursor = decode_cursor(cursor) if cursor else None
+
+    if get_all and text == "":
+        queryset = model_cls.objects.filter(project_id=project.pk).order_by("id")
+        if cursor is not None:
+            queryset = queryset.filter(id__gt=cursor["id"])
+        rows = list(queryset.values(*fields)[:limit + 1])
+    else:
+        queryset = _get_search_queryset(model_cls, project, text, cursor)
+        rows = list(queryset.values(*(fields + ("rank",)))[:limit + 1])
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor({"id": rows[-1]["id"]})
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.SEARCH_EXECUTOR_WORKERS)
+            atexit.register(shutdown_executor)
+        return _executor
+
+
+def shutdown_executor():
+    """
+    Wait for the running searches and stop the threads of the
+    executor (a new one is created by the next search).
+    """
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown()
+
+
+def _search_page_in_thread(*args, **kwargs):
+    # Each thread of the executor has its own (persistent) connection
+    close_old_connections()
+    try:
+        return search_page(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def search_project(project, text, get_all=False, cursors=None, limit=None):
+    """
+    Search on the user stories, tasks, issues and wiki pages of a
+    project. Return a dict {result name: (rows, next cursor)}.
+
+    If SEARCH_EXECUTOR_WORKERS is not 0, the searches of each type
+    run concurrently on a thread pool.
+    """
+    cursors = cursors or {}
+    searches = [(name, get_model(app_label, model_name), fields)
+                for name, app_label, model_name, fields in SEARCH_TYPES]
+
+    # Validate the cursors before running any search
+    for name, model_cls, fields in searches:
+        if cursors.get(name, None):
+            decode_cursor(cursors[name])
+
+    if not settings.SEARCH_EXECUTOR_WORKERS:
+        return {name: search_page(model_cls, fields, project, text, get_all,
+                                  cursors.get(name, None), limit)
+                for name, model_cls, fields in searches}
+
+    executor = _get_executor()
+    futures = {name: executor.submit(_search_page_in_thread, model_cls, fields, project, text,
+                                     get_all, cursors.get(name, None), limit)
+               for name, model_cls, fields in searches}
+    return {name: future.result() for name, future in futures.items()}
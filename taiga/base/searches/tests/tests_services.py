@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+from django import test
+from django.test.utils import override_settings
+
+from taiga.base.users.tests import create_user
+from taiga.base.searches import services
+from taiga.projects.tests import create_project
+from taiga.projects.issues.models import Issue
+from taiga.projects.issues.tests import create_issue
+
+
+class SearchServicesTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1)
+        self.project1 = create_project(1, self.user1)
+        self.project2 = create_project(2, self.user1)
+
+        self.issue1 = create_issue(1, self.user1, self.project1)
+        self.issue1.subject = "Login button"
+        self.issue1.description = "The login button of the home page doesn't work"
+        self.issue1.save()
+
+        self.issue2 = create_issue(2, self.user1, self.project1)
+        self.issue2.subject = "Logout"
+        self.issue2.description = "Buttons"
+        self.issue2.save()
+
+        self.issue3 = create_issue(3, self.user1, self.project2)
+        self.issue3.subject = "Login button"
+        self.issue3.save()
+
+    def test_get_prefix_query(self):
+        self.assertEqual(services.get_prefix_query("Login but"), "'login':* & 'but':*")
+        self.assertEqual(services.get_prefix_query("' & !"), None)
+
+    def test_search(self):
+        self.assertEqual(list(services.search(Issue, self.project1, "log butt")),
+                         [self.issue1, self.issue2])
+        self.assertEqual(list(services.search(Issue, self.project1, "logo")), [self.issue2])
+        self.assertEqual(list(services.search(Issue, self.project1, "home page")),
+                         [self.issue1])
+        self.assertEqual(list(services.search(Issue, self.project1, "")), [])
+
+    def test_search_vector_is_updated(self):
+        self.issue2.subject = "Home"
+        self.issue2.save()
+        self.assertEqual(set(services.search(Issue, self.project1, "home")),
+                         set([self.issue1, self.issue2]))
+
+    @override_settings(MAX_SEARCH_RESULTS=1)
+    def test_search_limit(self):
+        self.assertEqual(list(services.search(Issue, self.project1, "button")), [self.issue1])
+
+    def test_search_page(self):
+        fields = ("id", "ref", "subject")
+        rows, cursor = services.search_page(Issue, fields, self.project1, "button", limit=1)
+        self.assertEqual([row["id"] for row in rows], [self.issue1.id])
+        self.assertEqual(set(rows[0]), set(fields + ("rank",)))
+
+        rows, cursor = services.search_page(Issue, fields, self.project1, "button",
+                                            cursor=cursor, limit=1)
+        self.assertEqual([row["id"] for row in rows], [self.issue2.id])
+        self.assertEqual(cursor, None)
+
+    def test_search_page_with_equal_ranks(self):
+        issues = [create_issue(i, self.user1, self.project1) for i in range(4, 8)]
+        for issue in issues:
+            issue.subject = "Settings"
+            issue.save()
+
+        fields = ("id", "ref", "subject")
+        rows, cursor = services.search_page(Issue, fields, self.project1, "settings", limit=3)
+        self.assertEqual(services.decode_cursor(cursor), {"id": issues[2].id})
+
+        next_rows, cursor = services.search_page(Issue, fields, self.project1, "settings",
+                                                 cursor=cursor, limit=3)
+        self.assertEqual([row["id"] for row in rows + next_rows], [issue.id for issue in issues])
+        self.assertEqual(cursor, None)
+
+    def test_search_page_after_a_deleted_result(self):
+        issue4 = create_issue(4, self.user1, self.project1)
+        issue4.subject = "Logout button"
+        issue4.save()
+
+        fields = ("id", "ref", "subject")
+        rows, cursor = services.search_page(Issue, fields, self.project1, "button", limit=1)
+        self.assertEqual([row["id"] for row in rows], [self.issue1.id])
+
+        self.issue1.delete()
+        rows, cursor = services.search_page(Issue, fields, self.project1, "button",
+                                            cursor=cursor, limit=5)
+        self.assertEqual(set(row["id"] for row in rows), set([self.issue2.id, issue4.id]))
+
+    def test_search_page_get_all(self):
+        issue4 = create_issue(4, self.user1, self.project1)
+        fields = ("id", "ref", "subject")
+
+        rows, cursor = services.search_page(Issue, fields, self.project1, "", get_all=True,
+                                            limit=2)
+        self.assertEqual([row["id"] for row in rows], [self.issue1.id, self.issue2.id])
+
+        rows, cursor = services.search_page(Issue, fields, self.project1, "", get_all=True,
+                                            cursor=cursor, limit=2)
+        self.assertEqual([row["id"] for row in rows], [issue4.id])
+        self.assertEqual(cursor, None)
+
+    def test_search_project(self):
+        results = services.search_project(self.project1, "login")
+        self.assertEqual(set(results), set(["userstories", "tasks", "issues", "wikipages"]))
+        self.assertEqual([row["subject"] for row in results["issues"][0]], ["Login button"])
+        self.assertEqual(results["userstories"], ([], None))
+
+        with self.assertRaises(ValueError):
+            services.search_project(self.project1, "login", cursors={"issues": "foo"})
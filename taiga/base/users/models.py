@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 
 from django.db import models
+from django.db.models.loading import get_model
 from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.auth.models import UserManager, AbstractUser
 
-from taiga.base.utils.slug import slugify_uniquely
+from taiga.base.utils.slug import save_uniquely_slugified
 from taiga.base.notifications.models import WatcherMixin
 
+import functools
 import random
 
 
@@ -46,6 +48,17 @@ class User(AbstractUser, WatcherMixin):
     def get_full_name(self):
         return super().get_full_name() or self.username or self.email
 
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        self._without_password = False
+
+    def save(self, *args, **kwargs):
+        if getattr(self, "_without_password", False) and kwargs.get("update_fields") is None:
+            # Loaded from the authentication cache, without its password hash
+            kwargs["update_fields"] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name != "password"]
+        super().save(*args, **kwargs)
+
 
 class Role(models.Model):
     name = models.CharField(max_length=200, null=False, blank=False,
@@ -62,7 +75,10 @@ class Role(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify_uniquely(self.name, self.__class__)
+            # The slugs are unique for each project
+            return save_uniquely_slugified(self, self.name,
+                                           functools.partial(super().save, *args, **kwargs),
+                                           filters={"project_id": self.project_id})
 
         super().save(*args, **kwargs)
 
@@ -92,3 +108,36 @@ def role_post_save(sender, instance, created, **kwargs):
     for project in unique_projects:
         project.update_role_points()
 
+
+
+# On Role permissions are changed, invalidate the cached
+# project permissions of the role members.
+@receiver(models.signals.m2m_changed, sender=Role.permissions.through,
+          dispatch_uid="role_permissions_m2m_changed")
+def role_permissions_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    from taiga.base.permissions import invalidate_project_perms
+
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+
+    if not reverse:
+        roles = [instance]
+    elif pk_set:
+        roles = Role.objects.filter(pk__in=pk_set)
+    else:
+        roles = instance.roles.all()
+
+    memberships_model = get_model("projects", "Membership")
+    memberships = memberships_model.objects.filter(role__in=roles)
+    invalidate_project_perms(memberships.values_list("user_id", "project_id"))
+
+
+# On User object is changed or deleted, remove
+# it from the authentication cache.
+@receiver(models.signals.post_save, sender=User,
+          dispatch_uid="user_post_save_invalidate_auth_cache")
+@receiver(models.signals.post_delete, sender=User,
+          dispatch_uid="user_post_delete_invalidate_auth_cache")
+def user_invalidate_auth_cache(sender, instance, **kwargs):
+    from taiga.base.auth import invalidate_cached_user
+    invalidate_cached_user(instance.pk)
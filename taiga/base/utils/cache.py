@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.exceptions import ImproperlyConfigured
+
+# The cache backends that aren't shared by the processes of
+# the server (so the invalidations only reach one of them).
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def get_shared_cache_timeout(setting_name):
+    """
+    Get the timeout of a setting of something cached (None if it's
+    disabled). Raise ImproperlyConfigured if it's enabled and the
+    default cache isn't shared by all the processes.
+    """
+    timeout = getattr(settings, setting_name, None)
+    if timeout is None:
+        return None
+
+    backend = settings.CACHES.get(DEFAULT_CACHE_ALIAS, {}).get("BACKEND", "")
+    if backend in LOCAL_CACHE_BACKENDS:
+        raise ImproperlyConfigured("{0} needs a default cache shared by all the processes "
+                                   "(not {1})".format(setting_name, backend))
+    return timeout
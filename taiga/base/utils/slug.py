@@ -1,38 +1,82 @@
 # -*- coding: utf-8 -*-
 
+from django.db import connection, transaction, IntegrityError
 from django.utils import baseconv
 from django.template.defaultfilters import slugify
 
-import time
+from contextlib import closing
+import re
 
 
-def slugify_uniquely(value, model, slugfield="slug"):
+def slugify_uniquely(value, model, slugfield="slug", filters=None):
     """
     Returns a slug on a name which is unique within a model's table
+    (or within the objects that match the filters).
+
+    The next free suffix is found with only one query: the max of the
+    suffixes of the slugs `base` and `base-<number>`.
+    """
+    base = slugify(value) or "null"
+
+    qn = connection.ops.quote_name
+    column = "{0}.{1}".format(qn(model._meta.db_table), qn(model._meta.get_field(slugfield).column))
+    suffix_sql = "COALESCE(CAST(NULLIF(SUBSTRING({0} FROM %s), '') AS bigint), 0)".format(column)
+
+    qs = model.objects.filter(**(filters or {}))
+    qs = qs.filter(**{"{0}__regex".format(slugfield): r"^{0}(-[0-9]{{1,18}})?$".format(re.escape(base))})
+    qs = qs.extra(select={"slug_suffix": suffix_sql}, select_params=[len(base) + 2])
+    suffixes = list(qs.order_by("-slug_suffix").values_list("slug_suffix", flat=True)[:1])
+
+    if not suffixes:
+        return base
+    return "-".join([base, str(suffixes[0] + 1)])
+
+
+def save_uniquely_slugified(instance, value, save, slugfield="slug", filters=None, retries=5):
+    """
+    Save a new object with a unique slug on a name (see
+    slugify_uniquely) calling `save`.
+
+    The slug is not locked, so if another object gets the same one
+    first the save raises an IntegrityError, and then the slug is
+    found and the object saved again (up to `retries` times).
     """
+    model = instance.__class__
+    for retry in range(retries, 0, -1):
+        slug = slugify_uniquely(value, model, slugfield, filters)
+        setattr(instance, slugfield, slug)
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            slug_filters = dict(filters or {}, **{slugfield: slug})
+            if retry == 1 or not model.objects.filter(**slug_filters).exists():
+                raise
+
+
+def reserve_refs(project, seq_field, count=1):
+    """
+    Reserve a block of `count` consecutive refs of a project and
+    return them (as a range).
+
+    The counter of the project is incremented with only one atomic
+    UPDATE ... RETURNING, so concurrent creations never get the same
+    ref and bulk creations only update it once.
+    """
+    qn = connection.ops.quote_name
+    column = project._meta.get_field(seq_field).column
+    sql = ("UPDATE {table} SET {column} = COALESCE({column}, 0) + %s "
+           "WHERE {pk} = %s RETURNING {column}").format(table=qn(project._meta.db_table),
+                                                       column=qn(column),
+                                                       pk=qn(project._meta.pk.column))
+
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(sql, [count, project.pk])
+        last_ref = cursor.fetchone()[0]
+
+    setattr(project, seq_field, last_ref)
+    return range(last_ref - count + 1, last_ref + 1)
+
 
-    suffix = 0
-    potential = base = slugify(value)
-    if len(potential) == 0:
-        potential = 'null'
-    while True:
-        if suffix:
-            potential = "-".join([base, str(suffix)])
-        if not model.objects.filter(**{slugfield: potential}).count():
-            return potential
-        suffix += 1
-
-
-def ref_uniquely(p, seq_field,  model, field='ref'):
-    project = p.__class__.objects.select_for_update().get(pk=p.pk)
-    ref = getattr(project, seq_field) + 1
-
-    while True:
-        params = {field: ref, 'project': project}
-        if not model.objects.filter(**params).exists():
-            setattr(project, seq_field, ref)
-            project.save(update_fields=[seq_field])
-            return ref
-
-        time.sleep(0.0002)
-        ref += 1
+def next_ref(project, seq_field):
+    return reserve_refs(project, seq_field)[0]
@@ -10,6 +10,14 @@ class BaseEventsPushBackend(object, metaclass=abc.ABCMeta):
     def emit_event(self, message:str, *, channel:str="events"):
         pass
 
+    def emit_events(self, messages:list, *, channel:str="events"):
+        """
+        Emit a batch of messages. Backends that can send them
+        at once should override it.
+        """
+        for message in messages:
+            self.emit_event(message, channel=channel)
+
 
 def load_class(path):
     """
@@ -0,0 +1,26 @@
+import collections
+import queue
+
+from . import base
+
+_queues = collections.defaultdict(queue.Queue)
+
+
+def get_queue(channel:str="events") -> queue.Queue:
+    """
+    Get the queue of the emitted messages of a channel.
+    """
+    return _queues[channel]
+
+
+def clear_queues():
+    _queues.clear()
+
+
+class EventsPushBackend(base.BaseEventsPushBackend):
+    """
+    Keep the emitted events on in-process queues (one for each
+    channel). Useful for tests and benchmarks.
+    """
+    def emit_event(self, message:str, *, channel:str="events"):
+        get_queue(channel).put(message)
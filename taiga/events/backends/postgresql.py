@@ -11,3 +11,10 @@ class EventsPushBackend(base.BaseEventsPushBackend):
         cursor = connection.cursor()
         cursor.execute(sql, [message])
         cursor.close()
+
+    @transaction.atomic
+    def emit_events(self, messages:list, *, channel:str="events"):
+        sql = "SELECT pg_notify(%s, message) FROM unnest(%s::text[]) AS message"
+        cursor = connection.cursor()
+        cursor.execute(sql, [channel, list(messages)])
+        cursor.close()
@@ -0,0 +1,66 @@
+import errno
+import logging
+import socket
+
+from contextlib import closing
+
+from . import base
+
+log = logging.getLogger("taiga.events")
+
+
+# Errors of the sends to the relay that don't fail the request: there
+# is no relay listening, its queue is full or the message is too big.
+DROPPED_EVENTS_ERRNOS = (errno.ENOENT, errno.ECONNREFUSED, errno.EAGAIN, errno.EWOULDBLOCK,
+                         errno.ENOBUFS, errno.EMSGSIZE)
+
+
+class EventsPushBackend(base.BaseEventsPushBackend):
+    """
+    Send the events as datagrams to the unix socket where an
+    events relay is listening, that fans them out to its
+    clients. It doesn't use the database and it never waits
+    for the relay: the events are lost (with a warning) if
+    there is no relay or it can't receive them.
+
+    Each datagram is "<channel>\\n<message>".
+    """
+    def __init__(self, path:str="/tmp/taiga-events.sock"):
+        self.path = path
+
+    def emit_event(self, message:str, *, channel:str="events"):
+        self.emit_events([message], channel=channel)
+
+    def emit_events(self, messages:list, *, channel:str="events"):
+        with closing(socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)) as sock:
+            sock.setblocking(False)
+            try:
+                sock.connect(self.path)
+            except OSError as e:
+                if e.errno not in DROPPED_EVENTS_ERRNOS:
+                    raise
+                log.warning("No events relay listening on %s, %s events lost",
+                            self.path, len(messages))
+                return
+
+            lost_messages, error = 0, None
+            for message in messages:
+                try:
+                    sock.send("{0}\n{1}".format(channel, message).encode("utf-8"))
+                except OSError as e:
+                    if e.errno not in DROPPED_EVENTS_ERRNOS:
+                        raise
+                    lost_messages, error = lost_messages + 1, e
+
+            if lost_messages:
+                log.warning("Events not sent to the events relay on %s (%s), %s events lost",
+                            self.path, error.strerror, lost_messages)
+
+
+def parse_datagram(data:bytes):
+    """
+    Get the (channel, message) of a datagram sent by the
+    unix socket events backend.
+    """
+    channel, message = data.decode("utf-8").split("\n", 1)
+    return channel, message
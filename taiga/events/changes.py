@@ -1,6 +1,9 @@
+import collections
 import json
+import threading
+
+from django.db import transaction
 
-from django.contrib.contenttypes.models import ContentType
 from . import backends
 
 # The complete list of content types
@@ -10,38 +13,147 @@ watched_types = (
     ("issues", "issue"),
 )
 
+_local = threading.local()
+
 
 def _get_type_for_model(model_instance):
     """
     Get content type tuple from model instance.
     """
-    ct = ContentType.objects.get_for_model(model_instance)
-    return (ct.app_label, ct.model)
+    opts = model_instance._meta
+    return (opts.app_label, opts.model_name)
 
 
-def emit_change_event_for_model(model_instance, sessionid:str, *,
-                                type:str="change", channel:str="events"):
-    """
-    Emit change event for notify of model change to
-    all connected frontends.
-    """
+def _make_change(model_instance, type:str):
     content_type = _get_type_for_model(model_instance)
 
     assert hasattr(model_instance, "project_id")
     assert content_type in watched_types
     assert type in ("create", "change", "delete")
 
-    project_id = model_instance.project_id
-    routing_key = "project.{0}".format(project_id)
+    return {"routing_key": "project.{0}".format(model_instance.project_id),
+            "type": type,
+            "matches": ".".join(content_type),
+            "pk": model_instance.pk}
+
+
+def _merge_change_types(old_type:str, new_type:str):
+    """
+    Get the type of the change that has the same effect that
+    two consecutive changes of the same object (None if the
+    object is created and deleted).
+    """
+    if new_type == "delete":
+        return None if old_type == "create" else "delete"
+    if old_type in ("create", "delete"):
+        return old_type
+    return new_type
+
 
-    data = {"type": "model-changes",
-            "routing_key": routing_key,
-            "session_id": sessionid,
-            "data": {
-                "type": type,
-                "matches": ".".join(content_type),
-                "pk": model_instance.pk}}
+def emit_change_events(changes, sessionid:str, *, channel:str="events"):
+    """
+    Emit the given changes, with one message for each one
+    but sent to the backend together.
+    """
+    messages = []
+    for change in changes:
+        data = {"type": "model-changes",
+                "routing_key": change["routing_key"],
+                "session_id": sessionid,
+                "data": {"type": change["type"],
+                         "matches": change["matches"],
+                         "pk": change["pk"]}}
+        messages.append(json.dumps(data))
 
     backend = backends.get_events_backend()
-    return backend.emit_event(json.dumps(data), channel="events")
+    if len(messages) == 1:
+        return backend.emit_event(messages[0], channel=channel)
+    return backend.emit_events(messages, channel=channel)
+
+
+def _emit_committed_changes(changes, sessionid:str, channel:str):
+    events_buffer = get_events_buffer()
+    if events_buffer is not None:
+        for change in changes:
+            events_buffer.add(change, sessionid, channel)
+        return
+
+    emit_change_events(changes, sessionid, channel=channel)
+
+
+class EventsBuffer(object):
+    """
+    Changes waiting to be emitted, only the last one of each
+    object (with the type of all of them merged).
+    """
+    def __init__(self):
+        self.changes = collections.OrderedDict()
+
+    def add(self, change, sessionid:str, channel:str):
+        key = (channel, sessionid, change["matches"], change["pk"])
+        if key in self.changes:
+            type = _merge_change_types(self.changes[key]["type"], change["type"])
+            if type is None:
+                del self.changes[key]
+                return
+            change = dict(change, type=type)
+
+        self.changes[key] = change
+
+    def flush(self):
+        changes_by_session = collections.OrderedDict()
+        for (channel, sessionid, matches, pk), change in self.changes.items():
+            changes_by_session.setdefault((channel, sessionid), []).append(change)
+
+        self.changes.clear()
+        for (channel, sessionid), changes in changes_by_session.items():
+            emit_change_events(changes, sessionid, channel=channel)
+
+
+def get_events_buffer():
+    return getattr(_local, "events_buffer", None)
+
+
+def start_events_buffer():
+    """
+    Keep the (already committed) change events of the current
+    thread on a buffer until it's flushed.
+    """
+    _local.events_buffer = EventsBuffer()
+
+
+def flush_events_buffer():
+    events_buffer = get_events_buffer()
+    _local.events_buffer = None
+
+    if events_buffer is not None:
+        events_buffer.flush()
+
+
+def emit_change_event_for_model(model_instance, sessionid:str, *,
+                                type:str="change", channel:str="events"):
+    """
+    Emit change event for notify of model change to
+    all connected frontends.
+
+    The event is emitted when the current transaction commits
+    (never if it's rolled back) or, if there is an events buffer
+    (on a request), when the buffer is flushed.
+    """
+    change = _make_change(model_instance, type)
+    transaction.on_commit(lambda: _emit_committed_changes([change], sessionid, channel))
+
+
+def emit_change_events_for_models(model_instances, sessionid:str, *,
+                                  type:str="change", channel:str="events"):
+    """
+    Emit the change events of some objects (the ones of the
+    watched types) together, for the objects saved without
+    signals (like on bulk creations).
+    """
+    changes = [_make_change(model_instance, type) for model_instance in model_instances
+                   if _get_type_for_model(model_instance) in watched_types]
+    if not changes:
+        return
 
+    transaction.on_commit(lambda: _emit_committed_changes(changes, sessionid, channel))
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import closing, contextmanager
+from optparse import make_option
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from taiga.events.backends import get_events_backend
+from taiga.events.backends import memory
+
+BACKENDS = {
+    "postgresql": "taiga.events.backends.postgresql.EventsPushBackend",
+    "unix_socket": "taiga.events.backends.unix_socket.EventsPushBackend",
+    "memory": "taiga.events.backends.memory.EventsPushBackend",
+}
+
+
+def _drain_socket(sock, stop_event):
+    while not stop_event.is_set():
+        try:
+            sock.recv(65536)
+        except socket.timeout:
+            pass
+
+
+class Command(BaseCommand):
+    help = ("Measure the throughput (events/sec) of the events backends with some "
+            "concurrent emitters.")
+
+    option_list = BaseCommand.option_list + (
+        make_option("--backends", action="store", dest="backends",
+                    default="postgresql,unix_socket,memory",
+                    help="Comma separated list of backends ({0}).".format(
+                        ", ".join(sorted(BACKENDS)))),
+        make_option("--emitters", action="store", dest="emitters", default="1,10,100",
+                    help="Comma separated list of numbers of concurrent emitters."),
+        make_option("--events", action="store", type="int", dest="events", default=1000,
+                    help="Number of events emitted by each emitter."),
+        make_option("--batch-size", action="store", type="int", dest="batch_size", default=1,
+                    help="Number of events emitted on each call (with emit_events)."),
+    )
+
+    def handle(self, *args, **options):
+        try:
+            backends = [(name, BACKENDS[name]) for name in options["backends"].split(",")]
+            emitters_list = [int(emitters) for emitters in options["emitters"].split(",")]
+        except (KeyError, ValueError) as e:
+            raise CommandError("Invalid option: {0}".format(e))
+
+        message = json.dumps({"type": "model-changes", "routing_key": "project.1",
+                              "session_id": None,
+                              "data": [{"type": "change", "matches": "issues.issue", "pk": 1}]})
+
+        for name, path in backends:
+            for emitters in emitters_list:
+                with self._backend_options(name) as backend_options:
+                    elapsed = self._run(path, backend_options, emitters, message, **options)
+
+                total_events = emitters * options["events"]
+                self.stdout.write("{0:12} {1:4} emitters: {2:10.0f} events/sec".format(
+                    name, emitters, total_events / elapsed))
+
+    @contextmanager
+    def _backend_options(self, name):
+        if name != "unix_socket":
+            yield {}
+            memory.clear_queues()
+            return
+
+        # A receiver that discards the events, like a relay without clients
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, "events.sock")
+        stop_event = threading.Event()
+
+        with closing(socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)) as sock:
+            sock.bind(path)
+            sock.settimeout(0.1)
+            receiver = threading.Thread(target=_drain_socket, args=(sock, stop_event))
+            receiver.start()
+            try:
+                yield {"path": path}
+            finally:
+                stop_event.set()
+                receiver.join()
+                os.unlink(path)
+                os.rmdir(tmp_dir)
+
+    def _run(self, path, backend_options, emitters, message, **options):
+        batches = [options["batch_size"]] * (options["events"] // options["batch_size"])
+        if options["events"] % options["batch_size"]:
+            batches.append(options["events"] % options["batch_size"])
+
+        start_barrier = threading.Barrier(emitters + 1)
+
+        def _emit():
+            backend = get_events_backend(path, backend_options)
+            start_barrier.wait()
+            try:
+                for batch_size in batches:
+                    if batch_size == 1:
+                        backend.emit_event(message, channel="events_benchmark")
+                    else:
+                        backend.emit_events([message] * batch_size, channel="events_benchmark")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=_emit) for i in range(emitters)]
+        for thread in threads:
+            thread.start()
+
+        start_barrier.wait()
+        start = time.time()
+        for thread in threads:
+            thread.join()
+        return time.time() - start
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+from optparse import make_option
+import asyncio
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from taiga.events import relay
+
+
+class Command(BaseCommand):
+    help = ("Run the events relay: receive the events and send them, with server-sent "
+            "events, to the clients subscribed to their routing keys.")
+
+    option_list = BaseCommand.option_list + (
+        make_option("--host", action="store", dest="host", default="127.0.0.1",
+                    help="Address of the events server."),
+        make_option("--port", action="store", type="int", dest="port", default=8888,
+                    help="Port of the events server."),
+        make_option("--source", action="store", dest="source", default="postgresql",
+                    help="Where the events are received from: postgresql or unix_socket."),
+        make_option("--path", action="store", dest="path", default="/tmp/taiga-events.sock",
+                    help="Path of the unix socket (with --source=unix_socket)."),
+        make_option("--channel", action="store", dest="channel", default="events",
+                    help="Events channel."),
+        make_option("--max-queue-size", action="store", type="int", dest="max_queue_size",
+                    default=100, help="Pending messages of a client before closing it."),
+    )
+
+    def handle(self, *args, **options):
+        loop = asyncio.get_event_loop()
+        router = relay.Router()
+
+        if options["source"] == "postgresql":
+            relay.listen_postgresql(router, options["channel"], loop=loop)
+        elif options["source"] == "unix_socket":
+            if os.path.exists(options["path"]):
+                os.unlink(options["path"])
+            relay.listen_unix_socket(router, options["path"], options["channel"], loop=loop)
+        else:
+            raise CommandError("Invalid events source: {0}".format(options["source"]))
+
+        server = relay.SSEServer(router, max_queue_size=options["max_queue_size"], loop=loop)
+        loop.run_until_complete(server.start(options["host"], options["port"]))
+
+        self.stdout.write("Events relay listening on {0}:{1}".format(options["host"],
+                                                                     options["port"]))
+        try:
+            loop.run_forever()
+        except KeyboardInterrupt:
+            pass
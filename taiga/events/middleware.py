@@ -1,5 +1,7 @@
 import threading
 
+from . import changes
+
 _local = threading.local()
 _local.session_id = None
 
@@ -40,3 +42,20 @@ class SessionIDMiddleware(object):
         _local.session_id = None
 
         return response
+
+
+class EventsBufferMiddleware(object):
+    """
+    Middleware for keep the change events of a request on a
+    buffer, emitted (with the duplicated ones collapsed) when
+    the request ends. Only the changes of the committed
+    transactions reach the buffer, so it's flushed even if
+    the request fails.
+    """
+
+    def process_request(self, request):
+        changes.start_events_buffer()
+
+    def process_response(self, request, response):
+        changes.flush_events_buffer()
+        return response
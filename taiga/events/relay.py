@@ -0,0 +1,316 @@
+"""
+Events relay: it receives the events emitted by the events
+backends (from a postgresql LISTEN or from the unix socket
+backend) and sends them to the subscribed clients of their
+routing keys with server-sent events (SSE).
+
+A client subscribes with:
+
+    GET /events?token=<auth token>&routing_key=project.1&session_id=<id>
+
+and only receives the events of the projects where its user is a
+member, without the ones emitted by its own session.
+"""
+
+from contextlib import closing
+import asyncio
+import json
+import logging
+import socket
+import urllib.parse
+
+from django.db import close_old_connections
+from django.db import connections
+from django.db.models import Q
+from django.db.models.loading import get_model
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from taiga.base import auth
+from taiga.base import exceptions as exc
+
+from .backends import unix_socket
+
+log = logging.getLogger("taiga.events")
+
+
+class Client(object):
+    """
+    A subscriber with its own bounded queue of messages. When the
+    queue is full (the client is slower than the events), the
+    client is closed and it must reconnect.
+    """
+    def __init__(self, routing_keys, session_id=None, *, max_queue_size=100, loop=None):
+        self.routing_keys = set(routing_keys)
+        self.session_id = session_id
+        self.queue = asyncio.Queue(maxsize=max_queue_size + 1, loop=loop)
+        self.max_queue_size = max_queue_size
+        self.closed = False
+
+    def put(self, message:str):
+        if self.closed:
+            return False
+
+        if self.queue.qsize() >= self.max_queue_size:
+            self.close()
+            return False
+
+        self.queue.put_nowait(message)
+        return True
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            # Wake up the client with the end of stream mark
+            self.queue.put_nowait(None)
+
+
+class Router(object):
+    def __init__(self):
+        self.subscribers = {}
+
+    def subscribe(self, client):
+        for routing_key in client.routing_keys:
+            self.subscribers.setdefault(routing_key, set()).add(client)
+
+    def unsubscribe(self, client):
+        for routing_key in client.routing_keys:
+            clients = self.subscribers.get(routing_key, set())
+            clients.discard(client)
+            if not clients:
+                self.subscribers.pop(routing_key, None)
+
+    def route(self, message:str):
+        """
+        Send a message to the subscribers of its routing key,
+        except the client of the session that emitted it. Return
+        the number of clients that have received it.
+        """
+        try:
+            data = json.loads(message)
+            routing_key = data["routing_key"]
+        except (ValueError, KeyError, TypeError):
+            log.warning("Invalid event message: %r", message)
+            return 0
+
+        session_id = data.get("session_id", None)
+        count = 0
+        for client in list(self.subscribers.get(routing_key, ())):
+            if session_id is not None and client.session_id == session_id:
+                continue
+
+            if client.put(message):
+                count += 1
+            else:
+                self.unsubscribe(client)
+
+        return count
+
+
+def get_allowed_routing_keys(token:str, routing_keys:list):
+    """
+    Get the routing keys of the projects where the user of the
+    token is a member (or the owner).
+    """
+    user = auth.get_user_for_token(token)
+    project_model = get_model("projects", "Project")
+    qs = project_model.objects.filter(Q(owner=user) | Q(memberships__user=user))
+    allowed_routing_keys = set("project.{0}".format(project_id)
+                                   for project_id in qs.values_list("id", flat=True))
+    return [routing_key for routing_key in routing_keys if routing_key in allowed_routing_keys]
+
+
+class SSEServer(object):
+    def __init__(self, router, *, authorize=get_allowed_routing_keys, max_queue_size=100,
+                 keepalive=15, loop=None):
+        self.router = router
+        self.authorize = authorize
+        self.max_queue_size = max_queue_size
+        self.keepalive = keepalive
+        self.loop = loop or asyncio.get_event_loop()
+
+    @asyncio.coroutine
+    def _read_request(self, reader):
+        request_line = yield from reader.readline()
+        while True:
+            line = yield from reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+
+        method, target, version = request_line.decode("latin-1").split(" ", 2)
+        url = urllib.parse.urlsplit(target)
+        return method, url.path, urllib.parse.parse_qs(url.query)
+
+    def _authorize_in_thread(self, token:str, routing_keys:list):
+        # The threads of the executor keep their own connections
+        close_old_connections()
+        try:
+            return self.authorize(token, routing_keys)
+        finally:
+            close_old_connections()
+
+    def _write_error(self, writer, status:str):
+        writer.write("HTTP/1.1 {0}\r\nContent-Length: 0\r\n"
+                     "Connection: close\r\n\r\n".format(status).encode("latin-1"))
+
+    @asyncio.coroutine
+    def handle_client(self, reader, writer):
+        try:
+            try:
+                method, path, params = yield from self._read_request(reader)
+            except ValueError:
+                return self._write_error(writer, "400 Bad Request")
+
+            if method != "GET" or path.rstrip("/") != "/events":
+                return self._write_error(writer, "404 Not Found")
+
+            try:
+                routing_keys = yield from self.loop.run_in_executor(
+                    None, self._authorize_in_thread, params.get("token", [""])[0],
+                    params.get("routing_key", []))
+            except exc.NotAuthenticated:
+                return self._write_error(writer, "401 Unauthorized")
+
+            if not routing_keys:
+                return self._write_error(writer, "403 Forbidden")
+
+            client = Client(routing_keys, params.get("session_id", [None])[0],
+                            max_queue_size=self.max_queue_size, loop=self.loop)
+            self.router.subscribe(client)
+            try:
+                yield from self._stream(client, writer)
+            finally:
+                client.close()
+                self.router.unsubscribe(client)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @asyncio.coroutine
+    def _stream(self, client, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\n"
+                     b"Access-Control-Allow-Origin: *\r\n"
+                     b"Connection: close\r\n\r\n")
+
+        while True:
+            try:
+                message = yield from asyncio.wait_for(client.queue.get(), self.keepalive,
+                                                      loop=self.loop)
+            except asyncio.TimeoutError:
+                writer.write(b": keepalive\n\n")
+            else:
+                if message is None:
+                    break
+                writer.write("data: {0}\n\n".format(message).encode("utf-8"))
+
+            # Wait for the socket buffer of slow clients
+            yield from writer.drain()
+
+    def start(self, host:str, port:int):
+        return asyncio.start_server(self.handle_client, host, port, loop=self.loop)
+
+
+class PostgresqlListener(object):
+    """
+    LISTEN on a postgresql channel with its own connection and
+    route its notifications. When the connection is lost (or it
+    can't connect), it reconnects with an exponential backoff;
+    the events notified meanwhile are lost.
+    """
+    def __init__(self, router, channel:str="events", *, loop=None, using:str="default",
+                 min_backoff:float=1, max_backoff:float=30):
+        self.router = router
+        self.channel = channel
+        self.loop = loop or asyncio.get_event_loop()
+        self.using = using
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.backoff = min_backoff
+        self.connection = None
+
+    def connect(self):
+        wrapper = connections[self.using]
+        try:
+            connection = wrapper.get_new_connection(wrapper.get_connection_params())
+            connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with closing(connection.cursor()) as cursor:
+                cursor.execute("LISTEN {channel};".format(channel=self.channel))
+        except psycopg2.Error as e:
+            log.warning("Can't listen on postgresql (%s), retrying in %s seconds",
+                        str(e).strip(), self.backoff)
+            self._reconnect_later()
+            return
+
+        self.connection = connection
+        self.backoff = self.min_backoff
+        self.loop.add_reader(connection.fileno(), self._on_notifications)
+
+    def close(self):
+        if self.connection is not None:
+            self.loop.remove_reader(self.connection.fileno())
+            self.connection.close()
+            self.connection = None
+
+    def _reconnect_later(self):
+        self.loop.call_later(self.backoff, self.connect)
+        self.backoff = min(self.backoff * 2, self.max_backoff)
+
+    def _on_notifications(self):
+        try:
+            self.connection.poll()
+        except psycopg2.Error as e:
+            log.warning("Lost the postgresql connection (%s), reconnecting", str(e).strip())
+            self.loop.remove_reader(self.connection.fileno())
+            self.connection.close()
+            self.connection = None
+            self._reconnect_later()
+            return
+
+        while self.connection.notifies:
+            notify = self.connection.notifies.pop(0)
+            self.router.route(notify.payload)
+
+
+def listen_postgresql(router, channel:str="events", *, loop=None, using:str="default",
+                      **kwargs):
+    """
+    Start a PostgresqlListener of a channel that routes its
+    notifications.
+    """
+    listener = PostgresqlListener(router, channel, loop=loop, using=using, **kwargs)
+    listener.connect()
+    return listener
+
+
+def listen_unix_socket(router, path:str, channel:str="events", *, loop=None):
+    """
+    Receive the events of the unix socket events backend and
+    route the ones of the given channel.
+    """
+    loop = loop or asyncio.get_event_loop()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.bind(path)
+    sock.setblocking(False)
+
+    def _on_datagrams():
+        while True:
+            try:
+                data = sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+
+            try:
+                message_channel, message = unix_socket.parse_datagram(data)
+            except ValueError:
+                log.warning("Invalid event datagram: %r", data)
+                continue
+
+            if message_channel == channel:
+                router.route(message)
+
+    loop.add_reader(sock.fileno(), _on_datagrams)
+    return sock
@@ -1,14 +1,27 @@
+from contextlib import closing
+import asyncio
+import json
+import os
+import socket
+import tempfile
 
 from django import test
+from django.db import connection
+from django.db import transaction
 from django.test.client import RequestFactory
 from django.http import HttpResponse
 
 from taiga.projects.tests import create_project
 from taiga.projects.issues.tests import create_issue
 from taiga.base.users.tests import create_user
+from taiga.base import exceptions as exc
 
 from . import middleware as mw
 from . import changes as ch
+from . import relay
+from .backends import get_events_backend
+from .backends import memory
+from .backends import unix_socket
 
 
 class SessionIDMiddlewareTests(test.TestCase):
@@ -37,7 +50,7 @@ class SessionIDMiddlewareTests(test.TestCase):
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
-class ChangesTest(test.TestCase):
+class ChangesTest(test.TransactionTestCase):
     fixtures = ["initial_domains.json"]
 
     def test_emit_change_for_model(self):
@@ -48,3 +61,284 @@ class ChangesTest(test.TestCase):
         with patch("taiga.events.backends.get_events_backend") as mock_instance:
             ch.emit_change_event_for_model(issue, "sessionid")
             self.assertTrue(mock_instance.return_value.emit_event.called)
+
+    def test_emit_change_for_model_without_queries(self):
+        user = create_user(1) # Project owner
+        project = create_project(1, user)
+        issue = create_issue(1, user, project)
+
+        with patch("taiga.events.backends.get_events_backend") as mock_instance:
+            with self.assertNumQueries(0):
+                ch.emit_change_event_for_model(issue, "sessionid")
+
+            message = json.loads(mock_instance.return_value.emit_event.call_args[0][0])
+            self.assertEqual(message["routing_key"], "project.{0}".format(project.id))
+            self.assertEqual(message["data"], {"type": "change", "matches": "issues.issue",
+                                               "pk": issue.id})
+
+    def test_emit_change_when_the_transaction_commits(self):
+        user = create_user(1) # Project owner
+        project = create_project(1, user)
+        issue = create_issue(1, user, project)
+
+        with patch("taiga.events.backends.get_events_backend") as mock_instance:
+            with transaction.atomic():
+                ch.emit_change_event_for_model(issue, "sessionid")
+                self.assertFalse(mock_instance.return_value.emit_event.called)
+
+            self.assertTrue(mock_instance.return_value.emit_event.called)
+
+    def test_discard_changes_of_rolled_back_savepoints(self):
+        user = create_user(1) # Project owner
+        project = create_project(1, user)
+        issue1 = create_issue(1, user, project)
+        issue2 = create_issue(2, user, project)
+
+        with patch("taiga.events.backends.get_events_backend") as mock_instance:
+            with transaction.atomic():
+                ch.emit_change_event_for_model(issue1, "sessionid")
+                try:
+                    with transaction.atomic():
+                        ch.emit_change_event_for_model(issue2, "sessionid")
+                        raise ValueError("rollback")
+                except ValueError:
+                    pass
+
+            self.assertEqual(mock_instance.return_value.emit_event.call_count, 1)
+            message = json.loads(mock_instance.return_value.emit_event.call_args[0][0])
+            self.assertEqual(message["data"]["pk"], issue1.id)
+
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    ch.emit_change_event_for_model(issue1, "sessionid")
+                    raise ValueError("rollback")
+
+            self.assertEqual(mock_instance.return_value.emit_event.call_count, 1)
+
+
+class EventsBufferTest(test.TransactionTestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = create_user(1)
+        self.project1 = create_project(1, self.user)
+        self.project2 = create_project(2, self.user)
+
+    def _get_emitted_messages(self, mock_instance):
+        return [json.loads(call[0][0])
+                    for call in mock_instance.return_value.emit_event.call_args_list]
+
+    def test_collapse_and_flush_events(self):
+        request = self.factory.get("/")
+        mw_instance = mw.EventsBufferMiddleware()
+
+        with patch("taiga.events.backends.get_events_backend") as mock_instance:
+            mw_instance.process_request(request)
+            issue1 = create_issue(1, self.user, self.project1)
+            issue1.save()
+            issue2 = create_issue(2, self.user, self.project1)
+            issue3 = create_issue(3, self.user, self.project2)
+            issue3.delete()
+            issue2.delete()
+
+            self.assertFalse(mock_instance.return_value.emit_event.called)
+            mw_instance.process_response(request, HttpResponse())
+
+            messages = self._get_emitted_messages(mock_instance)
+            self.assertEqual(len(messages), 1)
+            self.assertEqual(messages[0]["routing_key"], "project.{0}".format(self.project1.id))
+            self.assertEqual(messages[0]["data"], {"type": "create", "matches": "issues.issue",
+                                                   "pk": issue1.id})
+
+    def test_discard_rolled_back_events_on_exception(self):
+        request = self.factory.get("/")
+        mw_instance = mw.EventsBufferMiddleware()
+
+        with patch("taiga.events.backends.get_events_backend") as mock_instance:
+            mw_instance.process_request(request)
+            issue1 = create_issue(1, self.user, self.project1)
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    create_issue(2, self.user, self.project1)
+                    raise ValueError("rollback")
+
+            mw_instance.process_response(request, HttpResponse(status=500))
+
+            messages = self._get_emitted_messages(mock_instance)
+            self.assertEqual([message["data"]["pk"] for message in messages], [issue1.id])
+            self.assertEqual(ch.get_events_buffer(), None)
+
+
+class EventsBackendsTest(test.TestCase):
+    def test_memory_backend(self):
+        backend = get_events_backend("taiga.events.backends.memory.EventsPushBackend", {})
+        backend.emit_event("foo", channel="test")
+        backend.emit_events(["bar", "baz"], channel="test")
+
+        events_queue = memory.get_queue("test")
+        self.assertEqual([events_queue.get_nowait() for i in range(3)], ["foo", "bar", "baz"])
+        self.assertTrue(events_queue.empty())
+
+    def test_unix_socket_backend(self):
+        tmp_dir = tempfile.mkdtemp()
+        path = os.path.join(tmp_dir, "events.sock")
+        backend = get_events_backend("taiga.events.backends.unix_socket.EventsPushBackend",
+                                     {"path": path})
+
+        # Without a relay listening the events are lost
+        backend.emit_event("foo", channel="test")
+
+        with closing(socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)) as sock:
+            sock.bind(path)
+            backend.emit_events(["foo", "bar\nbaz"], channel="test")
+
+            self.assertEqual(unix_socket.parse_datagram(sock.recv(65536)), ("test", "foo"))
+            self.assertEqual(unix_socket.parse_datagram(sock.recv(65536)), ("test", "bar\nbaz"))
+
+            # The events that the relay can't receive are lost, without waiting
+            backend.emit_events(["x" * 1024 * 1024, "foo"], channel="test")
+            self.assertEqual(unix_socket.parse_datagram(sock.recv(65536)), ("test", "foo"))
+
+            backend.emit_events(["foo"] * 10000, channel="test")
+
+        os.unlink(path)
+        os.rmdir(tmp_dir)
+
+
+class EventsRelayTest(test.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _get_message(self, routing_key, session_id=None, pk=1):
+        return json.dumps({"type": "model-changes", "routing_key": routing_key,
+                           "session_id": session_id,
+                           "data": {"type": "change", "matches": "issues.issue", "pk": pk}})
+
+    def test_route_messages_to_thousands_of_subscribers(self):
+        router = relay.Router()
+        clients = [relay.Client(["project.{0}".format(i % 10)], "session{0}".format(i),
+                                loop=self.loop) for i in range(5000)]
+        for client in clients:
+            router.subscribe(client)
+
+        count = 0
+        for i in range(100):
+            message = self._get_message("project.{0}".format(i % 10), session_id="session0", pk=i)
+            count += router.route(message)
+
+        # The client of the session that emitted the events doesn't receive them
+        self.assertEqual(count, 100 * 500 - 10)
+        self.assertEqual(clients[0].queue.qsize(), 0)
+        self.assertTrue(all(client.queue.qsize() == 10 for client in clients[1:]))
+        self.assertEqual(json.loads(clients[11].queue.get_nowait())["data"]["pk"], 1)
+        self.assertEqual(router.route(self._get_message("project.10")), 0)
+
+    def test_close_slow_clients(self):
+        router = relay.Router()
+        slow_client = relay.Client(["project.1"], max_queue_size=5, loop=self.loop)
+        client = relay.Client(["project.1"], max_queue_size=10, loop=self.loop)
+        router.subscribe(slow_client)
+        router.subscribe(client)
+
+        for i in range(6):
+            router.route(self._get_message("project.1", pk=i))
+
+        self.assertTrue(slow_client.closed)
+        self.assertEqual(router.subscribers["project.1"], set([client]))
+        self.assertEqual([slow_client.queue.get_nowait() for i in range(6)][-1], None)
+        self.assertEqual(client.queue.qsize(), 6)
+
+    def test_sse_server(self):
+        def _authorize(token, routing_keys):
+            if token != "valid":
+                raise exc.NotAuthenticated()
+            return [routing_key for routing_key in routing_keys if routing_key != "project.2"]
+
+        router = relay.Router()
+        sse_server = relay.SSEServer(router, authorize=_authorize, loop=self.loop)
+        server = self.loop.run_until_complete(sse_server.start("127.0.0.1", 0))
+        port = server.sockets[0].getsockname()[1]
+
+        @asyncio.coroutine
+        def _subscribe(query):
+            reader, writer = yield from asyncio.open_connection("127.0.0.1", port, loop=self.loop)
+            writer.write("GET /events?{0} HTTP/1.1\r\n\r\n".format(query).encode("utf-8"))
+            status = yield from reader.readline()
+            while (yield from reader.readline()) != b"\r\n":
+                pass
+            return status, reader, writer
+
+        @asyncio.coroutine
+        def _test():
+            subscriptions = yield from asyncio.gather(*[
+                _subscribe("token=valid&routing_key=project.1&session_id=s{0}".format(i))
+                for i in range(200)], loop=self.loop)
+            self.assertTrue(all(status == b"HTTP/1.1 200 OK\r\n"
+                                for status, reader, writer in subscriptions))
+
+            status, reader, writer = yield from _subscribe("token=invalid&routing_key=project.1")
+            self.assertEqual(status, b"HTTP/1.1 401 Unauthorized\r\n")
+            writer.close()
+
+            status, reader, writer = yield from _subscribe("token=valid&routing_key=project.2")
+            self.assertEqual(status, b"HTTP/1.1 403 Forbidden\r\n")
+            writer.close()
+
+            message = self._get_message("project.1", session_id="s0")
+            self.assertEqual(router.route(message), 199)
+
+            for status, reader, writer in subscriptions[1:]:
+                line = yield from reader.readline()
+                self.assertEqual(line, "data: {0}\n".format(message).encode("utf-8"))
+
+            for status, reader, writer in subscriptions:
+                writer.close()
+
+            for clients in list(router.subscribers.values()):
+                for client in list(clients):
+                    client.close()
+            yield from asyncio.sleep(0.1, loop=self.loop)
+
+        self.loop.run_until_complete(_test())
+        server.close()
+        self.loop.run_until_complete(server.wait_closed())
+
+
+class EventsRelayPostgresqlTest(test.TransactionTestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _run_until(self, condition, timeout=5):
+        @asyncio.coroutine
+        def _wait():
+            while not condition():
+                yield from asyncio.sleep(0.01, loop=self.loop)
+        self.loop.run_until_complete(asyncio.wait_for(_wait(), timeout, loop=self.loop))
+
+    def test_listen_postgresql_reconnects(self):
+        router = relay.Router()
+        client = relay.Client(["project.1"], loop=self.loop)
+        router.subscribe(client)
+
+        listener = relay.listen_postgresql(router, "events_test", loop=self.loop,
+                                           min_backoff=0.01)
+        backend_pid = listener.connection.get_backend_pid()
+
+        cursor = connection.cursor()
+        cursor.execute("SELECT pg_terminate_backend(%s)", [backend_pid])
+        self._run_until(lambda: (listener.connection is not None and
+                                 listener.connection.get_backend_pid() != backend_pid))
+
+        message = json.dumps({"routing_key": "project.1", "data": {}})
+        cursor.execute("SELECT pg_notify('events_test', %s)", [message])
+        self._run_until(lambda: not client.queue.empty())
+        self.assertEqual(client.queue.get_nowait(), message)
+
+        listener.close()
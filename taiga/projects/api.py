@@ -20,6 +20,7 @@ from taiga.base.decorators import list_route, detail_route
 from taiga.base.permissions import has_project_perm
 from taiga.base.api import ModelCrudViewSet, RetrieveModelMixin
 from taiga.base.users.models import Role
+from taiga.projects.issues.api import IssuesFilter
 
 from . import serializers
 from . import models
@@ -74,7 +75,8 @@ class ProjectViewSet(ModelCrudViewSet):
     @detail_route(methods=['get'])
     def issue_filters_data(self, request, pk=None):
         project = self.get_object()
-        return Response(services.get_issues_filters_data(project))
+        filters_data = IssuesFilter()._prepare_filters_data(request)
+        return Response(services.get_issues_filters_data(project, filters_data))
 
     @detail_route(methods=['get'])
     def tags(self, request, pk=None):
@@ -175,7 +177,7 @@ class BulkUpdateOrderMixin(object):
     - bulk_update_param: that the name of the field of the data received from
       the cliente that contains the pairs (id, order) to sort the objects.
     - bulk_update_perm: that containts the codename of the permission needed to sort.
-    - bulk_update_order: method with bulk update order logic
+    - model: the model of the sorted objects.
     """
 
     @list_route(methods=["POST"])
@@ -194,7 +196,10 @@ class BulkUpdateOrderMixin(object):
         if request.user != project.owner and not has_project_perm(request.user, project, self.bulk_update_perm):
             raise exc.PermissionDenied(_("You don't have permisions %s.") % self.bulk_update_perm)
 
-        self.bulk_update_order(project, request.user, bulk_data)
+        try:
+            services.bulk_update_order(self.model, project, bulk_data)
+        except ValueError:
+            raise exc.BadRequest(_("%s parameter is not valid") % self.bulk_update_param)
         return Response(data=None, status=status.HTTP_204_NO_CONTENT)
 
 
@@ -206,7 +211,6 @@ class PointsViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
     filter_fields = ('project',)
     bulk_update_param = "bulk_points"
     bulk_update_perm = "change_points"
-    bulk_update_order = services.bulk_update_points_order
 
 
 class UserStoryStatusViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
@@ -217,7 +221,6 @@ class UserStoryStatusViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
     filter_fields = ('project',)
     bulk_update_param = "bulk_userstory_statuses"
     bulk_update_perm = "change_userstorystatus"
-    bulk_update_order = services.bulk_update_userstory_status_order
 
 
 class TaskStatusViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
@@ -228,7 +231,6 @@ class TaskStatusViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
     filter_fields = ("project",)
     bulk_update_param = "bulk_task_statuses"
     bulk_update_perm = "change_taskstatus"
-    bulk_update_order = services.bulk_update_task_status_order
 
 
 class SeverityViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
@@ -239,7 +241,6 @@ class SeverityViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
     filter_fields = ("project",)
     bulk_update_param = "bulk_severities"
     bulk_update_perm = "change_severity"
-    bulk_update_order = services.bulk_update_severity_order
 
 
 class PriorityViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
@@ -250,7 +251,6 @@ class PriorityViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
     filter_fields = ("project",)
     bulk_update_param = "bulk_priorities"
     bulk_update_perm = "change_priority"
-    bulk_update_order = services.bulk_update_priority_order
 
 
 class IssueTypeViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
@@ -261,7 +261,6 @@ class IssueTypeViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
     filter_fields = ("project",)
     bulk_update_param = "bulk_issue_types"
     bulk_update_perm = "change_issuetype"
-    bulk_update_order = services.bulk_update_issue_type_order
 
 
 class IssueStatusViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
@@ -272,7 +271,6 @@ class IssueStatusViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
     filter_fields = ("project",)
     bulk_update_param = "bulk_issue_statuses"
     bulk_update_perm = "change_issuestatus"
-    bulk_update_order = services.bulk_update_issue_status_order
 
 
 class QuestionStatusViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
@@ -283,4 +281,3 @@ class QuestionStatusViewSet(ModelCrudViewSet, BulkUpdateOrderMixin):
     filter_fields = ("project",)
     bulk_update_param = "bulk_question_statuses"
     bulk_update_perm = "change_questionstatus"
-    bulk_update_order = services.bulk_update_question_status_order
@@ -8,6 +8,11 @@ VIDEOCONFERENCES_CHOICES = (
     ("talky", "Talky"),
 )
 
+TAGGED_OBJECT_TYPES = (
+    ("userstory", _("User story")),
+    ("issue", _("Issue")),
+)
+
 US_STATUSES = (
     (1, _("Open"), False, True, "#669933"),
     (2, _("Closed"), True, False, "#999999"),
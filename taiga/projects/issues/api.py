@@ -18,6 +18,7 @@ from taiga.base.notifications.api import NotificationSenderMixin
 from taiga.projects.permissions import AttachmentPermission
 from taiga.projects.serializers import AttachmentSerializer
 from taiga.projects.models import Attachment
+from taiga.projects.services import lookups
 
 from . import models
 from . import permissions
@@ -59,7 +60,7 @@ class IssuesFilter(filters.FilterBackend):
         filterdata = self._prepare_filters_data(request)
 
         if "tags" in filterdata:
-            where_sql = ["unpickle(issues_issue.tags) @> %s"]
+            where_sql = ["issues_issue.tags @> %s::text[]"]
             params = [filterdata["tags"]]
             queryset = queryset.extra(where=where_sql, params=params)
 
@@ -117,16 +118,16 @@ class IssueViewSet(NeighborsApiMixin, NotificationSenderMixin, ModelCrudViewSet)
         if obj.milestone and obj.milestone.project != obj.project:
             raise exc.PermissionDenied(_("You don't have permissions for add/modify this issue."))
 
-        if obj.status and obj.status.project != obj.project:
+        if not lookups.is_project_lookup(obj, "status"):
             raise exc.PermissionDenied(_("You don't have permissions for add/modify this issue."))
 
-        if obj.severity and obj.severity.project != obj.project:
+        if not lookups.is_project_lookup(obj, "severity"):
             raise exc.PermissionDenied(_("You don't have permissions for add/modify this issue."))
 
-        if obj.priority and obj.priority.project != obj.project:
+        if not lookups.is_project_lookup(obj, "priority"):
             raise exc.PermissionDenied(_("You don't have permissions for add/modify this issue."))
 
-        if obj.type and obj.type.project != obj.project:
+        if not lookups.is_project_lookup(obj, "type"):
             raise exc.PermissionDenied(_("You don't have permissions for add/modify this issue."))
 
     def post_save(self, obj, created=False):
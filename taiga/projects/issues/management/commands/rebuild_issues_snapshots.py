@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+from django.core.management.base import BaseCommand, CommandError
+
+from taiga.projects.models import Project
+from taiga.projects.issues import services
+
+
+class Command(BaseCommand):
+    args = "[project_id project_id ...]"
+    help = "Regenerate the issues daily snapshots of the given projects (all by default)."
+
+    def handle(self, *args, **options):
+        if not args:
+            services.rebuild_daily_snapshots()
+            return
+
+        for project_id in args:
+            try:
+                project = Project.objects.get(pk=project_id)
+            except (Project.DoesNotExist, ValueError):
+                raise CommandError("Project '{0}' does not exist".format(project_id))
+
+            services.rebuild_daily_snapshots(project)
+            self.stdout.write("Rebuilt issues daily snapshots of {0}".format(project))
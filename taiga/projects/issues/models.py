@@ -7,10 +7,9 @@ from django.utils import timezone
 from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
 
-from picklefield.fields import PickledObjectField
-
+from taiga.base.fields import TagsField
 from taiga.base.models import NeighborsMixin
-from taiga.base.utils.slug import ref_uniquely
+from taiga.base.utils.slug import next_ref
 from taiga.base.notifications.models import WatchedMixin
 from taiga.projects.mixins.blocked.models import BlockedMixin
 
@@ -50,7 +49,7 @@ class Issue(NeighborsMixin, WatchedMixin, BlockedMixin):
     watchers = models.ManyToManyField(settings.AUTH_USER_MODEL, null=True, blank=True,
                                       related_name="watched_issues",
                                       verbose_name=_("watchers"))
-    tags = PickledObjectField(null=False, blank=True, verbose_name=_("tags"))
+    tags = TagsField(null=False, blank=True, verbose_name=_("tags"))
     attachments = generic.GenericRelation("projects.Attachment")
 
     notifiable_fields = [
@@ -81,167 +80,10 @@ class Issue(NeighborsMixin, WatchedMixin, BlockedMixin):
     def __str__(self):
         return "({1}) {0}".format(self.ref, self.subject)
 
-    def _get_order_by(self, queryset):
-        ordering = self._get_queryset_order_by(queryset)
-        if ordering:
-            main_order = ordering[0]
-            need_extra_ordering = ("severity", "-severity", "owner__first_name",
-                                   "-owner__first_name", "status", "-status", "priority",
-                                   "-priority", "assigned_to__first_name",
-                                   "-assigned_to__first_name")
-            if main_order in need_extra_ordering:
-                ordering += self._meta.ordering
-
-        return ordering
-
-    def _get_prev_neighbor_filters(self, queryset):
-        conds = super()._get_prev_neighbor_filters(queryset)
-        try:
-            main_order = queryset.query.order_by[0]
-        except IndexError:
-            main_order = None
-
-        if main_order == "severity":
-            conds = [{"severity__order__lt": self.severity.order},
-                     {"severity__order": self.severity.order,
-                      "created_date__lt": self.created_date}]
-        elif main_order == "-severity":
-            conds = [{"severity__order__gt": self.severity.order},
-                     {"severity__order": self.severity.order,
-                      "created_date__lt": self.created_date}]
-        elif main_order == "status":
-            conds = [{"status__order__lt": self.status.order},
-                     {"status__order": self.status.order,
-                      "created_date__lt": self.created_date}]
-        elif main_order == "-status":
-            conds = [{"status__order__gt": self.status.order},
-                     {"status__order": self.status.order,
-                      "created_date__lt": self.created_date}]
-        elif main_order == "priority":
-            conds = [{"priority__order__lt": self.priority.order},
-                     {"priority__order": self.priority.order,
-                      "created_date__lt": self.created_date}]
-        elif main_order == "-priority":
-            conds = [{"priority__order__gt": self.priority.order},
-                     {"priority__order": self.priority.order,
-                      "created_date__lt": self.created_date}]
-        elif main_order == "owner__first_name":
-            conds = [{"owner__first_name": self.owner.first_name,
-                      "owner__last_name": self.owner.last_name,
-                      "created_date__lt": self.created_date},
-                     {"owner__first_name": self.owner.first_name,
-                      "owner__last_name__lt": self.owner.last_name},
-                     {"owner__first_name__lt": self.owner.first_name}]
-        elif main_order == "-owner__first_name":
-            conds = [{"owner__first_name": self.owner.first_name,
-                      "owner__last_name": self.owner.last_name,
-                      "created_date__lt": self.created_date},
-                     {"owner__first_name": self.owner.first_name,
-                      "owner__last_name__gt": self.owner.last_name},
-                     {"owner__first_name__gt": self.owner.first_name}]
-        elif main_order == "assigned_to__first_name":
-            if self.assigned_to:
-                conds = [{"assigned_to__first_name": self.assigned_to.first_name,
-                          "assigned_to__last_name": self.assigned_to.last_name,
-                          "created_date__lt": self.created_date},
-                         {"assigned_to__first_name": self.assigned_to.first_name,
-                          "assigned_to__last_name__lt": self.assigned_to.last_name},
-                         {"assigned_to__first_name__lt": self.assigned_to.first_name}]
-            else:
-                conds = [{"assigned_to__isnull": True,
-                          "created_date__lt": self.created_date},
-                         {"assigned_to__isnull": False}]
-        elif main_order == "-assigned_to__first_name":
-            if self.assigned_to:
-                conds = [{"assigned_to__first_name": self.assigned_to.first_name,
-                          "assigned_to__last_name": self.assigned_to.last_name,
-                          "created_date__lt": self.created_date},
-                         {"assigned_to__first_name": self.assigned_to.first_name,
-                          "assigned_to__last_name__gt": self.assigned_to.last_name},
-                         {"assigned_to__first_name__gt": self.assigned_to.first_name},
-                         {"assigned_to__isnull": True}]
-            else:
-                conds = [{"assigned_to__isnull": True,
-                          "created_date__lt": self.created_date},
-                         {"assigned_to__isnull": False}]
-
-        return conds
-
-    def _get_next_neighbor_filters(self, queryset):
-        conds = super()._get_next_neighbor_filters(queryset)
-        ordering = queryset.query.order_by
-        try:
-            main_order = ordering[0]
-        except IndexError:
-            main_order = None
-
-        if main_order == "severity":
-            conds = [{"severity__order__gt": self.severity.order},
-                     {"severity__order": self.severity.order,
-                      "created_date__gt": self.created_date}]
-        elif main_order == "-severity":
-            conds = [{"severity__order__lt": self.severity.order},
-                     {"severity__order": self.severity.order,
-                      "created_date__gt": self.created_date}]
-        elif main_order == "status":
-            conds = [{"status__order__gt": self.status.order},
-                     {"status__order": self.status.order,
-                      "created_date__gt": self.created_date}]
-        elif main_order == "-status":
-            conds = [{"status__order__lt": self.status.order},
-                     {"status__order": self.status.order,
-                      "created_date__gt": self.created_date}]
-        elif main_order == "priority":
-            conds = [{"priority__order__gt": self.priority.order},
-                     {"priority__order": self.priority.order,
-                      "created_date__gt": self.created_date}]
-        elif main_order == "-priority":
-            conds = [{"priority__order__lt": self.priority.order},
-                     {"priority__order": self.priority.order,
-                      "created_date__gt": self.created_date}]
-        elif main_order == "owner__first_name":
-            conds = [{"owner__first_name": self.owner.first_name,
-                      "owner__last_name": self.owner.last_name,
-                      "created_date__gt": self.created_date},
-                     {"owner__first_name": self.owner.first_name,
-                      "owner__last_name__gt": self.owner.last_name},
-                     {"owner__first_name__gt": self.owner.first_name}]
-        elif main_order == "-owner__first_name":
-            conds = [{"owner__first_name": self.owner.first_name,
-                      "owner__last_name": self.owner.last_name,
-                      "created_date__gt": self.created_date},
-                     {"owner__first_name": self.owner.first_name,
-                      "owner__last_name__lt": self.owner.last_name},
-                     {"owner__first_name__lt": self.owner.first_name}]
-        elif main_order == "assigned_to__first_name":
-            if self.assigned_to:
-                conds = [{"assigned_to__first_name": self.assigned_to.first_name,
-                          "assigned_to__last_name": self.assigned_to.last_name,
-                          "created_date__gt": self.created_date},
-                         {"assigned_to__first_name": self.assigned_to.first_name,
-                          "assigned_to__last_name__gt": self.assigned_to.last_name},
-                         {"assigned_to__first_name__gt": self.assigned_to.first_name},
-                         {"assigned_to__isnull": True}]
-            else:
-                conds = [{"assigned_to__isnull": True,
-                          "created_date__gt": self.created_date}]
-        elif main_order == "-assigned_to__first_name" and self.assigned_to:
-                conds = [{"assigned_to__first_name": self.assigned_to.first_name,
-                          "assigned_to__last_name": self.assigned_to.last_name,
-                          "created_date__gt": self.created_date},
-                         {"assigned_to__first_name": self.assigned_to.first_name,
-                          "assigned_to__last_name__lt": self.assigned_to.last_name},
-                         {"assigned_to__first_name__lt": self.assigned_to.first_name}]
-        else:
-            conds = [{"assigned_to__isnull": True,
-                      "created_date__gt": self.created_date},
-                     {"assigned_to__isnull": False}]
-
-        return conds
-
     @property
     def is_closed(self):
-        return self.status.is_closed
+        from taiga.projects.services import lookups
+        return lookups.get_related_lookup(self, "status").is_closed
 
     def get_notifiable_assigned_to_display(self, value):
         if not value:
@@ -262,6 +104,40 @@ class Issue(NeighborsMixin, WatchedMixin, BlockedMixin):
         }
 
 
+class IssueDailySnapshot(models.Model):
+    """
+    Number of issues created and closed on a day, classified by
+    the current status, severity and priority of the issues.
+
+    The number of open issues of any day can be obtained from
+    the accumulated values of the previous days, so trend windows
+    of any length only need to read one row per day and dimension.
+    """
+    project = models.ForeignKey("projects.Project", null=False, blank=False,
+                                related_name="issues_daily_snapshots",
+                                verbose_name=_("project"))
+    day = models.DateField(null=False, blank=False, verbose_name=_("day"))
+    status = models.ForeignKey("projects.IssueStatus", null=False, blank=False,
+                               related_name="+", verbose_name=_("status"))
+    severity = models.ForeignKey("projects.Severity", null=False, blank=False,
+                                 related_name="+", verbose_name=_("severity"))
+    priority = models.ForeignKey("projects.Priority", null=False, blank=False,
+                                 related_name="+", verbose_name=_("priority"))
+    created_count = models.IntegerField(default=0, null=False, blank=False,
+                                        verbose_name=_("created issues"))
+    closed_count = models.IntegerField(default=0, null=False, blank=False,
+                                       verbose_name=_("closed issues"))
+
+    class Meta:
+        verbose_name = "issue daily snapshot"
+        verbose_name_plural = "issue daily snapshots"
+        ordering = ["project", "day"]
+        unique_together = ("project", "day", "status", "severity", "priority")
+
+    def __str__(self):
+        return "{0}: {1}".format(self.project_id, self.day)
+
+
 # Reversion registration (usufull for base.notification and for meke a historical)
 reversion.register(Issue)
 
@@ -278,10 +154,52 @@ def issue_finished_date_handler(sender, instance, **kwargs):
 @receiver(models.signals.pre_save, sender=Issue, dispatch_uid="issue_ref_handler")
 def issue_ref_handler(sender, instance, **kwargs):
     if not instance.id and instance.project:
-        instance.ref = ref_uniquely(instance.project, "last_issue_ref", instance.__class__)
+        instance.ref = next_ref(instance.project, "last_issue_ref")
 
 
 @receiver(models.signals.pre_save, sender=Issue, dispatch_uid="issue-tags-normalization")
 def issue_tags_normalization(sender, instance, **kwargs):
+    from taiga.projects.services import tags as tags_service
+
     if isinstance(instance.tags, (list, tuple)):
         instance.tags = list(map(lambda x: x.lower(), instance.tags))
+
+    tags_service.update_tags_dictionary_on_save(instance, "issue")
+
+
+@receiver(models.signals.post_delete, sender=Issue, dispatch_uid="issue-tags-dictionary-delete")
+def issue_tags_dictionary_delete(sender, instance, **kwargs):
+    from taiga.projects.services import tags as tags_service
+
+    tags_service.update_tags_dictionary_on_delete(instance, "issue")
+
+
+@receiver(models.signals.pre_save, sender=Issue, dispatch_uid="issue_daily_snapshot_pre_save")
+def issue_daily_snapshot_pre_save(sender, instance, **kwargs):
+    from . import services
+
+    instance._daily_snapshot_state = None
+    if instance.id:
+        instance._daily_snapshot_state = services.get_daily_snapshot_state_from_db(instance)
+
+
+@receiver(models.signals.post_save, sender=Issue, dispatch_uid="issue_daily_snapshot_post_save")
+def issue_daily_snapshot_post_save(sender, instance, **kwargs):
+    from . import services
+
+    old_state = getattr(instance, "_daily_snapshot_state", None)
+    new_state = services.get_daily_snapshot_state(instance)
+
+    if old_state != new_state:
+        if old_state:
+            services.update_daily_snapshot(old_state, -1)
+        services.update_daily_snapshot(new_state, 1)
+
+    instance._daily_snapshot_state = None
+
+
+@receiver(models.signals.post_delete, sender=Issue, dispatch_uid="issue_daily_snapshot_post_delete")
+def issue_daily_snapshot_post_delete(sender, instance, **kwargs):
+    from . import services
+
+    services.update_daily_snapshot(services.get_daily_snapshot_state(instance), -1)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import closing
+import collections
+import datetime
+
+from django.db import connection
+from django.db import transaction
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from taiga.base.models import get_stored_values
+
+from . import models
+
+
+SnapshotState = collections.namedtuple("SnapshotState", ["project_id", "created_day",
+                                                         "finished_day", "status_id",
+                                                         "severity_id", "priority_id"])
+
+
+def _to_day(value):
+    if value is None:
+        return None
+    return value.astimezone(timezone.utc).date()
+
+
+def get_daily_snapshot_state(issue):
+    """
+    Get the values of an issue that are relevant
+    for the daily snapshots.
+    """
+    return SnapshotState(issue.project_id, _to_day(issue.created_date),
+                         _to_day(issue.finished_date), issue.status_id,
+                         issue.severity_id, issue.priority_id)
+
+
+def get_daily_snapshot_state_from_db(issue):
+    """
+    Same as get_daily_snapshot_state but using the values
+    currently stored on the database.
+    """
+    stored_values = get_stored_values(issue)
+    if stored_values is None:
+        return None
+
+    return SnapshotState(stored_values["project_id"], _to_day(stored_values["created_date"]),
+                         _to_day(stored_values["finished_date"]), stored_values["status_id"],
+                         stored_values["severity_id"], stored_values["priority_id"])
+
+
+def _update_daily_snapshot_row(lookup, created, closed):
+    qs = models.IssueDailySnapshot.objects.filter(**lookup)
+    updated = qs.update(created_count=F("created_count") + created,
+                        closed_count=F("closed_count") + closed)
+
+    # Substractions never need to create new rows: if the row does not
+    # exists its object is being removed with all its snapshots.
+    if updated or created < 0 or closed < 0:
+        return
+
+    try:
+        with transaction.atomic():
+            models.IssueDailySnapshot.objects.create(created_count=created,
+                                                     closed_count=closed, **lookup)
+    except IntegrityError:
+        qs.update(created_count=F("created_count") + created,
+                  closed_count=F("closed_count") + closed)
+
+
+def update_daily_snapshot(state, sign):
+    """
+    Add (sign=1) or substract (sign=-1) the contribution
+    of an issue state to the daily snapshots.
+    """
+    if state.created_day is None:
+        return
+
+    deltas = collections.defaultdict(lambda: [0, 0])
+    deltas[state.created_day][0] += sign
+    if state.finished_day is not None:
+        deltas[state.finished_day][1] += sign
+
+    for day, (created, closed) in deltas.items():
+        lookup = {"project_id": state.project_id, "day": day, "status_id": state.status_id,
+                  "severity_id": state.severity_id, "priority_id": state.priority_id}
+        _update_daily_snapshot_row(lookup, created, closed)
+
+
+@transaction.atomic
+def rebuild_daily_snapshots(project=None):
+    """
+    Regenerate the daily snapshots of a project (or of all
+    projects) from its issues.
+    """
+    where_sql = ""
+    params = []
+    if project is not None:
+        where_sql = "where project_id = %s"
+        params = [project.id]
+
+    delete_sql = "delete from issues_issuedailysnapshot {where};".format(where=where_sql)
+
+    insert_sql = """
+    insert into issues_issuedailysnapshot (project_id, day, status_id, severity_id,
+                                           priority_id, created_count, closed_count)
+    select project_id, day, status_id, severity_id, priority_id, sum(created), sum(closed)
+        from (select project_id, (created_date at time zone 'UTC')::date as day,
+                     status_id, severity_id, priority_id, 1 as created, 0 as closed
+                  from issues_issue {where}
+              union all
+              select project_id, (finished_date at time zone 'UTC')::date as day,
+                     status_id, severity_id, priority_id, 0 as created, 1 as closed
+                  from issues_issue {where_finished}) as events
+        group by project_id, day, status_id, severity_id, priority_id;
+    """
+    where_finished = "{0} {1} finished_date is not null".format(where_sql,
+                                                               "and" if where_sql else "where")
+    insert_sql = insert_sql.format(where=where_sql, where_finished=where_finished)
+
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(delete_sql, params)
+        cursor.execute(insert_sql, params + params)
+
+
+def get_issues_counts_by_day(project, first_day, last_day):
+    """
+    Get from the daily snapshots, for each day between first_day
+    and last_day (both included), the number of created, closed
+    and open issues classified by severity and priority.
+
+    An issue is open on a day if it was created on or before that
+    day and it was not closed before that day.
+
+    Return a list of (day, severity_id, priority_id, created, closed, open)
+    tuples, only for the days and dimensions with any issue.
+    """
+    extra_sql = """
+    select case when day < %s then null else day end as bucket,
+           severity_id, priority_id, sum(created_count), sum(closed_count)
+        from issues_issuedailysnapshot
+        where project_id = %s and day <= %s
+        group by bucket, severity_id, priority_id;
+    """
+
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(extra_sql, [first_day, project.id, last_day])
+        rows = cursor.fetchall()
+
+    # Accumulated created and closed issues before first_day.
+    accumulated = collections.defaultdict(lambda: [0, 0])
+    by_day = collections.defaultdict(dict)
+    for day, severity_id, priority_id, created, closed in rows:
+        if day is None:
+            accumulated[(severity_id, priority_id)][0] += created
+            accumulated[(severity_id, priority_id)][1] += closed
+        else:
+            by_day[day][(severity_id, priority_id)] = (created, closed)
+
+    result = []
+    day = first_day
+    while day <= last_day:
+        day_counts = by_day.get(day, {})
+        for key in set(accumulated.keys()) | set(day_counts.keys()):
+            created, closed = day_counts.get(key, (0, 0))
+            total_created, total_closed = accumulated[key]
+            opened = total_created + created - total_closed
+
+            if created or closed or opened:
+                result.append((day, key[0], key[1], created, closed, opened))
+
+            accumulated[key][0] += created
+            accumulated[key][1] += closed
+
+        day = day + datetime.timedelta(days=1)
+
+    return result
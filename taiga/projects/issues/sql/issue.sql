@@ -0,0 +1,3 @@
+ALTER TABLE issues_issue ADD COLUMN search_vector tsvector;
+CREATE INDEX issues_issue_search_vector_gin_index ON issues_issue USING gin (search_vector);
+CREATE TRIGGER issues_issue_search_vector_update BEFORE INSERT OR UPDATE OF subject, description ON issues_issue FOR EACH ROW EXECUTE PROCEDURE tsvector_update_trigger(search_vector, 'pg_catalog.simple', subject, description);
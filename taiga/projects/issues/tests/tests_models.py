@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+from django import test
+
+from taiga.base.users.tests import create_user
+from taiga.projects.tests import create_project
+
+from . import create_issue
+from .. import models
+
+
+class IssueNeighborsTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+        self.project1 = create_project(1, self.user1)
+        self.issue1 = create_issue(1, self.user1, self.project1)
+        self.issue2 = create_issue(2, self.user1, self.project1)
+        self.issue3 = create_issue(3, self.user1, self.project1)
+
+    def test_neighbors_with_the_default_ordering(self):
+        self.assertEqual(self.issue1.get_neighbors(), (None, self.issue2))
+        self.assertEqual(self.issue2.get_neighbors(), (self.issue1, self.issue3))
+        self.assertEqual(self.issue3.get_neighbors(), (self.issue2, None))
+
+    def test_neighbors_are_found_with_two_queries(self):
+        queryset = models.Issue.objects.filter(project=self.project1).order_by("-severity")
+        with self.assertNumQueries(2):
+            self.issue2.get_neighbors(queryset)
+
+    def test_neighbors_with_the_ordering_of_a_relation(self):
+        severities = list(self.project1.severities.order_by("order"))
+        self.issue1.severity = severities[1]
+        self.issue1.save()
+        self.issue3.severity = severities[1]
+        self.issue3.save()
+
+        queryset = models.Issue.objects.filter(project=self.project1)
+
+        # issue2, issue1, issue3 (the ties sorted by created date)
+        self.assertEqual(self.issue1.get_neighbors(queryset.order_by("severity")),
+                         (self.issue2, self.issue3))
+        # issue1, issue3, issue2
+        self.assertEqual(self.issue1.get_neighbors(queryset.order_by("-severity")),
+                         (None, self.issue3))
+        self.assertEqual(self.issue2.get_neighbors(queryset.order_by("-severity")),
+                         (self.issue3, None))
+
+    def test_neighbors_with_null_values(self):
+        self.issue2.assigned_to = self.user1
+        self.issue2.save()
+
+        queryset = models.Issue.objects.filter(project=self.project1)
+
+        # issue2, issue1, issue3 (the nulls are the last ones)
+        ordering = ("assigned_to__first_name", "assigned_to__last_name")
+        self.assertEqual(self.issue2.get_neighbors(queryset.order_by(*ordering)),
+                         (None, self.issue1))
+        self.assertEqual(self.issue1.get_neighbors(queryset.order_by(*ordering)),
+                         (self.issue2, self.issue3))
+
+        # issue1, issue3, issue2 (the nulls are the first ones)
+        ordering = ("-assigned_to__first_name", "-assigned_to__last_name")
+        self.assertEqual(self.issue2.get_neighbors(queryset.order_by(*ordering)),
+                         (self.issue3, None))
+
+    def test_neighbors_of_an_object_excluded_by_the_filters(self):
+        queryset = models.Issue.objects.filter(project=self.project1).exclude(id=self.issue2.id)
+        self.assertEqual(self.issue2.get_neighbors(queryset), (self.issue1, self.issue3))
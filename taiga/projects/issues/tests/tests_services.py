@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+from django import test
+
+from taiga.base.users.tests import create_user
+from taiga.projects.tests import create_project
+
+from . import create_issue
+from .. import services
+from .. import models
+
+
+class IssuesDailySnapshotsTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+        self.project1 = create_project(1, self.user1)
+        self.today = datetime.date.today()
+
+    def _get_snapshots(self):
+        qs = models.IssueDailySnapshot.objects.filter(project=self.project1)
+        qs = qs.exclude(created_count=0, closed_count=0)
+        return sorted(qs.values_list("day", "status_id", "severity_id", "priority_id",
+                                     "created_count", "closed_count"))
+
+    def test_snapshots_are_updated_on_issue_changes(self):
+        issue = create_issue(1, self.user1, self.project1)
+        self.assertEqual(self._get_snapshots(), [(self.today, issue.status_id,
+                                                  issue.severity_id, issue.priority_id,
+                                                  1, 0)])
+
+        issue.severity = self.project1.severities.exclude(id=issue.severity_id)[0]
+        issue.save()
+        self.assertEqual(self._get_snapshots(), [(self.today, issue.status_id,
+                                                  issue.severity_id, issue.priority_id,
+                                                  1, 0)])
+
+        issue.delete()
+        self.assertEqual(self._get_snapshots(), [])
+
+    def test_rebuild_snapshots(self):
+        for x in range(5):
+            create_issue(x, self.user1, self.project1)
+
+        snapshots = self._get_snapshots()
+        services.rebuild_daily_snapshots(self.project1)
+        self.assertEqual(self._get_snapshots(), snapshots)
+
+    def test_get_issues_counts_by_day(self):
+        issue = create_issue(1, self.user1, self.project1)
+        first_day = self.today - datetime.timedelta(days=1)
+
+        rows = services.get_issues_counts_by_day(self.project1, first_day, self.today)
+        self.assertEqual(rows, [(self.today, issue.severity_id, issue.priority_id, 1, 0, 1)])
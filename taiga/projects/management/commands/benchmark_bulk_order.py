@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import closing
+from optparse import make_option
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db import transaction
+from django.db.models.loading import get_model
+
+from taiga.base.utils.slug import reserve_refs
+from taiga.domains import get_active_domain
+from taiga.projects.services import bulk_update_order
+
+
+class Rollback(Exception):
+    pass
+
+
+def _legacy_bulk_update_order(model, project, data):
+    # The old prepared statement, with one query for each object
+    table = connection.ops.quote_name(model._meta.db_table)
+    with closing(connection.cursor()) as cursor:
+        cursor.execute("""
+        prepare legacy_bulk_update_order as update {table} set "order" = $1
+            where {table}.id = $2 and {table}.project_id = $3;
+        """.format(table=table))
+        for id, order in data:
+            cursor.execute("EXECUTE legacy_bulk_update_order (%s, %s, %s);",
+                           (order, id, project.id))
+        cursor.execute("DEALLOCATE legacy_bulk_update_order;")
+    return len(data)
+
+
+class Command(BaseCommand):
+    help = ("Measure the latency of the reorder of a big backlog (created on a transaction "
+            "that is rolled back), with one query and with the old prepared statement for "
+            "each user story.")
+
+    option_list = BaseCommand.option_list + (
+        make_option("--userstories", action="store", type="int", dest="userstories",
+                    default=2000, help="Number of user stories of the backlog."),
+        make_option("--runs", action="store", type="int", dest="runs", default=5,
+                    help="Number of reorders made with each method."),
+    )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                project, ids = self._create_userstories(options["userstories"])
+                self._benchmark(project, ids, options["runs"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def _create_userstories(self, count):
+        user_model = get_model("users", "User")
+        project_model = get_model("projects", "Project")
+        userstory_model = get_model("userstories", "UserStory")
+
+        user = user_model.objects.create(username="order-benchmark-{0}".format(time.time()))
+        project = project_model.objects.create(name="Order benchmark", description="",
+                                               owner=user, domain=get_active_domain())
+
+        status = project.us_statuses.all()[0]
+        userstory_model.objects.bulk_create([userstory_model(subject="User story {0}".format(ref),
+                                                             ref=ref, order=order,
+                                                             project=project, owner=user,
+                                                             status=status)
+                                             for order, ref in enumerate(reserve_refs(
+                                                 project, "last_us_ref", count))],
+                                            batch_size=1000)
+
+        ids = list(userstory_model.objects.filter(project=project).values_list("id", flat=True))
+        return project, ids
+
+    def _benchmark(self, project, ids, runs):
+        userstory_model = get_model("userstories", "UserStory")
+
+        for name, method in (("prepared", _legacy_bulk_update_order),
+                             ("update from", bulk_update_order)):
+            elapsed = 0
+            for i in range(runs):
+                orders = list(range(len(ids)))
+                random.shuffle(orders)
+                data = list(zip(ids, orders))
+
+                start = time.time()
+                count = method(userstory_model, project, data)
+                elapsed += time.time() - start
+
+            self.stdout.write("{0:16} {1:10.1f} ms   ({2} updated)".format(
+                name, elapsed * 1000 / runs, count))
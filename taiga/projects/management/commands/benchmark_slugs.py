@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+from optparse import make_option
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.loading import get_model
+from django.template.defaultfilters import slugify
+
+from taiga.base.utils.slug import slugify_uniquely
+from taiga.domains import get_active_domain
+
+
+class Rollback(Exception):
+    pass
+
+
+def _legacy_slugify_uniquely(value, model, slugfield="slug"):
+    # The old linear probing, with one query for each taken suffix
+    suffix = 0
+    potential = base = slugify(value)
+    while True:
+        if suffix:
+            potential = "-".join([base, str(suffix)])
+        if not model.objects.filter(**{slugfield: potential}).count():
+            return potential
+        suffix += 1
+
+
+class Command(BaseCommand):
+    help = ("Measure the latency of the slug generation with a lot of colliding slugs (created "
+            "on a transaction that is rolled back), with one query and with the old linear "
+            "probing.")
+
+    option_list = BaseCommand.option_list + (
+        make_option("--slugs", action="store", type="int", dest="slugs", default=10000,
+                    help="Number of colliding slugs (sprint, sprint-1, sprint-2...)."),
+        make_option("--runs", action="store", type="int", dest="runs", default=5,
+                    help="Number of slugs generated with each method."),
+    )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._create_milestones(options["slugs"])
+                self._benchmark(options["runs"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def _create_milestones(self, count):
+        user_model = get_model("users", "User")
+        project_model = get_model("projects", "Project")
+        milestone_model = get_model("milestones", "Milestone")
+
+        user = user_model.objects.create(username="slug-benchmark-{0}".format(time.time()))
+        project = project_model.objects.create(name="Slug benchmark", description="",
+                                               owner=user, domain=get_active_domain())
+
+        slugs = ["sprint"] + ["sprint-{0}".format(i) for i in range(1, count)]
+        milestone_model.objects.bulk_create([milestone_model(name="Sprint", slug=slug,
+                                                             project=project, owner=user)
+                                             for slug in slugs], batch_size=1000)
+
+    def _benchmark(self, runs):
+        milestone_model = get_model("milestones", "Milestone")
+
+        for name, method in (("linear probing", _legacy_slugify_uniquely),
+                             ("max(suffix)", slugify_uniquely)):
+            start = time.time()
+            for i in range(runs):
+                slug = method("Sprint", milestone_model)
+            elapsed = (time.time() - start) * 1000 / runs
+            self.stdout.write("{0:16} {1:10.1f} ms   ({2})".format(name, elapsed, slug))
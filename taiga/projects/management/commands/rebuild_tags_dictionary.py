@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+from django.core.management.base import BaseCommand, CommandError
+
+from taiga.projects.models import Project
+from taiga.projects.services import tags
+
+
+class Command(BaseCommand):
+    args = "[project_id project_id ...]"
+    help = "Regenerate the tags dictionary of the given projects (all by default)."
+
+    def handle(self, *args, **options):
+        if not args:
+            tags.rebuild_tags_dictionary()
+            return
+
+        for project_id in args:
+            try:
+                project = Project.objects.get(pk=project_id)
+            except (Project.DoesNotExist, ValueError):
+                raise CommandError("Project '{0}' does not exist".format(project_id))
+
+            tags.rebuild_tags_dictionary(project)
+            self.stdout.write("Rebuilt tags dictionary of {0}".format(project))
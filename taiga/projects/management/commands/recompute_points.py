@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from taiga.projects.models import Project
+from taiga.projects.services import points as points_service
+
+
+class Command(BaseCommand):
+    args = "[project_id project_id ...]"
+    help = ("Verify the stored points per role of the milestones and projects of the given "
+            "projects (all by default) and repair the wrong ones.")
+
+    option_list = BaseCommand.option_list + (
+        make_option("--dry-run", action="store_true", dest="dry_run", default=False,
+                    help="Only report the wrong stored points, without repairing them."),
+    )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+
+        projects = Project.objects.all()
+        if args:
+            try:
+                projects = projects.filter(pk__in=[int(project_id) for project_id in args])
+            except ValueError:
+                raise CommandError("Invalid project ids: {0}".format(", ".join(args)))
+
+        for project in projects.order_by("id"):
+            with transaction.atomic():
+                self._recompute_project_points(project, dry_run)
+
+    def _recompute_project_points(self, project, dry_run):
+        action = "Wrong" if dry_run else "Repaired"
+
+        for milestone in project.milestones.all():
+            points = points_service.get_milestone_points(milestone.id)
+            if points != points_service.get_stored_milestone_points(milestone.id):
+                self.stdout.write("{0} points of milestone {1}".format(action, milestone))
+                if not dry_run:
+                    points_service.update_milestone_points(milestone.id)
+
+        points = points_service.get_project_points(project.id)
+        if points != points_service.get_stored_project_points(project.id):
+            self.stdout.write("{0} points of project {1}".format(action, project))
+            if not dry_run:
+                points_service.update_project_points(project.id)
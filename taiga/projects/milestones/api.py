@@ -64,14 +64,20 @@ class MilestoneViewSet(NotificationSenderMixin, ModelCrudViewSet):
         optimal_points = sumTotalPoints
         milestone_days = (milestone.estimated_finish - milestone.estimated_start).days
         optimal_points_per_day = sumTotalPoints / milestone_days if milestone_days else 0
+
+        dates = []
         while current_date <= milestone.estimated_finish:
+            dates.append(current_date)
+            current_date = current_date + datetime.timedelta(days=1)
+
+        closed_points_by_dates = milestone.closed_points_by_dates(dates)
+        for current_date, closed_points in zip(dates, closed_points_by_dates):
             milestone_stats['days'].append({
                 'day': current_date,
                 'name': current_date.day,
-                'open_points':  sumTotalPoints - sum(milestone.closed_points_by_date(current_date).values()),
+                'open_points':  sumTotalPoints - sum(closed_points.values()),
                 'optimal_points': optimal_points,
             })
-            current_date = current_date + datetime.timedelta(days=1)
             optimal_points -= optimal_points_per_day
 
         return Response(milestone_stats)
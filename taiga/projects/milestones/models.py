@@ -1,17 +1,21 @@
 # -*- coding: utf-8 -*-
 
 from django.db import models
+from django.db.models.loading import get_model
 from django.conf import settings
+from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 
-from taiga.base.utils.slug import slugify_uniquely
+from taiga.base.utils.slug import save_uniquely_slugified
 from taiga.base.utils.dicts import dict_sum
 from taiga.base.notifications.models import WatchedMixin
 
 from taiga.projects.userstories.models import UserStory
 
 import reversion
-import itertools
+import collections
+import functools
 import datetime
 
 
@@ -66,27 +70,26 @@ class Milestone(WatchedMixin, models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify_uniquely(self.name, self.__class__)
+            return save_uniquely_slugified(self, self.name,
+                                           functools.partial(super().save, *args, **kwargs))
 
         super().save(*args, **kwargs)
 
     def _get_user_stories_points(self, user_stories):
-        role_points = [us.role_points.all() for us in user_stories]
-        flat_role_points = itertools.chain(*role_points)
-        flat_role_dicts = map(lambda x: {x.role_id: x.points.value if x.points.value else 0}, flat_role_points)
-        return dict_sum(*flat_role_dicts)
+        from taiga.projects.services import points as points_service
+        return points_service.get_points_per_role(user_stories)
+
+    def _get_stored_points(self, field_name):
+        return dict_sum({row.role_id: getattr(row, field_name)
+                             for row in self.points_per_role.all()})
 
     @property
     def total_points(self):
-        return self._get_user_stories_points(
-            [us for us in self.user_stories.all()]
-        )
+        return self._get_stored_points("total_points")
 
     @property
     def closed_points(self):
-        return self._get_user_stories_points(
-            [us for us in self.user_stories.all() if us.is_closed]
-        )
+        return self._get_stored_points("closed_points")
 
     def _get_points_increment(self, client_requirement, team_requirement):
         user_stories = UserStory.objects.none()
@@ -127,12 +130,71 @@ class Milestone(WatchedMixin, models.Model):
         }
 
     def closed_points_by_date(self, date):
-        return self._get_user_stories_points([
-            us for us in self.user_stories.filter(
-                finish_date__lt=date + datetime.timedelta(days=1)
-            ) if us.is_closed
-        ])
+        return self.closed_points_by_dates([date])[0]
+
+    def closed_points_by_dates(self, dates):
+        """
+        Get the closed points per role at the end of each one of the
+        given dates. The points of the milestone user stories are
+        loaded only once and accumulated following the stories finish
+        date order.
+        """
+        rolepoints_model = get_model("userstories", "RolePoints")
+        role_points = rolepoints_model.objects.filter(user_story__milestone=self,
+                                                      user_story__is_closed=True,
+                                                      user_story__finish_date__isnull=False)
+        role_points = role_points.order_by("user_story__finish_date")
+        role_points = list(role_points.values_list("user_story__finish_date", "role_id",
+                                                   "points__value"))
+
+        default_timezone = timezone.get_default_timezone()
+        accumulated_points = collections.Counter()
+        closed_points = {}
+        index = 0
+
+        for date in sorted(set(dates)):
+            limit = datetime.datetime.combine(date + datetime.timedelta(days=1), datetime.time())
+            limit = timezone.make_aware(limit, default_timezone)
+
+            while index < len(role_points) and role_points[index][0] < limit:
+                finish_date, role_id, value = role_points[index]
+                accumulated_points[role_id] += value if value else 0
+                index += 1
+
+            closed_points[date] = dict_sum(accumulated_points)
+
+        return [closed_points[date] for date in dates]
+
+
+class MilestoneRolePoints(models.Model):
+    """
+    Points of the user stories of a milestone for a role, kept
+    up to date by taiga.projects.services.points.
+    """
+    milestone = models.ForeignKey("Milestone", null=False, blank=False,
+                                  related_name="points_per_role", verbose_name=_("milestone"))
+    role = models.ForeignKey("users.Role", null=False, blank=False,
+                             related_name="milestone_points", verbose_name=_("role"))
+    total_points = models.FloatField(default=0, null=False, blank=False,
+                                     verbose_name=_("total points"))
+    closed_points = models.FloatField(default=0, null=False, blank=False,
+                                      verbose_name=_("closed points"))
+
+    class Meta:
+        verbose_name = "milestone role points"
+        verbose_name_plural = "milestone role points"
+        unique_together = ("milestone", "role")
 
 
 # Reversion registration (usufull for base.notification and for meke a historical)
 reversion.register(Milestone)
+
+
+# Stored points per role handlers
+@receiver(models.signals.pre_delete, sender=Milestone,
+          dispatch_uid="milestone_pre_delete_update_points")
+def milestone_delete_update_points(sender, instance, **kwargs):
+    from taiga.projects.services import points as points_service
+
+    # The milestone user stories are going to be unassigned.
+    points_service.update_points_for_milestone_delete(instance)
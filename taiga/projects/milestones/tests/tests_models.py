@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+from unittest.mock import patch
+
+from django import test
+from django.utils import timezone
+
+from taiga.base.users.tests import create_user
+from taiga.base.utils.slug import slugify_uniquely
+from taiga.projects.services import points as points_service
+from taiga.projects.tests import create_project
+from taiga.projects.userstories.tests import create_userstory
+
+from . import create_milestone
+from .. import models
+
+
+class MilestoneClosedPointsTestCase(test.TestCase):
+    fixtures = ["initial_domains.json",]
+
+    def setUp(self):
+        self.user1 = create_user(1)
+        self.project1 = create_project(1, self.user1)
+        self.milestone1 = create_milestone(1, self.user1, self.project1)
+
+        self.today = timezone.now()
+        self.points = self.project1.points.get(value=2)
+
+        for x, days_ago in enumerate([3, 1, 1]):
+            userstory = create_userstory(x, self.user1, self.project1, self.milestone1)
+            userstory.is_closed = True
+            userstory.finish_date = self.today - datetime.timedelta(days=days_ago)
+            userstory.save()
+            points_service.set_role_points(userstory.role_points.all(), self.points)
+
+        # An open user story never counts as closed points.
+        userstory = create_userstory(4, self.user1, self.project1, self.milestone1)
+        points_service.set_role_points(userstory.role_points.all(), self.points)
+
+    def test_closed_points_by_dates(self):
+        dates = [(self.today - datetime.timedelta(days=x)).date() for x in range(4, -1, -1)]
+        closed_points = self.milestone1.closed_points_by_dates(dates)
+
+        roles_count = self.project1.roles.filter(computable=True).count()
+        self.assertEqual([sum(x.values()) for x in closed_points],
+                         [0, 2 * roles_count, 2 * roles_count, 6 * roles_count, 6 * roles_count])
+
+        for date, points in zip(dates, closed_points):
+            self.assertEqual(points, self.milestone1.closed_points_by_date(date))
+
+
+class MilestoneSlugTestCase(test.TestCase):
+    fixtures = ["initial_domains.json",]
+
+    def setUp(self):
+        self.user1 = create_user(1)
+        self.project1 = create_project(1, self.user1)
+
+    def _create_milestone(self, name, slug=""):
+        return models.Milestone.objects.create(name=name, slug=slug, project=self.project1,
+                                               owner=self.user1)
+
+    def test_slugs_get_the_next_free_suffix(self):
+        self.assertEqual(self._create_milestone("Sprint").slug, "sprint")
+        self.assertEqual(self._create_milestone("Sprint").slug, "sprint-1")
+
+        self._create_milestone("Sprint 7", slug="sprint-7")
+        self._create_milestone("Sprint planning", slug="sprint-planning")
+        self.assertEqual(self._create_milestone("Sprint").slug, "sprint-8")
+
+    def test_slugs_are_found_with_one_query(self):
+        for i in range(20):
+            self._create_milestone("Sprint", slug="sprint-{0}".format(i))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(slugify_uniquely("Sprint", models.Milestone), "sprint-20")
+
+    def test_save_is_retried_if_the_slug_is_taken(self):
+        self._create_milestone("Sprint")
+
+        # The first slug is taken by another milestone before the save
+        slugs = ["sprint"]
+        with patch("taiga.base.utils.slug.slugify_uniquely",
+                   side_effect=lambda *args: slugs.pop() if slugs else slugify_uniquely(*args)):
+            milestone = self._create_milestone("Sprint")
+
+        self.assertEqual(milestone.slug, "sprint-1")
+        self.assertEqual(models.Milestone.objects.get(id=milestone.id).slug, "sprint-1")
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 
-import itertools
+from contextlib import closing
+import functools
 import time
 import reversion
 
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.db import models
 from django.db.models.loading import get_model
 from django.conf import settings
@@ -12,15 +14,13 @@ from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes import generic
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import Permission
 from django.utils.translation import ugettext_lazy as _
 from django.utils import timezone
 
-from picklefield.fields import PickledObjectField
-
+from taiga.base.fields import TagsField
 from taiga.domains.models import DomainMember
 from taiga.projects.userstories.models import UserStory
-from taiga.base.utils.slug import slugify_uniquely
+from taiga.base.utils.slug import save_uniquely_slugified
 from taiga.base.utils.dicts import dict_sum
 from taiga.base.users.models import Role
 
@@ -98,6 +98,11 @@ class ProjectDefaults(models.Model):
         abstract = True
 
 
+# The refs counters of the projects. They are only updated by
+# reserve_refs (with an atomic update), never by the saves.
+REFS_COUNTERS_FIELDS = ("last_us_ref", "last_task_ref", "last_issue_ref")
+
+
 class Project(ProjectDefaults, models.Model):
     name = models.CharField(max_length=250, unique=True, null=False, blank=False,
                             verbose_name=_("name"))
@@ -125,7 +130,7 @@ class Project(ProjectDefaults, models.Model):
                                            verbose_name=_("total of milestones"))
     total_story_points = models.FloatField(default=None, null=True, blank=False,
                                            verbose_name=_("total story points"))
-    tags = PickledObjectField(null=False, blank=True, verbose_name=_("tags"))
+    tags = TagsField(null=False, blank=True, verbose_name=_("tags"))
 
     is_backlog_activated = models.BooleanField(default=True, null=False, blank=True,
                                                verbose_name=_("active backlog panel"))
@@ -166,11 +171,21 @@ class Project(ProjectDefaults, models.Model):
         return "<Project {0}>".format(self.id)
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify_uniquely(self.name, self.__class__)
         if not self.videoconferences:
             self.videoconferences_salt = None
 
+        if not self._state.adding and not kwargs.get("force_insert", False):
+            # Don't write back the loaded refs counters, maybe already incremented
+            update_fields = kwargs.get("update_fields", None)
+            if update_fields is None:
+                update_fields = [field.name for field in self._meta.concrete_fields
+                                     if not field.primary_key]
+            kwargs["update_fields"] = [name for name in update_fields
+                                           if name not in REFS_COUNTERS_FIELDS]
+
+        if not self.slug:
+            return save_uniquely_slugified(self, self.name,
+                                           functools.partial(super().save, *args, **kwargs))
         super().save(*args, **kwargs)
 
     def get_roles(self):
@@ -181,33 +196,63 @@ class Project(ProjectDefaults, models.Model):
         members = self.memberships.values_list("user", flat=True)
         return user_model.objects.filter(id__in=list(members))
 
-    def update_role_points(self):
-        rolepoints_model = get_model("userstories", "RolePoints")
-
-        # Get all available roles on this project
-        roles = self.get_roles().filter(computable=True)
+    def update_role_points(self, user_stories=None):
+        """
+        Create the missing role points (with undefined points) of the
+        project user stories for the computable roles and remove the
+        role points of any other role, using one query for each.
+
+        If user_stories is given, only the role points of these user
+        stories are updated.
+        """
+        from taiga.projects.services import points as points_service
+
+        params = []
+        user_stories_sql = ""
+        if user_stories is not None:
+            user_stories_sql = "and us.id = any(%s)"
+            params = [[us.id for us in user_stories]]
+            if not params[0]:
+                return
 
         # Get point instance that represent a null/undefined
         null_points_value = self.points.get(value=None)
 
-        # Iter over all project user stories and create
-        # role point instance for new created roles.
-        for us in self.user_stories.all():
-            for role in roles:
-                if not us.role_points.filter(role=role).exists():
-                    rolepoints_model.objects.create(role=role, user_story=us,
-                                                    points=null_points_value)
-
-        # Now remove rolepoints associated with not existing roles.
-        rp_query = rolepoints_model.objects.filter(user_story__in=self.user_stories.all())
-        rp_query = rp_query.exclude(role__id__in=roles.values_list("id", flat=True))
-        rp_query.delete()
+        insert_sql = """
+        insert into userstories_rolepoints (role_id, user_story_id, points_id)
+        select r.id, us.id, %s
+            from userstories_userstory as us
+            inner join users_role as r on (r.project_id = us.project_id and r.computable)
+            where us.project_id = %s {user_stories}
+                  and not exists (select 1 from userstories_rolepoints as rp
+                                      where rp.user_story_id = us.id and rp.role_id = r.id);
+        """.format(user_stories=user_stories_sql)
+
+        delete_sql = """
+        delete from userstories_rolepoints as rp
+            using userstories_userstory as us
+            where rp.user_story_id = us.id and us.project_id = %s {user_stories}
+                  and rp.role_id not in (select id from users_role
+                                             where project_id = %s and computable)
+            returning rp.user_story_id, rp.role_id, rp.points_id;
+        """.format(user_stories=user_stories_sql)
+
+        with closing(connection.cursor()) as cursor:
+            cursor.execute(insert_sql, [null_points_value.id, self.id] + params)
+            cursor.execute(delete_sql, [self.id] + params + [self.id])
+            removed_role_points = cursor.fetchall()
+
+        # New role points have undefined points, but the removed
+        # ones can change the stored points per role.
+        points_service.update_points_for_role_points_delete(removed_role_points)
 
     def _get_user_stories_points(self, user_stories):
-        role_points = [us.role_points.all() for us in user_stories]
-        flat_role_points = itertools.chain(*role_points)
-        flat_role_dicts = map(lambda x: {x.role_id: x.points.value if x.points.value else 0}, flat_role_points)
-        return dict_sum(*flat_role_dicts)
+        from taiga.projects.services import points as points_service
+        return points_service.get_points_per_role(user_stories)
+
+    def _get_stored_points(self, field_name):
+        return dict_sum({row.role_id: getattr(row, field_name)
+                             for row in self.points_per_role.all()})
 
     def _get_points_increment(self, client_requirement, team_requirement):
         user_stories = UserStory.objects.none()
@@ -246,15 +291,15 @@ class Project(ProjectDefaults, models.Model):
 
     @property
     def closed_points(self):
-        return dict_sum(*[ml.closed_points for ml in self.milestones.all()])
+        return self._get_stored_points("closed_points")
 
     @property
     def defined_points(self):
-        return self._get_user_stories_points(self.user_stories.all())
+        return self._get_stored_points("defined_points")
 
     @property
     def assigned_points(self):
-        return self._get_user_stories_points(self.user_stories.filter(milestone__isnull=False))
+        return self._get_stored_points("assigned_points")
 
 
 def get_attachment_file_path(instance, filename):
@@ -350,6 +395,28 @@ class Points(models.Model):
         return self.name
 
 
+class ProjectRolePoints(models.Model):
+    """
+    Points of the user stories of a project for a role, kept
+    up to date by taiga.projects.services.points.
+    """
+    project = models.ForeignKey("Project", null=False, blank=False,
+                                related_name="points_per_role", verbose_name=_("project"))
+    role = models.ForeignKey("users.Role", null=False, blank=False,
+                             related_name="project_points", verbose_name=_("role"))
+    defined_points = models.FloatField(default=0, null=False, blank=False,
+                                       verbose_name=_("defined points"))
+    assigned_points = models.FloatField(default=0, null=False, blank=False,
+                                        verbose_name=_("assigned points"))
+    closed_points = models.FloatField(default=0, null=False, blank=False,
+                                      verbose_name=_("closed points"))
+
+    class Meta:
+        verbose_name = "project role points"
+        verbose_name_plural = "project role points"
+        unique_together = ("project", "role")
+
+
 # Tasks common models
 
 class TaskStatus(models.Model):
@@ -501,6 +568,28 @@ class QuestionStatus(models.Model):
         return self.name
 
 
+class ProjectTag(models.Model):
+    project = models.ForeignKey("Project", null=False, blank=False,
+                                related_name="tags_dictionary",
+                                verbose_name=_("project"))
+    object_type = models.CharField(max_length=50, null=False, blank=False,
+                                   choices=choices.TAGGED_OBJECT_TYPES,
+                                   verbose_name=_("object type"))
+    name = models.CharField(max_length=255, null=False, blank=False,
+                            verbose_name=_("name"))
+    count = models.IntegerField(default=0, null=False, blank=False,
+                                verbose_name=_("count"))
+
+    class Meta:
+        verbose_name = "project tag"
+        verbose_name_plural = "project tags"
+        ordering = ["project", "name", "object_type"]
+        unique_together = ("project", "object_type", "name")
+
+    def __str__(self):
+        return self.name
+
+
 # Reversion registration (usufull for base.notification and for meke a historical)
 reversion.register(Project)
 reversion.register(Attachment)
@@ -543,75 +632,74 @@ def update_watchers_on_membership_post_delete(sender, instance, using, **kwargs)
         model.watchers.through.objects.filter(user_id=instance.user_id).delete()
 
 
+# On membership object is changed or deleted, invalidate the cached
+# project permissions of its user.
+@receiver(models.signals.post_save, sender=Membership,
+          dispatch_uid='invalidate_project_perms_on_membership_post_save')
+@receiver(models.signals.post_delete, sender=Membership,
+          dispatch_uid='invalidate_project_perms_on_membership_post_delete')
+def invalidate_project_perms_on_membership_change(sender, instance, **kwargs):
+    from taiga.base.permissions import invalidate_project_perms
+    invalidate_project_perms([(instance.user_id, instance.project_id)])
+
+
+# On membership object is moved to another user, invalidate the cached
+# project permissions of the previous one too.
+@receiver(models.signals.pre_save, sender=Membership,
+          dispatch_uid='invalidate_project_perms_on_membership_pre_save')
+def invalidate_project_perms_on_membership_user_change(sender, instance, **kwargs):
+    from taiga.base.models import get_stored_values
+    from taiga.base.permissions import invalidate_project_perms
+
+    stored_values = get_stored_values(instance)
+    if stored_values and stored_values["user_id"] != instance.user_id:
+        invalidate_project_perms([(stored_values["user_id"], stored_values["project_id"])])
+
+
+# On a lookup table object (statuses, points, priorities...) is changed
+# or deleted, invalidate the cached lookup tables of its project.
+def invalidate_lookups_on_change(sender, instance, **kwargs):
+    from taiga.projects.services import lookups
+    lookups.invalidate_lookups(instance.project_id)
+
+for lookup_model in (UserStoryStatus, Points, TaskStatus, Priority, Severity, IssueStatus,
+                     IssueType, QuestionStatus, Role):
+    models.signals.post_save.connect(
+        invalidate_lookups_on_change, sender=lookup_model,
+        dispatch_uid="invalidate_lookups_on_{0}_post_save".format(lookup_model._meta.model_name))
+    models.signals.post_delete.connect(
+        invalidate_lookups_on_change, sender=lookup_model,
+        dispatch_uid="invalidate_lookups_on_{0}_post_delete".format(lookup_model._meta.model_name))
+
+
 @receiver(models.signals.post_save, sender=Project, dispatch_uid='project_post_save')
 def project_post_save(sender, instance, created, **kwargs):
     """
     Populate new project dependen default data
     """
-    if not created:
+    if not created or getattr(instance, "_skip_default_data", False):
+        return
+
+    from taiga.projects.services import bootstrap
+    bootstrap.create_default_data([instance])
+
+
+# Stored points per role handlers
+@receiver(models.signals.pre_save, sender=Points,
+          dispatch_uid="points_pre_save_store_value")
+def points_store_previous_value(sender, instance, **kwargs):
+    from taiga.base.models import get_stored_values
+
+    stored_values = get_stored_values(instance)
+    instance._previous_value = stored_values and stored_values["value"]
+
+
+@receiver(models.signals.post_save, sender=Points,
+          dispatch_uid="points_post_save_update_points")
+def points_update_points(sender, instance, created, **kwargs):
+    from taiga.projects.services import points as points_service
+
+    if created:
         return
 
-    # USs
-    for order, name, value, is_default in choices.POINTS_CHOICES:
-        obj = Points.objects.create(project=instance, name=name, order=order, value=value)
-        if is_default:
-            instance.default_points = obj
-
-    for order, name, is_closed, is_default, color in choices.US_STATUSES:
-        obj = UserStoryStatus.objects.create(name=name, order=order, color=color,
-                                             is_closed=is_closed, project=instance)
-        if is_default:
-            instance.default_us_status = obj
-
-    # Tasks
-    for order, name, is_closed, is_default, color in choices.TASK_STATUSES:
-        obj = TaskStatus.objects.create(name=name, order=order, color=color,
-                                        is_closed=is_closed, project=instance)
-        if is_default:
-            instance.default_task_status = obj
-
-    # Issues
-    for order, name, color, is_default in choices.PRIORITY_CHOICES:
-        obj = Priority.objects.create(project=instance, name=name, order=order, color=color)
-        if is_default:
-            instance.default_priority = obj
-
-    for order, name, color, is_default in choices.SEVERITY_CHOICES:
-        obj = Severity.objects.create(project=instance, name=name, order=order, color=color)
-        if is_default:
-            instance.default_severity = obj
-
-    for order, name, is_closed, color, is_default in choices.ISSUE_STATUSES:
-        obj = IssueStatus.objects.create(name=name, order=order,
-                                         is_closed=is_closed, project=instance, color=color)
-        if is_default:
-            instance.default_issue_status = obj
-
-    for order, name, color, is_default in choices.ISSUE_TYPES:
-        obj = IssueType.objects.create(project=instance, name=name, order=order, color=color)
-        if is_default:
-            instance.default_issue_type = obj
-
-    # Questions
-    for order, name, is_closed, color, is_default in choices.QUESTION_STATUS:
-        obj = QuestionStatus.objects.create(name=name, order=order,
-                                            is_closed=is_closed, project=instance, color=color)
-        if is_default:
-            instance.default_question_status = obj
-
-    # Permissions
-    for order, slug, name, computable, permissions in choices.ROLES:
-        obj = Role.objects.create(slug=slug, name=name, order=order, computable=computable, project=instance)
-        for permission in permissions:
-            try:
-                perm = Permission.objects.get(codename=permission[0], content_type__app_label=permission[1], content_type__model=permission[2])
-                obj.permissions.add(perm)
-            except Permission.DoesNotExist:
-                pass
-
-    instance.save()
-
-    from taiga.projects.template_manager import ProjectTemplateManager
-    if hasattr(instance, "template"):
-        template_manager = ProjectTemplateManager()
-        template_manager.apply(instance.template, instance)
+    points_service.update_points_for_points_change(instance, instance._previous_value)
@@ -7,7 +7,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.dispatch import receiver
 
-from taiga.base.utils.slug import ref_uniquely
+from taiga.base.utils.slug import next_ref
 from taiga.base.notifications.models import WatchedMixin
 
 from picklefield.fields import PickledObjectField
@@ -70,7 +70,8 @@ class Question(WatchedMixin):
 
     @property
     def is_closed(self):
-        return self.status.is_closed
+        from taiga.projects.services import lookups
+        return lookups.get_related_lookup(self, "status").is_closed
 
     def _get_watchers_by_role(self):
         return {
@@ -95,7 +96,6 @@ def question_finished_date_handler(sender, instance, **kwargs):
 @receiver(models.signals.pre_save, sender=Question, dispatch_uid="question_ref_handler")
 def question_ref_handler(sender, instance, **kwargs):
     if not instance.id and instance.project:
-        instance.ref = ref_uniquely(instance.project,"last_question_ref",
-                                    instance.__class__)
+        instance.ref = next_ref(instance.project, "last_question_ref")
 
 
@@ -6,6 +6,7 @@ from taiga.base.serializers import PickleField
 from taiga.base.users.models import Role
 
 from . import models
+from .services import lookups
 
 from os import path
 
@@ -38,50 +39,62 @@ class AttachmentSerializer(serializers.ModelSerializer):
         return 0
 
 
+class LookupSerializerMixin(object):
+    """
+    Serializer of a lookup table (statuses, points...) that, nested
+    on a project, reads the list of its objects from the project
+    lookups cache.
+    """
+    def field_to_native(self, obj, field_name):
+        if self.many and isinstance(obj, models.Project) and not self.write_only:
+            return [self.to_native(item) for item in lookups.get_lookups(self.opts.model, obj.id)]
+        return super().field_to_native(obj, field_name)
+
+
 # User Stories common serializers
 
-class PointsSerializer(serializers.ModelSerializer):
+class PointsSerializer(LookupSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Points
 
 
-class UserStoryStatusSerializer(serializers.ModelSerializer):
+class UserStoryStatusSerializer(LookupSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.UserStoryStatus
 
 
 # Task common serializers
 
-class TaskStatusSerializer(serializers.ModelSerializer):
+class TaskStatusSerializer(LookupSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.TaskStatus
 
 
 # Issues common serializers
 
-class SeveritySerializer(serializers.ModelSerializer):
+class SeveritySerializer(LookupSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Severity
 
 
-class PrioritySerializer(serializers.ModelSerializer):
+class PrioritySerializer(LookupSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Priority
 
 
-class IssueStatusSerializer(serializers.ModelSerializer):
+class IssueStatusSerializer(LookupSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.IssueStatus
 
 
-class IssueTypeSerializer(serializers.ModelSerializer):
+class IssueTypeSerializer(LookupSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.IssueType
 
 
 # Questions common serializers
 
-class QuestionStatusSerializer(serializers.ModelSerializer):
+class QuestionStatusSerializer(LookupSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = models.QuestionStatus
 
@@ -134,16 +147,15 @@ class ProjectDetailSerializer(ProjectSerializer):
         roles_list = []
 
         if obj and obj.memberships:
+            role_ids = set(obj.memberships.values_list("role_id", flat=True))
+            roles = [role for role in lookups.get_lookups(Role, obj.id) if role.id in role_ids]
             roles_list = [{
-                "id": role["role__id"],
-                "name": role["role__name"],
-                "slug": role["role__slug"],
-                "order": role["role__order"],
-                "computable": role["role__computable"],
-            } for role in obj.memberships.values("role__id", "role__name", "role__slug", "role__order",
-                                                 "role__computable")
-                                         .order_by("role__order", "role__id")
-                                         .distinct("role__order", "role__id")]
+                "id": role.id,
+                "name": role.name,
+                "slug": role.slug,
+                "order": role.order,
+                "computable": role.computable,
+            } for role in sorted(roles, key=lambda role: (role.order, role.id))]
 
         return roles_list
 
@@ -151,6 +163,8 @@ class ProjectDetailSerializer(ProjectSerializer):
         milestones_list = []
 
         if obj and obj.milestones:
+            milestones = obj.milestones.prefetch_related("points_per_role")
+            milestones = milestones.order_by("estimated_start")
             milestones_list = [{
                 "id": milestone.id,
                 "name": milestone.name,
@@ -160,7 +174,7 @@ class ProjectDetailSerializer(ProjectSerializer):
                 "client_increment_points": milestone.client_increment_points,
                 "team_increment_points": milestone.team_increment_points,
                 "closed": milestone.closed
-            } for milestone in obj.milestones.all().order_by("estimated_start")]
+            } for milestone in milestones]
 
         return milestones_list
 
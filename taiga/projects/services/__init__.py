@@ -1,14 +1,10 @@
 # This makes all code that import services works and
 # is not the baddest practice ;)
 
-from .bulk_update_order import bulk_update_question_status_order
-from .bulk_update_order import bulk_update_severity_order
-from .bulk_update_order import bulk_update_priority_order
-from .bulk_update_order import bulk_update_issue_type_order
-from .bulk_update_order import bulk_update_issue_status_order
-from .bulk_update_order import bulk_update_task_status_order
-from .bulk_update_order import bulk_update_points_order
-from .bulk_update_order import bulk_update_userstory_status_order
+from .bulk_update_order import bulk_update_order
+
+from .bootstrap import create_default_data
+from .bootstrap import bulk_create_projects
 
 from .filters import get_all_tags
 from .filters import get_issues_filters_data
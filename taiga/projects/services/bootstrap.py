@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+from django.contrib.auth.models import Permission
+from django.db import transaction
+from django.db.models.loading import get_model
+
+from taiga.projects import choices
+
+from . import lookups
+
+
+def _get_default_values():
+    """
+    Get the default values of the new projects as a list of
+    (model name, project default field, [(is default, fields)]).
+    """
+    return [
+        # USs
+        ("Points", "default_points",
+         [(is_default, {"name": name, "order": order, "value": value})
+          for order, name, value, is_default in choices.POINTS_CHOICES]),
+        ("UserStoryStatus", "default_us_status",
+         [(is_default, {"name": name, "order": order, "color": color, "is_closed": is_closed})
+          for order, name, is_closed, is_default, color in choices.US_STATUSES]),
+
+        # Tasks
+        ("TaskStatus", "default_task_status",
+         [(is_default, {"name": name, "order": order, "color": color, "is_closed": is_closed})
+          for order, name, is_closed, is_default, color in choices.TASK_STATUSES]),
+
+        # Issues
+        ("Priority", "default_priority",
+         [(is_default, {"name": name, "order": order, "color": color})
+          for order, name, color, is_default in choices.PRIORITY_CHOICES]),
+        ("Severity", "default_severity",
+         [(is_default, {"name": name, "order": order, "color": color})
+          for order, name, color, is_default in choices.SEVERITY_CHOICES]),
+        ("IssueStatus", "default_issue_status",
+         [(is_default, {"name": name, "order": order, "color": color, "is_closed": is_closed})
+          for order, name, is_closed, color, is_default in choices.ISSUE_STATUSES]),
+        ("IssueType", "default_issue_type",
+         [(is_default, {"name": name, "order": order, "color": color})
+          for order, name, color, is_default in choices.ISSUE_TYPES]),
+
+        # Questions
+        ("QuestionStatus", "default_question_status",
+         [(is_default, {"name": name, "order": order, "color": color, "is_closed": is_closed})
+          for order, name, is_closed, color, is_default in choices.QUESTION_STATUS]),
+    ]
+
+
+def _create_roles(projects):
+    role_model = get_model("users", "Role")
+    role_model.objects.bulk_create([role_model(slug=slug, name=name, order=order,
+                                               computable=computable, project_id=project.id)
+                                    for project in projects
+                                    for order, slug, name, computable, permissions in choices.ROLES])
+
+    codenames = set(permission[0] for role in choices.ROLES for permission in role[4])
+    qs = Permission.objects.filter(codename__in=codenames)
+    permission_ids = {(codename, app_label, model): id for id, codename, app_label, model
+                          in qs.values_list("id", "codename", "content_type__app_label",
+                                            "content_type__model")}
+
+    qs = role_model.objects.filter(project_id__in=[project.id for project in projects])
+    role_ids = {(project_id, slug): id for id, project_id, slug
+                    in qs.values_list("id", "project_id", "slug")}
+
+    # The permissions that don't exist are ignored
+    through_model = role_model.permissions.through
+    through_model.objects.bulk_create([
+        through_model(role_id=role_ids[(project.id, slug)],
+                      permission_id=permission_ids[tuple(permission)])
+        for project in projects
+        for order, slug, name, computable, permissions in choices.ROLES
+        for permission in permissions if tuple(permission) in permission_ids])
+
+
+def create_default_data(projects):
+    """
+    Create the default points, statuses, priorities, severities,
+    types and roles (with their permissions) of some new projects
+    with one bulk insert for each model, and set the defaults of
+    the projects.
+    """
+    project_model = get_model("projects", "Project")
+    project_ids = [project.id for project in projects]
+    defaults = {project.id: {} for project in projects}
+
+    for model_name, default_field, values in _get_default_values():
+        model = get_model("projects", model_name)
+        model.objects.bulk_create([model(project_id=project.id, **fields)
+                                   for project in projects for is_default, fields in values])
+
+        default_orders = [fields["order"] for is_default, fields in values if is_default]
+        if default_orders:
+            # bulk_create doesn't set the ids of the objects
+            qs = model.objects.filter(project_id__in=project_ids, order=default_orders[-1])
+            for project_id, id in qs.values_list("project_id", "id"):
+                defaults[project_id][default_field] = id
+
+    _create_roles(projects)
+
+    from taiga.projects.template_manager import ProjectTemplateManager
+    template_manager = ProjectTemplateManager()
+
+    for project in projects:
+        project_model.objects.filter(id=project.id).update(**defaults[project.id])
+        for default_field, id in defaults[project.id].items():
+            setattr(project, project_model._meta.get_field(default_field).attname, id)
+
+        if hasattr(project, "template"):
+            template_manager.apply(project.template, project)
+
+        # The bulk inserts don't send the signals that invalidate them
+        lookups.invalidate_lookups(project.id)
+
+
+def bulk_create_projects(projects):
+    """
+    Create some new projects (unsaved Project instances) and their
+    default data, with only one bulk insert of each model of the
+    default data for all of them.
+    """
+    with transaction.atomic():
+        for project in projects:
+            project._skip_default_data = True
+            try:
+                project.save()
+            finally:
+                del project._skip_default_data
+
+        create_default_data(projects)
+
+    return projects
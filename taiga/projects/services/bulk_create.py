@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import functools
+
+import reversion
+
+from taiga.base.utils.slug import reserve_refs
+from taiga.events import changes as events_changes
+from taiga.events import middleware as events_middleware
+
+
+def _add_to_revision(objects):
+    # The same as the post_save receiver of reversion
+    context_manager = reversion.revision_context_manager
+    if not context_manager.is_active() or context_manager.is_managing_manually():
+        return
+
+    manager = reversion.default_revision_manager
+    for obj in objects:
+        if not manager.is_registered(obj.__class__):
+            continue
+        adapter = manager.get_adapter(obj.__class__)
+        version_data = functools.partial(adapter.get_version_data, obj, context_manager.get_db())
+        context_manager.add_to_context(manager, obj, version_data)
+
+
+def bulk_create_with_refs(model, project, seq_field, objects):
+    """
+    Create some new objects of a project with only one insert
+    and a block of refs reserved at once, and return them (with
+    their ids) sorted by ref.
+
+    The post_save signals are not sent, so the objects are added
+    to the current revision here and their create events are
+    emitted together. Any other side effect must be done by the
+    caller.
+    """
+    if not objects:
+        return []
+
+    refs = reserve_refs(project, seq_field, len(objects))
+    for obj, ref in zip(objects, refs):
+        obj.ref = ref
+    model.objects.bulk_create(objects)
+
+    # bulk_create doesn't set the ids of the objects
+    qs = model.objects.filter(project_id=project.id, ref__range=(refs[0], refs[-1]))
+    objects = list(qs.order_by("ref"))
+
+    _add_to_revision(objects)
+    events_changes.emit_change_events_for_models(objects, events_middleware.get_current_session_id(),
+                                                 type="create")
+    return objects
@@ -1,139 +1,51 @@
 # -*- coding: utf-8 -*-
 
+from contextlib import closing
+
 from django.db import transaction
 from django.db import connection
 
-
-@transaction.atomic
-def bulk_update_userstory_status_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_userstorystatus set "order" = $1
-        where projects_userstorystatus.id = $2 and
-              projects_userstorystatus.project_id = $3;
-    """
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.close()
+from . import lookups
 
 
 @transaction.atomic
-def bulk_update_points_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_points set "order" = $1
-        where projects_points.id = $2 and
-              projects_points.project_id = $3;
+def bulk_update_order(model, project, data, field="order"):
     """
+    Set the order of some objects of a project, from a list of
+    (id, order) pairs, with only one query.
 
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_task_status_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_taskstatus set "order" = $1
-        where projects_taskstatus.id = $2 and
-              projects_taskstatus.project_id = $3;
+    The objects of other projects and the ones that already have
+    that order are not updated. Return the number of updated
+    objects. Raise ValueError if the data is not valid.
     """
+    try:
+        orders = dict((int(id), int(order)) for id, order in data)
+    except TypeError:
+        raise ValueError("Invalid data")
 
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_issue_status_order(project, user, data):
-    cursor = connection.cursor()
+    if not orders:
+        return 0
 
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
     sql = """
-    prepare bulk_update_order as update projects_issuestatus set "order" = $1
-        where projects_issuestatus.id = $2 and
-              projects_issuestatus.project_id = $3;
-    """
+    update {table} set {column} = new_orders.value
+        from (values {values}) as new_orders (id, value)
+        where {table}.id = new_orders.id and
+              {table}.project_id = %s and
+              {table}.{column} is distinct from new_orders.value;
+    """.format(table=table, column=qn(model._meta.get_field(field).column),
+               values=", ".join(["(%s::integer, %s::integer)"] * len(orders)))
 
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.close()
+    params = []
+    for id, order in orders.items():
+        params += [id, order]
+    params.append(project.id)
 
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(sql, params)
+        count = cursor.rowcount
 
-@transaction.atomic
-def bulk_update_issue_type_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_issuetype set "order" = $1
-        where projects_issuetype.id = $2 and
-              projects_issuetype.project_id = $3;
-    """
-
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_priority_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_priority set "order" = $1
-        where projects_priority.id = $2 and
-              projects_priority.project_id = $3;
-    """
-
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_severity_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_severity set "order" = $1
-        where projects_severity.id = $2 and
-              projects_severity.project_id = $3;
-    """
-
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.close()
-
-
-@transaction.atomic
-def bulk_update_question_status_order(project, user, data):
-    cursor = connection.cursor()
-
-    sql = """
-    prepare bulk_update_order as update projects_questionstatus set "order" = $1
-        where projects_questionstatus.id = $2 and
-              projects_questionstatus.project_id = $3;
-    """
-
-    cursor.execute(sql)
-    for id, order in data:
-        cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                       (order, id, project.id))
-    cursor.close()
+    if count and lookups.is_lookup_model(model):
+        lookups.invalidate_lookups(project.id)
+    return count
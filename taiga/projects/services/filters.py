@@ -1,135 +1,144 @@
 from contextlib import closing
-from django.db import connection
-
-def _get_issues_tags(project):
-    extra_sql = ("select unnest(unpickle(tags)) as tagname "
-                 "from issues_issue where project_id = %s "
-                 "group by unnest(unpickle(tags)) "
-                 "order by tagname asc")
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, [project.id])
-        rows = cursor.fetchall()
-
-    return set([x[0] for x in rows])
-
-def _get_stories_tags(project):
-    extra_sql = ("select unnest(unpickle(tags)) as tagname, count(unnest(unpickle(tags))) "
-                 "from userstories_userstory where project_id = %s "
-                 "group by unnest(unpickle(tags)) "
-                 "order by tagname asc")
-
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, [project.id])
-        rows = cursor.fetchall()
+import collections
 
-    return set([x[0] for x in rows])
+from django.db import connection
 
+from . import tags
 
-def _get_issues_tags(project):
-    extra_sql = ("select unnest(unpickle(tags)) as tagname, count(unnest(unpickle(tags))) "
-                 "from issues_issue where project_id = %s "
-                 "group by unnest(unpickle(tags)) "
-                 "order by tagname asc")
 
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, [project.id])
-        rows = cursor.fetchall()
+# (facet name, issues filter name) of the issues filters data.
+ISSUES_FACETS = (
+    ("types", "type"),
+    ("statuses", "status"),
+    ("priorities", "priority"),
+    ("severities", "severity"),
+    ("assigned_to", "assigned_to"),
+    ("owners", "owner"),
+    ("tags", "tags"),
+)
 
-    return rows
-
-def _get_issues_statuses(project):
-    extra_sql = ("select status_id, count(status_id) from issues_issue "
-                 "where project_id = %s group by status_id;")
 
+def _get_issues_facets_values(project):
+    """
+    Get the possible values of each issues facet: the ids of
+    the project types, statuses, priorities and severities
+    (sorted by order) and the ids of the project members.
+    """
     extra_sql = """
-    select id, (select count(*) from issues_issue
-                    where project_id = m.project_id and status_id = m.id)
-        from projects_issuestatus as m
-        where project_id = %s order by m.order;
+    select 'types', id, "order" from projects_issuetype where project_id = %s
+    union all
+    select 'statuses', id, "order" from projects_issuestatus where project_id = %s
+    union all
+    select 'priorities', id, "order" from projects_priority where project_id = %s
+    union all
+    select 'severities', id, "order" from projects_severity where project_id = %s
+    union all
+    select 'members', user_id, 0 from projects_membership
+        where project_id = %s and user_id is not null
+    order by 1, 3, 2;
     """
 
     with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, [project.id])
+        cursor.execute(extra_sql, [project.id] * 5)
         rows = cursor.fetchall()
 
-    return rows
+    values = collections.defaultdict(list)
+    for facet, value, order in rows:
+        if value not in values[facet]:
+            values[facet].append(value)
 
+    values["owners"] = values["members"]
+    values["assigned_to"] = [None] + values.pop("members")
+    return values
 
-def _get_issues_priorities(project):
-    extra_sql = """
-    select id, (select count(*) from issues_issue
-                where project_id = m.project_id and priority_id = m.id)
-        from projects_priority as m
-        where project_id = %s order by m.order;
-    """
 
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, [project.id])
-        rows = cursor.fetchall()
+# Columns of the issues filters (except the tags one).
+ISSUES_FILTERS_COLUMNS = collections.OrderedDict([
+    ("type", "type_id"),
+    ("status", "status_id"),
+    ("priority", "priority_id"),
+    ("severity", "severity_id"),
+    ("assigned_to", "assigned_to_id"),
+    ("owner", "owner_id"),
+])
 
-    return rows
 
-def _get_issues_types(project):
-    extra_sql = """
-    select id, (select count(*) from issues_issue
-                where project_id = m.project_id and type_id = m.id)
-        from projects_issuetype as m
-        where project_id = %s order by m.order;
+def _get_filters_where(filters):
+    """
+    Get the where clauses (and their params) of the issues
+    filters, except the tags one.
     """
+    where, params = [], []
+    for name, values in filters.items():
+        if name not in ISSUES_FILTERS_COLUMNS:
+            continue
 
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, [project.id])
-        rows = cursor.fetchall()
+        column = ISSUES_FILTERS_COLUMNS[name]
+        conditions = []
+        not_null_values = [value for value in values if value is not None]
+        if not_null_values:
+            conditions.append("{0} = any(%s)".format(column))
+            params.append(not_null_values)
+        if None in values:
+            conditions.append("{0} is null".format(column))
 
-    return rows
+        where.append("({0})".format(" or ".join(conditions) or "false"))
+    return where, params
 
 
-def _get_issues_severities(project):
-    extra_sql = """
-    select id, (select count(*) from issues_issue
-                where project_id = m.project_id and severity_id = m.id)
-        from projects_severity as m
-        where project_id = %s order by m.order;
+def _get_issues_counts(project, filters):
     """
+    Get, with one scan of the issues of a project:
 
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, [project.id])
-        rows = cursor.fetchall()
-
-    return rows
+    - the number of issues for each combination of the values of
+      the issues filters (the tags of the groups are True if the
+      issues have all the filtered tags);
+    - the number of issues with each tag, with all the issues
+      filters except the tags one.
+    """
+    tags_sql, tags_params = "true", []
+    if filters.get("tags"):
+        tags_sql, tags_params = "tags @> %s::text[]", [list(filters["tags"])]
 
+    where, where_params = _get_filters_where(filters)
+    columns = ", ".join(ISSUES_FILTERS_COLUMNS.values())
+    nulls = ", ".join(["null"] * len(ISSUES_FILTERS_COLUMNS))
 
-def _get_issues_assigned_to(project):
     extra_sql = """
-    select null, (select count(*) from issues_issue
-                        where project_id = %s and assigned_to_id is null)
-    UNION select user_id, (select count(*) from issues_issue
-                        where project_id = pm.project_id and assigned_to_id = pm.user_id)
-        from projects_membership as pm
-        where project_id = %s and pm.user_id is not null;
-    """
+    with issues as (select id, {columns}, tags from issues_issue where project_id = %s)
+    select 'group', {columns}, {tags}, null, count(*)
+        from issues
+        group by {groups}
+    union all
+    select 'tag', {nulls}, null, tag, count(distinct id)
+        from issues cross join lateral unnest(issues.tags) as tag
+        where {where}
+        group by tag;
+    """.format(columns=columns, tags=tags_sql, nulls=nulls, where=" and ".join(where or ["true"]),
+               groups=", ".join(str(i) for i in range(2, len(ISSUES_FILTERS_COLUMNS) + 3)))
 
     with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, [project.id, project.id])
+        cursor.execute(extra_sql, [project.id] + tags_params + where_params)
         rows = cursor.fetchall()
 
-    return rows
+    names = list(ISSUES_FILTERS_COLUMNS) + ["tags"]
+    groups = [(dict(zip(names, row[1:-2])), row[-1]) for row in rows if row[0] == "group"]
+    tags_counts = [(row[-2], row[-1]) for row in rows if row[0] == "tag"]
+    return groups, tags_counts
 
 
-def _get_issues_owners(project):
-    extra_sql = """
-    select user_id, (select count(*) from issues_issue
-                        where project_id = pm.project_id and owner_id = pm.user_id)
-        from projects_membership as pm
-        where project_id = %s and pm.user_id is not null;
-    """
+def _group_matches(group, filters, exclude=None):
+    for name, values in filters.items():
+        if name == exclude:
+            continue
 
-    with closing(connection.cursor()) as cursor:
-        cursor.execute(extra_sql, [project.id])
-        rows = cursor.fetchall()
+        if name == "tags":
+            if not group["tags"]:
+                return False
+        elif group[name] not in values:
+            return False
 
-    return rows
+    return True
 
 
 # Public api
@@ -139,26 +148,33 @@ def get_all_tags(project):
     Given a project, return sorted list of unique
     tags found on it.
     """
-
-    result = set()
-    result.update(_get_issues_tags(project))
-    result.update(_get_stories_tags(project))
-    return sorted(result)
+    return [name for name, count in tags.get_tags(project)]
 
 
-def get_issues_filters_data(project):
+def get_issues_filters_data(project, filters=None):
     """
     Given a project, return a simple data structure
     of all possible filters for issues.
+
+    The filters param has the same format as the one used by
+    the issues filter backend. Like in any faceted search, the
+    counts of each facet apply all the filters except its own.
     """
+    filters = filters or {}
+    facets_values = _get_issues_facets_values(project)
+    groups, tags_counts = _get_issues_counts(project, filters)
+
+    data = {}
+    for facet, filter_name in ISSUES_FACETS:
+        if filter_name == "tags":
+            data[facet] = sorted(tags_counts)
+            continue
+
+        counts = collections.Counter()
+        for group, count in groups:
+            if _group_matches(group, filters, exclude=filter_name):
+                counts[group[filter_name]] += count
+
+        data[facet] = [(value, counts[value]) for value in facets_values[facet]]
 
-    data = {
-        "types": _get_issues_types(project),
-        "statuses": _get_issues_statuses(project),
-        "priorities": _get_issues_priorities(project),
-        "severities": _get_issues_severities(project),
-        "assigned_to": _get_issues_assigned_to(project),
-        "owners": _get_issues_owners(project),
-        "tags": _get_issues_tags(project),
-    }
     return data
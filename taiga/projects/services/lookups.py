@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+
+from taiga.base.utils.cache import get_shared_cache_timeout
+
+# The small tables of each project (statuses, points, priorities...)
+# that are read on almost every request (app label, model name).
+LOOKUP_MODELS = (
+    ("projects", "UserStoryStatus"),
+    ("projects", "Points"),
+    ("projects", "TaskStatus"),
+    ("projects", "Priority"),
+    ("projects", "Severity"),
+    ("projects", "IssueStatus"),
+    ("projects", "IssueType"),
+    ("projects", "QuestionStatus"),
+    ("users", "Role"),
+)
+
+# Maximum number of projects whose lookup tables are kept on
+# the memory of each process (the least recently used are
+# discarded first).
+MAX_CACHED_PROJECTS = 1000
+
+# {project id: (version, expiration time, {model: {id: object}})}
+_lookups = collections.OrderedDict()
+_lookups_lock = threading.Lock()
+
+
+def _get_version_cache_key(project_id):
+    return "project-lookups:{0}".format(project_id)
+
+
+def _get_lookups_cache_timeout():
+    return get_shared_cache_timeout("PROJECT_LOOKUPS_CACHE_TIMEOUT")
+
+
+def is_lookup_model(model):
+    return (model._meta.app_label, model._meta.object_name) in LOOKUP_MODELS
+
+
+def _get_version(project_id):
+    cache_key = _get_version_cache_key(project_id)
+    version = cache.get(cache_key)
+    if version is None:
+        cache.add(cache_key, uuid.uuid4().hex, None)
+        version = cache.get(cache_key)
+
+    # Without a working cache, a new version each time
+    return version or uuid.uuid4().hex
+
+
+def invalidate_lookups(project_id):
+    """
+    Discard the cached lookup tables of a project, on all the
+    processes that share the django cache.
+    """
+    with _lookups_lock:
+        _lookups.pop(project_id, None)
+
+    cache.set(_get_version_cache_key(project_id), uuid.uuid4().hex, None)
+
+
+def clear_lookups():
+    """
+    Discard the lookup tables of all the projects kept on the
+    memory of this process.
+    """
+    with _lookups_lock:
+        _lookups.clear()
+
+
+def _get_project_tables(project_id):
+    version = _get_version(project_id)
+    now = time.time()
+
+    with _lookups_lock:
+        entry = _lookups.get(project_id, None)
+        if entry is None or entry[0] != version or entry[1] <= now:
+            entry = (version, now + _get_lookups_cache_timeout(), {})
+            _lookups[project_id] = entry
+
+        _lookups.move_to_end(project_id)
+        while len(_lookups) > MAX_CACHED_PROJECTS:
+            _lookups.popitem(last=False)
+
+    return entry[2]
+
+
+def _get_table(model, project_id, reload=False):
+    tables = _get_project_tables(project_id)
+    table = tables.get(model, None)
+    if table is None or reload:
+        qs = model.objects.filter(project_id=project_id)
+        table = collections.OrderedDict((obj.id, obj) for obj in qs)
+        tables[model] = table
+    return table
+
+
+def get_lookups(model, project_id):
+    """
+    Get the objects of a lookup table of a project (like its
+    issue statuses), in the default order of the model.
+
+    The tables are kept on the memory of each process for
+    PROJECT_LOOKUPS_CACHE_TIMEOUT seconds (None disables it),
+    until the version of the project on the django cache is
+    changed by invalidate_lookups. The objects are shared, so
+    they must not be modified.
+    """
+    if _get_lookups_cache_timeout() is None:
+        return list(model.objects.filter(project_id=project_id))
+
+    return list(_get_table(model, project_id).values())
+
+
+def get_lookup(model, project_id, id):
+    """
+    Get an object of a lookup table of a project, or None if it
+    doesn't exist or it's from another project.
+    """
+    if id is None:
+        return None
+
+    if _get_lookups_cache_timeout() is None:
+        return model.objects.filter(project_id=project_id, id=id).first()
+
+    obj = _get_table(model, project_id).get(id, None)
+    if obj is None:
+        # Maybe created after the table was cached
+        obj = _get_table(model, project_id, reload=True).get(id, None)
+    return obj
+
+
+def get_related_lookup(instance, field_name):
+    """
+    Get the object of a foreign key of an instance to a lookup
+    table of its project (like the status of an issue). If it's
+    not fetched yet, it's read from the cache instead (if enabled).
+    """
+    field = instance._meta.get_field(field_name)
+    if hasattr(instance, field.get_cache_name()) or _get_lookups_cache_timeout() is None:
+        return getattr(instance, field_name)
+
+    obj = get_lookup(field.rel.to, instance.project_id, getattr(instance, field.attname))
+    if obj is None:
+        return getattr(instance, field_name)
+    return obj
+
+
+def is_project_lookup(instance, field_name):
+    """
+    Check if the foreign key of an instance to a lookup table is
+    empty or an object of the project of the instance.
+
+    It's checked on the database, not on the cache, that may
+    still keep objects deleted by other processes.
+    """
+    field = instance._meta.get_field(field_name)
+    id = getattr(instance, field.attname)
+    return id is None or field.rel.to.objects.filter(project_id=instance.project_id,
+                                                     id=id).exists()
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+"""
+Services for keeping the stored points per role of milestones and
+projects in sync with the user stories role points.
+
+The stored points are updated incrementally: every change applies the
+difference between the old and the new points of the changed role
+points to the stored points of their milestone and project.
+
+Role points changed without signals (like with a queryset update())
+skip it, so the points of role points querysets must be changed with
+set_role_points. The recompute_points management command repairs the
+stored points that are wrong anyway.
+"""
+
+import collections
+
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import Sum
+from django.db.models.loading import get_model
+
+from taiga.base.utils.dicts import dict_sum
+
+
+MILESTONE_POINTS_FIELDS = ("total_points", "closed_points")
+PROJECT_POINTS_FIELDS = ("defined_points", "assigned_points", "closed_points")
+
+
+class PointsDeltas(object):
+    """
+    Differences on the stored points per role of milestones and
+    projects, applied together with one query for each changed
+    milestone or project role.
+    """
+    def __init__(self):
+        self.milestones = collections.defaultdict(collections.Counter)
+        self.projects = collections.defaultdict(collections.Counter)
+
+    def add(self, project_id, milestone_id, is_closed, role_id, value):
+        """
+        Add the points value of a role points of a user story with
+        the given project, milestone and closed state (negative
+        values to subtract them).
+        """
+        if not value:
+            return
+
+        project_points = self.projects[(project_id, role_id)]
+        project_points["defined_points"] += value
+        if milestone_id is None:
+            return
+
+        milestone_points = self.milestones[(milestone_id, role_id)]
+        project_points["assigned_points"] += value
+        milestone_points["total_points"] += value
+        if is_closed:
+            project_points["closed_points"] += value
+            milestone_points["closed_points"] += value
+
+    def apply(self):
+        milestone_points_model = get_model("milestones", "MilestoneRolePoints")
+        project_points_model = get_model("projects", "ProjectRolePoints")
+
+        for (milestone_id, role_id), values in self.milestones.items():
+            _add_points(milestone_points_model, values, milestone_id=milestone_id,
+                        role_id=role_id)
+
+        for (project_id, role_id), values in self.projects.items():
+            _add_points(project_points_model, values, project_id=project_id, role_id=role_id)
+
+        self.milestones.clear()
+        self.projects.clear()
+
+
+def _add_points(model, values, **lookup):
+    values = {field_name: value for field_name, value in values.items() if value}
+    if not values:
+        return
+
+    qs = model.objects.filter(**lookup)
+    if qs.update(**{field_name: F(field_name) + value for field_name, value in values.items()}):
+        return
+
+    # A missing row has no points, so only additions create it (the
+    # subtractions on it come from deletions in cascade).
+    if any(value < 0 for value in values.values()):
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.create(**dict(lookup, **values))
+    except IntegrityError:
+        qs.update(**{field_name: F(field_name) + value for field_name, value in values.items()})
+
+
+def _get_points_values(points_ids):
+    points_model = get_model("projects", "Points")
+    points_ids = set(points_id for points_id in points_ids if points_id is not None)
+    if not points_ids:
+        return {}
+
+    qs = points_model.objects.filter(id__in=points_ids)
+    return {points_id: value or 0 for points_id, value in qs.values_list("id", "value")}
+
+
+def _get_userstory_state(user_story_id):
+    userstory_model = get_model("userstories", "UserStory")
+    qs = userstory_model.objects.filter(id=user_story_id)
+    return qs.values("project_id", "milestone_id", "is_closed").first()
+
+
+def update_points_for_role_points_change(role_points, previous_points_id=None):
+    """
+    Apply the change of the points of a role points (from
+    previous_points_id, None for new or deleted role points)
+    to the stored points of its milestone and project.
+    """
+    if role_points.points_id == previous_points_id:
+        return
+
+    # The user story is removed after its role points
+    # when it's deleted in cascade.
+    state = _get_userstory_state(role_points.user_story_id)
+    if state is None:
+        return
+
+    values = _get_points_values([role_points.points_id, previous_points_id])
+    value = values.get(role_points.points_id, 0) - values.get(previous_points_id, 0)
+
+    deltas = PointsDeltas()
+    deltas.add(state["project_id"], state["milestone_id"], state["is_closed"],
+               role_points.role_id, value)
+    deltas.apply()
+
+
+def update_points_for_userstory_change(user_story, previous_milestone_id, previous_is_closed):
+    """
+    Move the points of a user story from the stored points of its
+    previous milestone (and closed state) to the current ones.
+    """
+    if (user_story.milestone_id == previous_milestone_id and
+            user_story.is_closed == previous_is_closed):
+        return
+
+    rolepoints_model = get_model("userstories", "RolePoints")
+    qs = rolepoints_model.objects.filter(user_story_id=user_story.id)
+
+    deltas = PointsDeltas()
+    for role_id, value in qs.values_list("role_id", "points__value"):
+        deltas.add(user_story.project_id, previous_milestone_id, previous_is_closed,
+                   role_id, -(value or 0))
+        deltas.add(user_story.project_id, user_story.milestone_id, user_story.is_closed,
+                   role_id, value or 0)
+    deltas.apply()
+
+
+def update_points_for_milestone_delete(milestone):
+    """
+    Subtract the points of a milestone that is going to be deleted from
+    the assigned points of its project (its user stories are unassigned
+    without signals).
+    """
+    deltas = PointsDeltas()
+    for row in milestone.points_per_role.all():
+        project_points = deltas.projects[(milestone.project_id, row.role_id)]
+        project_points["assigned_points"] -= row.total_points
+        project_points["closed_points"] -= row.closed_points
+    deltas.apply()
+
+
+def update_points_for_points_change(points, previous_value):
+    """
+    Apply the change of the value of a points object to the stored
+    points of the milestones and projects of its role points.
+    """
+    value = (points.value or 0) - (previous_value or 0)
+    if not value:
+        return
+
+    rolepoints_model = get_model("userstories", "RolePoints")
+    qs = rolepoints_model.objects.filter(points=points)
+    qs = qs.values("user_story__project", "user_story__milestone", "user_story__is_closed",
+                   "role")
+
+    deltas = PointsDeltas()
+    for row in qs.annotate(count=Count("id")).order_by():
+        deltas.add(row["user_story__project"], row["user_story__milestone"],
+                   row["user_story__is_closed"], row["role"], value * row["count"])
+    deltas.apply()
+
+
+def update_points_for_role_points_delete(role_points):
+    """
+    Subtract the points of the given role points, deleted without
+    signals, given as (user_story_id, role_id, points_id) tuples.
+    """
+    userstory_model = get_model("userstories", "UserStory")
+
+    role_points = list(role_points)
+    if not role_points:
+        return
+
+    values = _get_points_values(points_id for _, _, points_id in role_points)
+    qs = userstory_model.objects.filter(id__in=set(us_id for us_id, _, _ in role_points))
+    states = {row["id"]: row for row in qs.values("id", "project_id", "milestone_id",
+                                                    "is_closed")}
+
+    deltas = PointsDeltas()
+    for user_story_id, role_id, points_id in role_points:
+        state = states.get(user_story_id)
+        if state is not None:
+            deltas.add(state["project_id"], state["milestone_id"], state["is_closed"],
+                       role_id, -values.get(points_id, 0))
+    deltas.apply()
+
+
+def set_role_points(role_points, points):
+    """
+    Set the points of a role points queryset updating the
+    stored points (a plain update() doesn't).
+    """
+    qs = role_points.exclude(points=points)
+    qs = qs.values("user_story__project", "user_story__milestone", "user_story__is_closed",
+                   "role", "points__value")
+
+    value = points.value or 0
+    deltas = PointsDeltas()
+    for row in qs.order_by():
+        deltas.add(row["user_story__project"], row["user_story__milestone"],
+                   row["user_story__is_closed"], row["role"], value - (row["points__value"] or 0))
+
+    role_points.update(points=points)
+    deltas.apply()
+
+
+def get_points_per_role(user_stories):
+    """
+    Given a user stories queryset, return a dict with the
+    sum of their points per role, using only one query.
+    """
+    rolepoints_model = get_model("userstories", "RolePoints")
+    qs = rolepoints_model.objects.filter(user_story__in=user_stories)
+    qs = qs.values("role").annotate(total=Sum("points__value")).order_by()
+    return dict_sum({row["role"]: row["total"] or 0 for row in qs})
+
+
+def _get_stored_points(queryset, fields):
+    points = {}
+    for row in queryset.values("role", *fields):
+        values = {field_name: row[field_name] for field_name in fields if row[field_name]}
+        if values:
+            points[row["role"]] = values
+    return points
+
+
+def _set_stored_points(model, points, **lookup):
+    model.objects.filter(**lookup).delete()
+    model.objects.bulk_create([model(role_id=role_id, **dict(lookup, **values))
+                                   for role_id, values in points.items()])
+
+
+def get_stored_milestone_points(milestone_id):
+    milestone_points_model = get_model("milestones", "MilestoneRolePoints")
+    qs = milestone_points_model.objects.filter(milestone_id=milestone_id)
+    return _get_stored_points(qs, MILESTONE_POINTS_FIELDS)
+
+
+def get_milestone_points(milestone_id):
+    """
+    Compute the points per role of a milestone from its user
+    stories role points: {role_id: {field_name: value}}.
+    """
+    rolepoints_model = get_model("userstories", "RolePoints")
+
+    qs = rolepoints_model.objects.filter(user_story__milestone_id=milestone_id)
+    qs = qs.values("role", "user_story__is_closed").annotate(total=Sum("points__value"))
+
+    points = collections.defaultdict(collections.Counter)
+    for row in qs.order_by():
+        points[row["role"]]["total_points"] += row["total"] or 0
+        if row["user_story__is_closed"]:
+            points[row["role"]]["closed_points"] += row["total"] or 0
+
+    return {role_id: dict(+values) for role_id, values in points.items() if +values}
+
+
+def update_milestone_points(milestone_id):
+    milestone_points_model = get_model("milestones", "MilestoneRolePoints")
+    points = get_milestone_points(milestone_id)
+    _set_stored_points(milestone_points_model, points, milestone_id=milestone_id)
+    return points
+
+
+def get_stored_project_points(project_id):
+    project_points_model = get_model("projects", "ProjectRolePoints")
+    qs = project_points_model.objects.filter(project_id=project_id)
+    return _get_stored_points(qs, PROJECT_POINTS_FIELDS)
+
+
+def get_project_points(project_id):
+    """
+    Compute the points per role of a project from its user
+    stories role points: {role_id: {field_name: value}}.
+    """
+    rolepoints_model = get_model("userstories", "RolePoints")
+
+    qs = rolepoints_model.objects.filter(user_story__project_id=project_id)
+    qs = qs.values("role", "user_story__milestone", "user_story__is_closed")
+    qs = qs.annotate(total=Sum("points__value"))
+
+    points = collections.defaultdict(collections.Counter)
+    for row in qs.order_by():
+        points[row["role"]]["defined_points"] += row["total"] or 0
+        if row["user_story__milestone"] is not None:
+            points[row["role"]]["assigned_points"] += row["total"] or 0
+            if row["user_story__is_closed"]:
+                points[row["role"]]["closed_points"] += row["total"] or 0
+
+    return {role_id: dict(+values) for role_id, values in points.items() if +values}
+
+
+def update_project_points(project_id):
+    project_points_model = get_model("projects", "ProjectRolePoints")
+    points = get_project_points(project_id)
+    _set_stored_points(project_points_model, points, project_id=project_id)
+    return points
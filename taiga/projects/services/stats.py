@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 
-from django.db.models import Q, Count
+from contextlib import closing
+
+from django.db import connection
+from django.db.models.loading import get_model
+from django.contrib.auth import get_user_model
+
+from taiga.projects.issues.services import get_issues_counts_by_day
+
 import datetime
 import copy
 
@@ -61,102 +68,145 @@ def _get_milestones_stats_for_backlog(project):
     }
 
 
-def _count_status_object(status_obj, counting_storage):
-    if status_obj.id in counting_storage:
-        counting_storage[status_obj.id]['count'] += 1
-    else:
-        counting_storage[status_obj.id] = {}
-        counting_storage[status_obj.id]['count'] = 1
-        counting_storage[status_obj.id]['name'] = status_obj.name
-        counting_storage[status_obj.id]['id'] = status_obj.id
-        counting_storage[status_obj.id]['color'] = status_obj.color
-
-def _count_owned_object(user_obj, counting_storage):
-    if user_obj:
-        if user_obj.id in counting_storage:
-            counting_storage[user_obj.id]['count'] += 1
-        else:
-            counting_storage[user_obj.id] = {}
-            counting_storage[user_obj.id]['count'] = 1
-            counting_storage[user_obj.id]['username'] = user_obj.username
-            counting_storage[user_obj.id]['name'] = user_obj.get_full_name()
-            counting_storage[user_obj.id]['id'] = user_obj.id
-            counting_storage[user_obj.id]['color'] = user_obj.color
-    else:
-        if 0 in counting_storage:
-            counting_storage[0]['count'] += 1
-        else:
-            counting_storage[0] = {}
-            counting_storage[0]['count'] = 1
-            counting_storage[0]['username'] = 'Unassigned'
-            counting_storage[0]['name'] = 'Unassigned'
-            counting_storage[0]['id'] = 0
-            counting_storage[0]['color'] = 'black'
+def _get_issues_counts_by_dimensions(project):
+    """
+    Get the number of issues of a project grouped by all
+    the dimensions used on issues stats with one query.
+    """
+    extra_sql = """
+    select type_id, status_id, priority_id, severity_id,
+           owner_id, assigned_to_id, count(*)
+        from issues_issue
+        where project_id = %s
+        group by type_id, status_id, priority_id, severity_id,
+                 owner_id, assigned_to_id;
+    """
 
-def get_stats_for_project_issues(project):
-    project_issues_stats = {
-        'total_issues': 0,
-        'opened_issues': 0,
-        'closed_issues': 0,
-        'issues_per_type': {},
-        'issues_per_status': {},
-        'issues_per_priority': {},
-        'issues_per_severity': {},
-        'issues_per_owner': {},
-        'issues_per_assigned_to': {},
-        'last_four_weeks_days': {
-            'by_open_closed': {'open': [], 'closed': []},
-            'by_severity': {},
-            'by_priority': {},
-            'by_status': {},
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(extra_sql, [project.id])
+        rows = cursor.fetchall()
+
+    return rows
+
+
+def _serialize_status_object(status_obj, count):
+    return {
+        'count': count,
+        'name': status_obj.name,
+        'id': status_obj.id,
+        'color': status_obj.color,
+    }
+
+
+def _serialize_owned_object(user_obj, count):
+    if user_obj is None:
+        return {
+            'count': count,
+            'username': 'Unassigned',
+            'name': 'Unassigned',
+            'id': 0,
+            'color': 'black',
         }
 
+    return {
+        'count': count,
+        'username': user_obj.username,
+        'name': user_obj.get_full_name(),
+        'id': user_obj.id,
+        'color': user_obj.color,
     }
 
-    for issue in project.issues.all().prefetch_related('status', 'priority', 'type', 'severity', 'owner',
-                                                       'assigned_to'):
-        project_issues_stats['total_issues'] += 1
-        if issue.status.is_closed:
-            project_issues_stats['closed_issues'] += 1
-        else:
-            project_issues_stats['opened_issues'] += 1
-        _count_status_object(issue.type, project_issues_stats['issues_per_type'])
-        _count_status_object(issue.status, project_issues_stats['issues_per_status'])
-        _count_status_object(issue.priority, project_issues_stats['issues_per_priority'])
-        _count_status_object(issue.severity, project_issues_stats['issues_per_severity'])
-        _count_owned_object(issue.owner, project_issues_stats['issues_per_owner'])
-        _count_owned_object(issue.assigned_to, project_issues_stats['issues_per_assigned_to'])
-
-    for severity in project_issues_stats['issues_per_severity'].values():
-        project_issues_stats['last_four_weeks_days']['by_severity'][severity['id']] = copy.copy(severity)
-        del(project_issues_stats['last_four_weeks_days']['by_severity'][severity['id']]['count'])
-        project_issues_stats['last_four_weeks_days']['by_severity'][severity['id']]['data'] = []
-
-    for priority in project_issues_stats['issues_per_priority'].values():
-        project_issues_stats['last_four_weeks_days']['by_priority'][priority['id']] = copy.copy(priority)
-        del(project_issues_stats['last_four_weeks_days']['by_priority'][priority['id']]['count'])
-        project_issues_stats['last_four_weeks_days']['by_priority'][priority['id']]['data'] = []
-
-    for x in range(27, -1, -1):
-        day = datetime.date.today() - datetime.timedelta(days=x)
-        next_day = day + datetime.timedelta(days=1)
-        project_issues_stats['last_four_weeks_days']['by_open_closed']['open'].append(
-            project.issues.filter(created_date__gte=day, created_date__lt=next_day).count()
-        )
-        project_issues_stats['last_four_weeks_days']['by_open_closed']['closed'].append(
-            project.issues.filter(finished_date__gte=day, finished_date__lt=next_day).count()
-        )
-        open_this_day = project.issues.filter(created_date__lt=next_day)
-        open_this_day = open_this_day.filter(Q(finished_date__gt=day) | Q(finished_date__isnull=True))
-        for severity in project_issues_stats['last_four_weeks_days']['by_severity']:
-            project_issues_stats['last_four_weeks_days']['by_severity'][severity]['data'].append(
-                open_this_day.filter(severity_id=severity).count()
-            )
-
-        for priority in project_issues_stats['last_four_weeks_days']['by_priority']:
-            project_issues_stats['last_four_weeks_days']['by_priority'][priority]['data'].append(
-                open_this_day.filter(priority_id=priority).count()
-            )
+
+def _count_by(rows, index, objects, serialize):
+    counts = {}
+    for row in rows:
+        obj_id = row[index]
+        counts[obj_id] = counts.get(obj_id, 0) + row[-1]
+
+    result = {}
+    for obj_id, count in counts.items():
+        obj = objects.get(obj_id, None) if obj_id is not None else None
+        serialized = serialize(obj, count)
+        result[serialized['id']] = serialized
+    return result
+
+
+def _get_last_four_weeks_days(project, issues_per_severity, issues_per_priority):
+    last_day = datetime.date.today()
+    first_day = last_day - datetime.timedelta(days=27)
+    days = [first_day + datetime.timedelta(days=x) for x in range(28)]
+    day_index = {day: index for index, day in enumerate(days)}
+
+    last_four_weeks_days = {
+        'by_open_closed': {'open': [0] * 28, 'closed': [0] * 28},
+        'by_severity': {},
+        'by_priority': {},
+        'by_status': {},
+    }
+
+    for severity in issues_per_severity.values():
+        severity_data = copy.copy(severity)
+        del(severity_data['count'])
+        severity_data['data'] = [0] * 28
+        last_four_weeks_days['by_severity'][severity['id']] = severity_data
+
+    for priority in issues_per_priority.values():
+        priority_data = copy.copy(priority)
+        del(priority_data['count'])
+        priority_data['data'] = [0] * 28
+        last_four_weeks_days['by_priority'][priority['id']] = priority_data
+
+    rows = get_issues_counts_by_day(project, first_day, last_day)
+    for day, severity_id, priority_id, created, finished, opened in rows:
+        index = day_index[day]
+        last_four_weeks_days['by_open_closed']['open'][index] += created
+        last_four_weeks_days['by_open_closed']['closed'][index] += finished
+
+        if severity_id in last_four_weeks_days['by_severity']:
+            last_four_weeks_days['by_severity'][severity_id]['data'][index] += opened
+
+        if priority_id in last_four_weeks_days['by_priority']:
+            last_four_weeks_days['by_priority'][priority_id]['data'][index] += opened
+
+    return last_four_weeks_days
+
+
+def get_stats_for_project_issues(project):
+    rows = _get_issues_counts_by_dimensions(project)
+
+    types = get_model("projects", "IssueType").objects.in_bulk(
+        list(set(row[0] for row in rows)))
+    statuses = get_model("projects", "IssueStatus").objects.in_bulk(
+        list(set(row[1] for row in rows)))
+    priorities = get_model("projects", "Priority").objects.in_bulk(
+        list(set(row[2] for row in rows)))
+    severities = get_model("projects", "Severity").objects.in_bulk(
+        list(set(row[3] for row in rows)))
+
+    user_ids = set(row[4] for row in rows) | set(row[5] for row in rows)
+    user_ids.discard(None)
+    users = get_user_model().objects.in_bulk(list(user_ids))
+
+    total_issues = sum(row[-1] for row in rows)
+    closed_issues = sum(row[-1] for row in rows if statuses[row[1]].is_closed)
+
+    project_issues_stats = {
+        'total_issues': total_issues,
+        'opened_issues': total_issues - closed_issues,
+        'closed_issues': closed_issues,
+        'issues_per_type': _count_by(rows, 0, types, _serialize_status_object),
+        'issues_per_status': _count_by(rows, 1, statuses, _serialize_status_object),
+        'issues_per_priority': _count_by(rows, 2, priorities, _serialize_status_object),
+        'issues_per_severity': _count_by(rows, 3, severities, _serialize_status_object),
+        'issues_per_owner': _count_by(rows, 4, users, _serialize_owned_object),
+        'issues_per_assigned_to': _count_by(rows, 5, users, _serialize_owned_object),
+    }
+
+    project_issues_stats['last_four_weeks_days'] = _get_last_four_weeks_days(
+        project,
+        project_issues_stats['issues_per_severity'],
+        project_issues_stats['issues_per_priority']
+    )
 
     return project_issues_stats
 
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+Services for keeping the per project tags dictionary (the used
+tags of user stories and issues with their usage count) in sync
+with the tags of the objects.
+"""
+
+from contextlib import closing
+
+from django.db import connection
+from django.db import transaction
+from django.db import IntegrityError
+from django.db.models import F
+from django.db.models.loading import get_model
+
+from taiga.base.models import get_stored_values
+
+
+def _add_tag(project_id, object_type, name):
+    projecttag_model = get_model("projects", "ProjectTag")
+    qs = projecttag_model.objects.filter(project_id=project_id, object_type=object_type,
+                                         name=name)
+    if qs.update(count=F("count") + 1):
+        return
+
+    try:
+        with transaction.atomic():
+            projecttag_model.objects.create(project_id=project_id, object_type=object_type,
+                                            name=name, count=1)
+    except IntegrityError:
+        qs.update(count=F("count") + 1)
+
+
+def _remove_tags(project_id, object_type, names):
+    projecttag_model = get_model("projects", "ProjectTag")
+    qs = projecttag_model.objects.filter(project_id=project_id, object_type=object_type,
+                                         name__in=list(names))
+    qs.update(count=F("count") - 1)
+
+
+def update_tags_dictionary(project_id, object_type, old_tags, new_tags):
+    """
+    Update the tags dictionary of a project with the changes
+    of the tags of an object.
+    """
+    old_tags = set(old_tags or [])
+    new_tags = set(new_tags or [])
+
+    if old_tags - new_tags:
+        _remove_tags(project_id, object_type, old_tags - new_tags)
+
+    for name in new_tags - old_tags:
+        _add_tag(project_id, object_type, name)
+
+
+def update_tags_dictionary_on_save(instance, object_type):
+    """
+    Update the tags dictionaries with the changes of an object
+    that is going to be saved.
+    """
+    old_project_id, old_tags = instance.project_id, []
+    if instance.pk:
+        stored_values = get_stored_values(instance) or {"project_id": None, "tags": []}
+        old_project_id, old_tags = stored_values["project_id"], stored_values["tags"]
+
+    if old_project_id != instance.project_id:
+        if old_project_id is not None:
+            update_tags_dictionary(old_project_id, object_type, old_tags, [])
+        old_tags = []
+
+    update_tags_dictionary(instance.project_id, object_type, old_tags, instance.tags)
+
+
+def update_tags_dictionary_on_delete(instance, object_type):
+    update_tags_dictionary(instance.project_id, object_type, instance.tags, [])
+
+
+@transaction.atomic
+def rebuild_tags_dictionary(project=None):
+    """
+    Regenerate the tags dictionary of a project (or of all
+    projects) from its user stories and issues.
+    """
+    where_sql = ""
+    params = []
+    if project is not None:
+        where_sql = "where project_id = %s"
+        params = [project.id]
+
+    delete_sql = "delete from projects_projecttag {where};".format(where=where_sql)
+
+    insert_sql = """
+    insert into projects_projecttag (project_id, object_type, name, count)
+    select project_id, object_type, name, count(*)
+        from (select distinct id, project_id, 'userstory' as object_type, unnest(tags) as name
+                  from userstories_userstory {where}
+              union all
+              select distinct id, project_id, 'issue' as object_type, unnest(tags) as name
+                  from issues_issue {where}) as tags
+        group by project_id, object_type, name;
+    """.format(where=where_sql)
+
+    with closing(connection.cursor()) as cursor:
+        cursor.execute(delete_sql, params)
+        cursor.execute(insert_sql, params + params)
+
+
+def get_tags(project, object_type=None):
+    """
+    Get the list of (name, count) of the used tags
+    of a project, sorted by name.
+    """
+    qs = project.tags_dictionary.filter(count__gt=0)
+    if object_type is not None:
+        qs = qs.filter(object_type=object_type)
+
+    tags = {}
+    for name, count in qs.values_list("name", "count"):
+        tags[name] = tags.get(name, 0) + count
+
+    return sorted(tags.items())
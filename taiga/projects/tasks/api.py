@@ -17,11 +17,13 @@ from taiga.base.notifications.api import NotificationSenderMixin
 from taiga.projects.permissions import AttachmentPermission
 from taiga.projects.serializers import AttachmentSerializer
 from taiga.projects.models import Attachment, Project
+from taiga.projects.services import lookups
 from taiga.projects.userstories.models import UserStory
 
 from . import models
 from . import permissions
 from . import serializers
+from . import services
 
 import reversion
 
@@ -64,6 +66,7 @@ class TaskViewSet(NotificationSenderMixin, ModelCrudViewSet):
     create_notification_template = "create_task_notification"
     update_notification_template = "update_task_notification"
     destroy_notification_template = "destroy_task_notification"
+    bulk_create_notification_template = "bulk_create_tasks_notification"
 
     def pre_save(self, obj):
         if obj.user_story:
@@ -85,7 +88,7 @@ class TaskViewSet(NotificationSenderMixin, ModelCrudViewSet):
         if obj.user_story and obj.user_story.project != obj.project:
             raise exc.PermissionDenied(_("You don't have permissions for add/modify this task."))
 
-        if obj.status and obj.status.project != obj.project:
+        if not lookups.is_project_lookup(obj, "status"):
             raise exc.PermissionDenied(_("You don't have permissions for add/modify this task."))
 
     def post_save(self, obj, created=False):
@@ -115,16 +118,9 @@ class TaskViewSet(NotificationSenderMixin, ModelCrudViewSet):
         if request.user != project.owner and not has_project_perm(request.user, project, 'add_task'):
             raise exc.PermissionDenied(_("You don't have permisions to create tasks."))
 
-        items = filter(lambda s: len(s) > 0,
-                    map(lambda s: s.strip(), bulk_tasks.split("\n")))
-
-        tasks = []
-        for item in items:
-            obj = models.Task.objects.create(subject=item, project=project,
-                                             user_story=us, owner=request.user,
-                                             status=project.default_task_status)
-            tasks.append(obj)
-            self._post_save_notification_sender(obj, True)
+        service = services.TasksService()
+        tasks = service.bulk_insert(project, request.user, us, bulk_tasks,
+                                    callback_on_success=self._bulk_create_notification_sender)
 
         tasks_serialized = self.serializer_class(tasks, many=True)
         return Response(data=tasks_serialized.data)
@@ -9,7 +9,7 @@ from django.utils.translation import ugettext_lazy as _
 
 from picklefield.fields import PickledObjectField
 
-from taiga.base.utils.slug import ref_uniquely
+from taiga.base.utils.slug import next_ref
 from taiga.base.notifications.models import WatchedMixin
 from taiga.projects.userstories.models import UserStory
 from taiga.projects.milestones.models import Milestone
@@ -107,7 +107,7 @@ def task_ref_handler(sender, instance, **kwargs):
     user story if that is not created.
     """
     if not instance.id and instance.project:
-        instance.ref = ref_uniquely(instance.project, "last_task_ref", instance.__class__)
+        instance.ref = next_ref(instance.project, "last_task_ref")
 
 def us_has_open_tasks(us, exclude_task):
     qs = us.tasks.all()
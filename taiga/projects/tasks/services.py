@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from django.db import transaction
+from django.utils import timezone
+
+from taiga.projects.services.bulk_create import bulk_create_with_refs
+
+from . import models
+
+
+class TasksService(object):
+    @transaction.atomic
+    def bulk_insert(self, project, user, user_story, data, callback_on_success=None):
+        """
+        Create a task of the user story for each line of data with only
+        one insert, and return them. callback_on_success is called once,
+        with the list of created tasks.
+
+        The stored data is the same as the one of creating them one by
+        one: the user story is opened or closed here (once for all of
+        them) as tasks_close_handler does.
+        """
+        items = filter(lambda s: len(s) > 0,
+                    map(lambda s: s.strip(), data.split("\n")))
+
+        status = project.default_task_status
+        finished_date = timezone.now() if status.is_closed else None
+        tasks = [models.Task(subject=item, project=project, user_story=user_story, owner=user,
+                             status=status, finished_date=finished_date)
+                 for item in items]
+        tasks = bulk_create_with_refs(models.Task, project, "last_task_ref", tasks)
+        if not tasks:
+            return []
+
+        if user_story is not None:
+            if not status.is_closed:
+                user_story.is_closed = False
+                user_story.finish_date = None
+                user_story.save(update_fields=["is_closed", "finish_date"])
+            elif not models.us_has_open_tasks(us=user_story, exclude_task=tasks[-1]):
+                user_story.is_closed = True
+                user_story.finish_date = timezone.now()
+                user_story.save(update_fields=["is_closed", "finish_date"])
+
+        if callback_on_success:
+            callback_on_success(tasks)
+        return tasks
@@ -0,0 +1,3 @@
+ALTER TABLE tasks_task ADD COLUMN search_vector tsvector;
+CREATE INDEX tasks_task_search_vector_gin_index ON tasks_task USING gin (search_vector);
+CREATE TRIGGER tasks_task_search_vector_update BEFORE INSERT OR UPDATE OF subject, description ON tasks_task FOR EACH ROW EXECUTE PROCEDURE tsvector_update_trigger(search_vector, 'pg_catalog.simple', subject, description);
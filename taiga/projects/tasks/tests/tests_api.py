@@ -781,3 +781,33 @@ class TasksTestCase(test.TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertEqual(Task.objects.all().count(), 5)
         self.client.logout()
+
+    def test_bulk_create_tasks_by_project_owner(self):
+        data = {
+            "bulkTasks": "Task A\nTask B\n\nTask C\n",
+            "projectId": self.project1.id,
+            "usId": self.userstory3.id,
+        }
+
+        self.assertEqual(len(mail.outbox), 0)
+        response = self.client.login(username=self.user1.username,
+                                     password=self.user1.username)
+        self.assertTrue(response)
+        response = self.client.post(
+            reverse("tasks-bulk-create"),
+            json.dumps(data),
+            content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task["subject"] for task in response.data],
+                         ["Task A", "Task B", "Task C"])
+
+        tasks = Task.objects.filter(user_story=self.userstory3).order_by("ref")
+        self.assertEqual([task.subject for task in tasks], ["Task A", "Task B", "Task C"])
+        refs = [task.ref for task in tasks]
+        self.assertEqual(refs, list(range(refs[0], refs[0] + 3)))
+        self.assertTrue(all(task.owner == self.user1 for task in tasks))
+        self.assertTrue(all(reversion.get_for_object(task).count() == 1 for task in tasks))
+
+        # Only one email for each watcher
+        self.assertEqual(len(mail.outbox), 2)
+        self.client.logout()
@@ -444,3 +444,22 @@ class ProjectsTestCase(test.TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertEqual(Project.objects.all().count(), 4)
         self.client.logout()
+
+    def test_bulk_update_points_order(self):
+        points = list(self.project1.points.order_by("order"))
+        data = {"project": self.project1.id,
+                "bulk_points": [[p.id, len(points) - i] for i, p in enumerate(points)]}
+
+        response = self.client.login(username=self.user1.username,
+                                     password=self.user1.username)
+        self.assertTrue(response)
+        response = self.client.post(reverse("points-bulk-update-order"), json.dumps(data),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(list(self.project1.points.order_by("order")), points[::-1])
+
+        data["bulk_points"] = [[points[0].id, "first"]]
+        response = self.client.post(reverse("points-bulk-update-order"), json.dumps(data),
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.client.logout()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+from django import test
+from django.db import connection
+
+from taiga.base.users.tests import create_user
+from taiga.base.utils.slug import reserve_refs
+from taiga.projects.issues.tests import create_issue
+from taiga.projects.services import points as points_service
+from taiga.projects.userstories.tests import create_userstory
+
+from . import create_project
+
+
+class ProjectUpdateRolePointsTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+        self.project1 = create_project(1, self.user1)
+        self.roles = self.project1.roles.filter(computable=True)
+        self.userstory1 = create_userstory(1, self.user1, self.project1)
+        self.userstory2 = create_userstory(2, self.user1, self.project1)
+
+    def _get_role_ids(self, user_story):
+        return sorted(user_story.role_points.values_list("role", flat=True))
+
+    def test_user_stories_have_role_points_for_computable_roles(self):
+        role_ids = sorted(self.roles.values_list("id", flat=True))
+        self.assertEqual(self._get_role_ids(self.userstory1), role_ids)
+        self.assertEqual(self._get_role_ids(self.userstory2), role_ids)
+
+    def test_update_role_points_removes_not_computable_roles(self):
+        points = self.project1.points.get(value=2)
+        points_service.set_role_points(self.userstory1.role_points.all(), points)
+
+        role = self.roles[0]
+        self.project1.roles.filter(id=role.id).update(computable=False)
+        self.project1.update_role_points()
+
+        self.assertNotIn(role.id, self._get_role_ids(self.userstory1))
+        self.assertNotIn(role.id, self._get_role_ids(self.userstory2))
+
+        # The points of the removed role points are subtracted.
+        project = self.project1.__class__.objects.get(id=self.project1.id)
+        self.assertNotIn(role.id, project.defined_points)
+        self.assertEqual(sum(project.defined_points.values()), 2 * (self.roles.count()))
+
+    def test_update_role_points_of_some_user_stories(self):
+        self.userstory1.role_points.all().delete()
+        self.userstory2.role_points.all().delete()
+
+        with self.assertNumQueries(3):
+            self.project1.update_role_points(user_stories=[self.userstory1])
+
+        self.assertEqual(len(self._get_role_ids(self.userstory1)), self.roles.count())
+        self.assertEqual(self._get_role_ids(self.userstory2), [])
+
+
+class RoleSlugTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+        self.project1 = create_project(1, self.user1)
+
+    def test_role_slugs_are_unique_for_each_project(self):
+        project2 = create_project(2, self.user1)
+        # Both projects have an "ux" role
+        role1 = self.project1.roles.create(name="UX")
+        role2 = project2.roles.create(name="UX")
+        self.assertEqual(role1.slug, "ux-1")
+        self.assertEqual(role2.slug, "ux-1")
+
+
+class ProjectRefsTestCase(test.TransactionTestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+        self.project1 = create_project(1, self.user1)
+
+    def test_refs_are_consecutive(self):
+        issue1 = create_issue(1, self.user1, self.project1)
+        self.assertEqual(list(reserve_refs(self.project1, "last_issue_ref", 3)),
+                         [issue1.ref + 1, issue1.ref + 2, issue1.ref + 3])
+
+        issue2 = create_issue(2, self.user1, self.project1)
+        self.assertEqual(issue2.ref, issue1.ref + 4)
+        self.assertEqual(self.project1.__class__.objects.get(id=self.project1.id).last_issue_ref,
+                         issue2.ref)
+
+    def test_project_saves_dont_change_the_refs_counters(self):
+        project = self.project1.__class__.objects.get(id=self.project1.id)
+        issue1 = create_issue(1, self.user1, self.project1)
+
+        project.name = "Changed"
+        project.save()
+
+        issue2 = create_issue(2, self.user1, self.project1)
+        self.assertEqual(issue2.ref, issue1.ref + 1)
+        self.assertEqual(self.project1.__class__.objects.get(id=self.project1.id).name, "Changed")
+
+    def test_concurrent_reservations_never_get_the_same_ref(self):
+        reserved, errors = [], []
+
+        def _reserve(thread_number):
+            try:
+                for i in range(25):
+                    reserved.extend(reserve_refs(self.project1, "last_us_ref",
+                                                 1 + (thread_number + i) % 5))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                # Each thread has its own connection
+                connection.close()
+
+        threads = [threading.Thread(target=_reserve, args=(n,)) for n in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(reserved), list(range(1, len(reserved) + 1)))
+        self.assertEqual(self.project1.__class__.objects.get(id=self.project1.id).last_us_ref,
+                         len(reserved))
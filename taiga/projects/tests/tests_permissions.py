@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import patch
+
+from django import test
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test.utils import override_settings
+
+from taiga.base.permissions import has_project_perm
+from taiga.base.users.tests import create_user
+
+from . import create_project
+from . import add_membership
+
+
+class ProjectPermissionsTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+        self.user2 = create_user(2) # Project member
+        self.project1 = create_project(1, self.user1)
+        self.membership = add_membership(self.project1, self.user2)
+        cache.clear()
+
+    def test_has_project_perm(self):
+        self.assertTrue(has_project_perm(self.user2, self.project1, "add_issue"))
+        self.assertFalse(has_project_perm(self.user2, self.project1, "delete_project"))
+        self.assertFalse(has_project_perm(self.user1, self.project1, "add_issue"))
+
+    def test_project_perms_are_memoized_for_each_user_instance(self):
+        with self.assertNumQueries(1):
+            has_project_perm(self.user2, self.project1, "add_issue")
+            has_project_perm(self.user2, self.project1, "view_issue")
+            has_project_perm(self.user2, self.project1.id, "delete_issue")
+
+    # The local cache of the tests is only used by one process
+    @patch("taiga.base.utils.cache.LOCAL_CACHE_BACKENDS", ())
+    @override_settings(PROJECT_PERMISSIONS_CACHE_TIMEOUT=60)
+    def test_cached_project_perms_are_invalidated(self):
+        user2 = self.user2.__class__.objects.get(id=self.user2.id)
+        self.assertTrue(has_project_perm(user2, self.project1, "add_issue"))
+
+        user2 = self.user2.__class__.objects.get(id=self.user2.id)
+        with self.assertNumQueries(0):
+            self.assertTrue(has_project_perm(user2, self.project1, "add_issue"))
+
+        self.membership.role.permissions.remove(
+            self.membership.role.permissions.get(codename="add_issue"))
+
+        user2 = self.user2.__class__.objects.get(id=self.user2.id)
+        self.assertFalse(has_project_perm(user2, self.project1, "add_issue"))
+
+        self.membership.delete()
+        user2 = self.user2.__class__.objects.get(id=self.user2.id)
+        self.assertFalse(has_project_perm(user2, self.project1, "view_issue"))
+
+    @patch("taiga.base.utils.cache.LOCAL_CACHE_BACKENDS", ())
+    @override_settings(PROJECT_PERMISSIONS_CACHE_TIMEOUT=60)
+    def test_cached_project_perms_are_invalidated_on_membership_user_change(self):
+        user3 = create_user(3)
+        user2 = self.user2.__class__.objects.get(id=self.user2.id)
+        self.assertTrue(has_project_perm(user2, self.project1, "add_issue"))
+
+        self.membership.user = user3
+        self.membership.save()
+
+        user2 = self.user2.__class__.objects.get(id=self.user2.id)
+        self.assertFalse(has_project_perm(user2, self.project1, "add_issue"))
+        self.assertTrue(has_project_perm(user3, self.project1, "add_issue"))
+
+    @override_settings(PROJECT_PERMISSIONS_CACHE_TIMEOUT=60)
+    def test_project_perms_cache_needs_a_shared_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            has_project_perm(self.user2, self.project1, "add_issue")
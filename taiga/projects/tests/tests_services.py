@@ -0,0 +1,530 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import patch
+
+from django import test
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+
+from taiga.base.models import get_stored_values
+from taiga.base.users.tests import create_user
+from taiga.projects.issues.tests import create_issue
+from taiga.projects.milestones.tests import create_milestone
+from taiga.projects.userstories.tests import create_userstory
+
+from . import create_project
+from .. import choices
+from .. import models
+from .. import services
+from ..services import lookups
+from ..services import points as points_service
+from ..services import tags as tags_service
+
+
+class ProjectIssuesStatsTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+        self.project1 = create_project(1, self.user1)
+
+    def test_issues_stats_without_issues(self):
+        stats = services.get_stats_for_project_issues(self.project1)
+
+        self.assertEqual(stats["total_issues"], 0)
+        self.assertEqual(stats["issues_per_status"], {})
+        self.assertEqual(stats["last_four_weeks_days"]["by_open_closed"]["open"], [0] * 28)
+        self.assertEqual(stats["last_four_weeks_days"]["by_open_closed"]["closed"], [0] * 28)
+
+    def test_issues_stats(self):
+        issue1 = create_issue(1, self.user1, self.project1)
+        issue2 = create_issue(2, self.user1, self.project1)
+        issue2.assigned_to = self.user1
+        issue2.save()
+
+        stats = services.get_stats_for_project_issues(self.project1)
+
+        self.assertEqual(stats["total_issues"], 2)
+        self.assertEqual(stats["opened_issues"] + stats["closed_issues"], 2)
+        self.assertEqual(stats["issues_per_status"][issue1.status_id]["count"], 2)
+        self.assertEqual(stats["issues_per_severity"][issue1.severity_id]["count"], 2)
+        self.assertEqual(stats["issues_per_owner"][self.user1.id]["count"], 2)
+        self.assertEqual(stats["issues_per_assigned_to"][0]["count"], 1)
+        self.assertEqual(stats["issues_per_assigned_to"][self.user1.id]["count"], 1)
+
+        last_four_weeks_days = stats["last_four_weeks_days"]
+        self.assertEqual(last_four_weeks_days["by_open_closed"]["open"][-1], 2)
+        self.assertEqual(len(last_four_weeks_days["by_open_closed"]["open"]), 28)
+        self.assertNotIn("count", last_four_weeks_days["by_severity"][issue1.severity_id])
+        self.assertEqual(last_four_weeks_days["by_severity"][issue1.severity_id]["data"][-1],
+                         stats["opened_issues"])
+        self.assertEqual(last_four_weeks_days["by_priority"][issue1.priority_id]["data"][-1],
+                         stats["opened_issues"])
+
+    def test_issues_stats_query_budget(self):
+        for x in range(10):
+            create_issue(x, self.user1, self.project1)
+
+        # Grouped counts, four lookup tables, users and the per day histogram.
+        with self.assertNumQueries(7):
+            services.get_stats_for_project_issues(self.project1)
+
+
+class ProjectPointsTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+        self.project1 = create_project(1, self.user1)
+        self.milestone1 = create_milestone(1, self.user1, self.project1)
+        self.points = self.project1.points.get(value=2)
+
+    def _set_points(self, user_story):
+        for role_points in user_story.role_points.all():
+            role_points.points = self.points
+            role_points.save()
+
+    def _reload(self, obj):
+        return obj.__class__.objects.get(pk=obj.pk)
+
+    def test_stored_points_follow_role_points_and_user_stories(self):
+        userstory1 = create_userstory(1, self.user1, self.project1, self.milestone1)
+        userstory2 = create_userstory(2, self.user1, self.project1)
+        self._set_points(userstory1)
+        self._set_points(userstory2)
+
+        roles_count = userstory1.role_points.count()
+        project = self._reload(self.project1)
+        self.assertEqual(sum(project.defined_points.values()), 4 * roles_count)
+        self.assertEqual(sum(project.assigned_points.values()), 2 * roles_count)
+        self.assertEqual(sum(project.closed_points.values()), 0)
+        self.assertEqual(self._reload(userstory1).get_total_points(), 2 * roles_count)
+
+        userstory1 = self._reload(userstory1)
+        userstory1.is_closed = True
+        userstory1.save()
+        userstory2 = self._reload(userstory2)
+        userstory2.milestone = self.milestone1
+        userstory2.save()
+
+        milestone = self._reload(self.milestone1)
+        self.assertEqual(sum(milestone.total_points.values()), 4 * roles_count)
+        self.assertEqual(sum(milestone.closed_points.values()), 2 * roles_count)
+
+        userstory2.delete()
+        self.assertEqual(sum(self._reload(self.milestone1).total_points.values()),
+                         2 * roles_count)
+        self.assertEqual(sum(self._reload(self.project1).defined_points.values()),
+                         2 * roles_count)
+
+    def test_stored_points_follow_points_value(self):
+        userstory1 = create_userstory(1, self.user1, self.project1, self.milestone1)
+        self._set_points(userstory1)
+
+        self.points.value = 5
+        self.points.save()
+
+        roles_count = userstory1.role_points.count()
+        self.assertEqual(self._reload(userstory1).get_total_points(), 5 * roles_count)
+        self.assertEqual(sum(self._reload(self.project1).assigned_points.values()),
+                         5 * roles_count)
+
+    def test_role_points_changes_are_incremental(self):
+        userstory1 = create_userstory(1, self.user1, self.project1, self.milestone1)
+        self._set_points(userstory1)
+        role_points = userstory1.role_points.all()[0]
+
+        def count_queries(points):
+            role_points.points = points
+            with CaptureQueriesContext(connection) as context:
+                role_points.save()
+            return len(context.captured_queries)
+
+        queries_count = count_queries(self.project1.points.get(value=1))
+        for i in range(2, 12):
+            userstory = create_userstory(i, self.user1, self.project1, self.milestone1)
+            self._set_points(userstory)
+
+        self.assertEqual(count_queries(self.points), queries_count)
+
+        roles_count = userstory1.role_points.count()
+        self.assertEqual(sum(self._reload(self.project1).defined_points.values()),
+                         22 * roles_count)
+
+    def test_set_role_points_updates_the_stored_points(self):
+        userstory1 = create_userstory(1, self.user1, self.project1, self.milestone1)
+        userstory2 = create_userstory(2, self.user1, self.project1)
+        role_points = userstory1.role_points.all() | userstory2.role_points.all()
+        points_service.set_role_points(role_points, self.points)
+
+        roles_count = userstory1.role_points.count()
+        project = self._reload(self.project1)
+        self.assertEqual(sum(project.defined_points.values()), 4 * roles_count)
+        self.assertEqual(sum(project.assigned_points.values()), 2 * roles_count)
+        self.assertEqual(points_service.get_stored_project_points(self.project1.id),
+                         points_service.get_project_points(self.project1.id))
+
+    def test_stored_points_follow_milestone_delete(self):
+        userstory1 = create_userstory(1, self.user1, self.project1, self.milestone1)
+        self._set_points(userstory1)
+
+        self.milestone1.delete()
+
+        roles_count = userstory1.role_points.count()
+        project = self._reload(self.project1)
+        self.assertEqual(sum(project.defined_points.values()), 2 * roles_count)
+        self.assertEqual(project.assigned_points, {})
+
+    def test_project_saves_keep_the_stored_points(self):
+        userstory1 = create_userstory(1, self.user1, self.project1, self.milestone1)
+        project = self._reload(self.project1)
+        self._set_points(userstory1)
+
+        # An outdated project instance
+        project.save()
+
+        roles_count = userstory1.role_points.count()
+        self.assertEqual(sum(self._reload(project).assigned_points.values()), 2 * roles_count)
+
+    def test_update_project_points_repairs_wrong_points(self):
+        userstory1 = create_userstory(1, self.user1, self.project1, self.milestone1)
+        self._set_points(userstory1)
+        self.project1.points_per_role.update(defined_points=0)
+
+        points = points_service.get_project_points(self.project1.id)
+        self.assertNotEqual(points_service.get_stored_project_points(self.project1.id), points)
+
+        points_service.update_project_points(self.project1.id)
+        self.assertEqual(points_service.get_stored_project_points(self.project1.id), points)
+        self.assertEqual(points_service.get_stored_milestone_points(self.milestone1.id),
+                         points_service.get_milestone_points(self.milestone1.id))
+
+
+class ProjectTagsTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+        self.project1 = create_project(1, self.user1)
+
+        issue1 = create_issue(1, self.user1, self.project1)
+        issue1.tags = ["Back", "front"]
+        issue1.save()
+        self.issue2 = create_issue(2, self.user1, self.project1)
+        self.issue2.tags = ["back"]
+        self.issue2.save()
+
+        userstory1 = create_userstory(1, self.user1, self.project1)
+        userstory1.tags = ["design"]
+        userstory1.save()
+
+    def test_get_all_tags(self):
+        self.assertEqual(services.get_all_tags(self.project1), ["back", "design", "front"])
+
+    def test_tags_field_parses_strings(self):
+        field = self.project1._meta.get_field("tags")
+        self.assertEqual(field.to_python('["back", "front"]'), ["back", "front"])
+        self.assertEqual(field.to_python("back, front"), ["back", "front"])
+        self.assertEqual(field.to_python("2014"), ["2014"])
+        self.assertEqual(field.to_python('"back"'), ['"back"'])
+        self.assertEqual(field.to_python(""), [])
+
+    def test_get_issues_filters_tags(self):
+        tags = services.get_issues_filters_data(self.project1)["tags"]
+        self.assertEqual(tags, [("back", 2), ("front", 1)])
+
+    def test_tags_dictionary_is_updated_on_changes(self):
+        issue = self.issue2
+        issue.tags = ["Design"]
+        issue.save()
+        self.assertEqual(services.get_issues_filters_data(self.project1)["tags"],
+                         [("back", 1), ("design", 1), ("front", 1)])
+
+        issue.delete()
+        self.assertEqual(services.get_all_tags(self.project1), ["back", "design", "front"])
+        self.assertEqual(services.get_issues_filters_data(self.project1)["tags"],
+                         [("back", 1), ("front", 1)])
+
+    def test_stored_values_are_fetched_once_on_save(self):
+        issue = self.issue2.__class__.objects.get(id=self.issue2.id)
+        for tags in (["design"], ["front"]):
+            issue.tags = tags
+            with CaptureQueriesContext(connection) as context:
+                issue.save()
+
+            selects = [query for query in context.captured_queries
+                           if query["sql"].startswith("SELECT") and
+                              'FROM "issues_issue"' in query["sql"]]
+            self.assertEqual(len(selects), 1)
+
+        self.assertEqual(services.get_issues_filters_data(self.project1)["tags"],
+                         [("back", 1), ("front", 2)])
+
+    def test_stored_values_are_not_kept_between_saves(self):
+        issue = self.issue2.__class__.objects.get(id=self.issue2.id)
+        get_stored_values(issue) # As if a save failed after its pre_save handlers
+
+        other_issue = self.issue2.__class__.objects.get(id=self.issue2.id)
+        other_issue.tags = ["design"]
+        other_issue.save()
+
+        issue.tags = ["front"]
+        issue.save()
+        self.assertEqual(dict(tags_service.get_tags(self.project1)),
+                         {"back": 1, "design": 1, "front": 2})
+
+    def test_rebuild_tags_dictionary(self):
+        tags = tags_service.get_tags(self.project1)
+        tags_service.rebuild_tags_dictionary(self.project1)
+        self.assertEqual(tags_service.get_tags(self.project1), tags)
+
+
+class ProjectIssuesFiltersDataTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+        self.project1 = create_project(1, self.user1)
+        self.severity1, self.severity2 = self.project1.severities.all()[:2]
+
+        for x, severity in enumerate([self.severity1, self.severity1, self.severity2]):
+            issue = create_issue(x, self.user1, self.project1)
+            issue.severity = severity
+            issue.tags = ["back"] if x else ["front"]
+            issue.save()
+
+    def _get_counts(self, data, facet):
+        return dict(data[facet])
+
+    def test_filters_data_without_filters(self):
+        with self.assertNumQueries(2):
+            data = services.get_issues_filters_data(self.project1)
+
+        self.assertEqual(self._get_counts(data, "severities")[self.severity1.id], 2)
+        self.assertEqual(self._get_counts(data, "severities")[self.severity2.id], 1)
+        self.assertEqual(data["tags"], [("back", 2), ("front", 1)])
+        self.assertEqual(self._get_counts(data, "assigned_to")[None], 3)
+        self.assertEqual([x[0] for x in data["severities"]],
+                         list(self.project1.severities.order_by("order", "id")
+                                                       .values_list("id", flat=True)))
+
+    def test_filters_data_with_filters(self):
+        data = services.get_issues_filters_data(self.project1, {"tags": ["back"]})
+
+        # The counts of a facet don't apply its own filter.
+        self.assertEqual(data["tags"], [("back", 2), ("front", 1)])
+        self.assertEqual(self._get_counts(data, "severities")[self.severity1.id], 1)
+        self.assertEqual(self._get_counts(data, "severities")[self.severity2.id], 1)
+
+        data = services.get_issues_filters_data(self.project1, {"tags": ["back"],
+                                                                "severity": [self.severity2.id]})
+        self.assertEqual(data["tags"], [("back", 1)])
+        self.assertEqual(self._get_counts(data, "severities")[self.severity1.id], 1)
+
+    def test_filters_data_tags_apply_the_other_filters(self):
+        data = services.get_issues_filters_data(self.project1, {"assigned_to": [None]})
+        self.assertEqual(data["tags"], [("back", 2), ("front", 1)])
+
+        data = services.get_issues_filters_data(self.project1, {"assigned_to": [self.user1.id]})
+        self.assertEqual(data["tags"], [])
+        self.assertEqual(self._get_counts(data, "assigned_to")[None], 3)
+
+        data = services.get_issues_filters_data(self.project1, {"tags": ["front"],
+                                                                "severity": [self.severity1.id]})
+        self.assertEqual(data["tags"], [("back", 1), ("front", 1)])
+        self.assertEqual(self._get_counts(data, "severities")[self.severity1.id], 1)
+        self.assertEqual(self._get_counts(data, "severities")[self.severity2.id], 0)
+
+
+class ProjectBulkUpdateOrderTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+        self.project1 = create_project(1, self.user1)
+        self.project2 = create_project(2, self.user1)
+
+    def _get_orders(self, project):
+        return dict(project.issue_statuses.values_list("id", "order"))
+
+    def test_bulk_update_order(self):
+        orders = self._get_orders(self.project1)
+        new_orders = {id: order + 10 for id, order in orders.items()}
+
+        with self.assertNumQueries(1):
+            count = services.bulk_update_order(models.IssueStatus, self.project1,
+                                               list(new_orders.items()))
+        self.assertEqual(count, len(orders))
+        self.assertEqual(self._get_orders(self.project1), new_orders)
+
+        # The second time in the same connection, only the changed ones
+        id = list(orders)[0]
+        count = services.bulk_update_order(models.IssueStatus, self.project1,
+                                           [[id, 1000]] + list(new_orders.items())[1:])
+        self.assertEqual(count, 1)
+        self.assertEqual(self._get_orders(self.project1)[id], 1000)
+
+    def test_bulk_update_order_of_other_project_objects(self):
+        orders = self._get_orders(self.project2)
+        count = services.bulk_update_order(models.IssueStatus, self.project1,
+                                           [[id, 1000] for id in orders])
+        self.assertEqual(count, 0)
+        self.assertEqual(self._get_orders(self.project2), orders)
+
+    def test_bulk_update_order_with_invalid_data(self):
+        with self.assertRaises(ValueError):
+            services.bulk_update_order(models.IssueStatus, self.project1, [[1, "first"]])
+        with self.assertRaises(ValueError):
+            services.bulk_update_order(models.IssueStatus, self.project1, [1, 2])
+        self.assertEqual(services.bulk_update_order(models.IssueStatus, self.project1, []), 0)
+
+
+# The local cache of the tests is only used by one process
+@patch("taiga.base.utils.cache.LOCAL_CACHE_BACKENDS", ())
+@override_settings(PROJECT_LOOKUPS_CACHE_TIMEOUT=60)
+class ProjectLookupsTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        lookups.clear_lookups()
+        self.user1 = create_user(1) # Project owner
+        self.project1 = create_project(1, self.user1)
+        self.project2 = create_project(2, self.user1)
+
+    def test_get_lookups(self):
+        statuses = list(self.project1.issue_statuses.all())
+
+        self.assertEqual(lookups.get_lookups(models.IssueStatus, self.project1.id), statuses)
+        with self.assertNumQueries(0):
+            self.assertEqual(lookups.get_lookups(models.IssueStatus, self.project1.id), statuses)
+            self.assertEqual(lookups.get_lookup(models.IssueStatus, self.project1.id,
+                                                statuses[1].id), statuses[1])
+
+    def test_get_lookup_of_other_project(self):
+        status = self.project2.issue_statuses.all()[0]
+        self.assertIsNone(lookups.get_lookup(models.IssueStatus, self.project1.id, status.id))
+        self.assertIsNone(lookups.get_lookup(models.IssueStatus, self.project1.id, None))
+
+    def test_lookups_are_invalidated_on_change(self):
+        status = lookups.get_lookups(models.IssueStatus, self.project1.id)[0]
+
+        status = models.IssueStatus.objects.get(id=status.id)
+        status.is_closed = not status.is_closed
+        status.save()
+        cached_status = lookups.get_lookup(models.IssueStatus, self.project1.id, status.id)
+        self.assertEqual(cached_status.is_closed, status.is_closed)
+
+        status_id = status.id
+        status.delete()
+        self.assertIsNone(lookups.get_lookup(models.IssueStatus, self.project1.id, status_id))
+
+    def test_lookups_are_invalidated_on_bulk_update_order(self):
+        statuses = lookups.get_lookups(models.IssueStatus, self.project1.id)
+        services.bulk_update_order(models.IssueStatus, self.project1,
+                                   [[status.id, -i] for i, status in enumerate(statuses)])
+        self.assertEqual(lookups.get_lookups(models.IssueStatus, self.project1.id),
+                         statuses[::-1])
+
+    def test_new_lookups_are_found(self):
+        lookups.get_lookups(models.Severity, self.project1.id)
+
+        # Without the signals that invalidate the cache (as if it
+        # were created by another process before the invalidation)
+        models.Severity.objects.bulk_create([models.Severity(name="Blocker",
+                                                             project=self.project1)])
+        severity = models.Severity.objects.get(project=self.project1, name="Blocker")
+
+        self.assertEqual(lookups.get_lookup(models.Severity, self.project1.id, severity.id),
+                         severity)
+
+    def test_issue_is_closed_without_queries(self):
+        issue = create_issue(1, self.user1, self.project1)
+        issue.status = self.project1.issue_statuses.get(order=4)
+        issue.save()
+
+        issue = issue.__class__.objects.get(id=issue.id)
+        lookups.get_lookups(models.IssueStatus, self.project1.id)
+        with self.assertNumQueries(0):
+            self.assertTrue(issue.is_closed)
+
+    def test_deleted_lookups_are_not_project_lookups(self):
+        status = self.project1.issue_statuses.get(order=4)
+        issue = create_issue(1, self.user1, self.project1, save=False)
+        issue.status = status
+        self.assertTrue(lookups.is_project_lookup(issue, "status"))
+
+        # Without the signals that invalidate the cache (as if it
+        # were deleted by another process)
+        lookups.get_lookups(models.IssueStatus, self.project1.id)
+        connection.cursor().execute("DELETE FROM {0} WHERE id = %s"
+                                        .format(models.IssueStatus._meta.db_table), [status.id])
+        self.assertFalse(lookups.is_project_lookup(issue, "status"))
+
+    def test_lookups_cache_needs_a_shared_cache(self):
+        with patch("taiga.base.utils.cache.LOCAL_CACHE_BACKENDS",
+                   ("django.core.cache.backends.locmem.LocMemCache",)):
+            with self.assertRaises(ImproperlyConfigured):
+                lookups.get_lookups(models.IssueStatus, self.project1.id)
+
+    def test_issue_is_closed_without_the_cache(self):
+        issue = create_issue(1, self.user1, self.project1)
+        issue = issue.__class__.objects.get(id=issue.id)
+
+        with override_settings(PROJECT_LOOKUPS_CACHE_TIMEOUT=None):
+            with self.assertNumQueries(1):
+                issue.is_closed
+                issue.is_closed
+
+
+class ProjectBootstrapTestCase(test.TestCase):
+    fixtures = ["initial_domains.json"]
+
+    def setUp(self):
+        self.user1 = create_user(1) # Project owner
+
+    def _create_projects_without_default_data(self, ids):
+        projects = []
+        for id in ids:
+            project = create_project(id, self.user1, save=False)
+            project._skip_default_data = True
+            project.save()
+            projects.append(project)
+        return projects
+
+    def test_new_projects_have_default_data(self):
+        project = models.Project.objects.get(id=create_project(1, self.user1).id)
+
+        self.assertEqual(project.points.count(), len(choices.POINTS_CHOICES))
+        self.assertEqual(project.issue_statuses.count(), len(choices.ISSUE_STATUSES))
+        self.assertEqual(project.default_us_status.name, "Open")
+        self.assertEqual(project.default_severity.name, "Normal")
+        self.assertEqual(project.roles.count(), len(choices.ROLES))
+
+        role = project.roles.get(slug="ux")
+        self.assertTrue(role.permissions.filter(codename="add_issue").exists())
+
+    def test_default_data_queries_dont_depend_on_the_number_of_projects(self):
+        project1, = self._create_projects_without_default_data([1])
+        project2, project3, project4 = self._create_projects_without_default_data([2, 3, 4])
+
+        with CaptureQueriesContext(connection) as one_project:
+            services.create_default_data([project1])
+        with CaptureQueriesContext(connection) as three_projects:
+            services.create_default_data([project2, project3, project4])
+
+        # Only the update of the project defaults
+        self.assertEqual(len(three_projects), len(one_project) + 2)
+        self.assertEqual(project1.roles.count(), project4.roles.count())
+
+    def test_bulk_create_projects(self):
+        projects = [create_project(id, self.user1, save=False) for id in range(1, 4)]
+        services.bulk_create_projects(projects)
+
+        for project in projects:
+            self.assertFalse(hasattr(project, "_skip_default_data"))
+
+            project = models.Project.objects.get(id=project.id)
+            self.assertEqual(project.default_task_status.name, "New")
+            self.assertEqual(project.roles.count(), len(choices.ROLES))
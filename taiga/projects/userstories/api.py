@@ -20,6 +20,7 @@ from taiga.base.notifications.api import NotificationSenderMixin
 from taiga.projects.permissions import AttachmentPermission
 from taiga.projects.serializers import AttachmentSerializer
 from taiga.projects.models import Attachment, Project
+from taiga.projects.services import lookups
 
 from . import models
 from . import permissions
@@ -69,6 +70,7 @@ class UserStoryViewSet(NeighborsApiMixin, NotificationSenderMixin, ModelCrudView
     create_notification_template = "create_userstory_notification"
     update_notification_template = "update_userstory_notification"
     destroy_notification_template = "destroy_userstory_notification"
+    bulk_create_notification_template = "bulk_create_userstories_notification"
 
     # Specific filter used for filtering neighbor user stories
     _neighbor_tags_filter = filters.TagsFilter('neighbor_tags')
@@ -90,7 +92,7 @@ class UserStoryViewSet(NeighborsApiMixin, NotificationSenderMixin, ModelCrudView
 
         service = services.UserStoriesService()
         service.bulk_insert(project, request.user, bulk_stories,
-                            callback_on_success=self._post_save_notification_sender)
+                            callback_on_success=self._bulk_create_notification_sender)
 
         return Response(data=None, status=status.HTTP_204_NO_CONTENT)
 
@@ -114,7 +116,10 @@ class UserStoryViewSet(NeighborsApiMixin, NotificationSenderMixin, ModelCrudView
             raise exc.PermissionDenied(_("You don't have permisions to create user stories."))
 
         service = services.UserStoriesService()
-        service.bulk_update_order(project, request.user, bulk_stories)
+        try:
+            service.bulk_update_order(project, request.user, bulk_stories)
+        except ValueError:
+            raise exc.BadRequest(_("bulkStories parameter is not valid"))
 
         return Response(data=None, status=status.HTTP_204_NO_CONTENT)
 
@@ -147,7 +152,7 @@ class UserStoryViewSet(NeighborsApiMixin, NotificationSenderMixin, ModelCrudView
         if obj.milestone and obj.milestone.project != obj.project:
             raise exc.PermissionDenied(_("You don't have permissions for add/modify this user story"))
 
-        if obj.status and obj.status.project != obj.project:
+        if not lookups.is_project_lookup(obj, "status"):
             raise exc.PermissionDenied(_("You don't have permissions for add/modify this user story"))
 
     def post_save(self, obj, created=False):
@@ -6,11 +6,12 @@ from django.conf import settings
 from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
 
-from picklefield.fields import PickledObjectField
 import reversion
 
+from taiga.base.fields import TagsField
 from taiga.base.models import NeighborsMixin
-from taiga.base.utils.slug import ref_uniquely
+from taiga.base.models import get_stored_values
+from taiga.base.utils.slug import next_ref
 from taiga.base.notifications.models import WatchedMixin
 from taiga.projects.mixins.blocked.models import BlockedMixin
 
@@ -77,8 +78,7 @@ class UserStory(NeighborsMixin, WatchedMixin, BlockedMixin, models.Model):
                                              verbose_name=_("is client requirement"))
     team_requirement = models.BooleanField(default=False, null=False, blank=True,
                                            verbose_name=_("is team requirement"))
-    tags = PickledObjectField(null=False, blank=True,
-                              verbose_name=_("tags"))
+    tags = TagsField(null=False, blank=True, verbose_name=_("tags"))
     attachments = generic.GenericRelation("projects.Attachment")
     generated_from_issue = models.ForeignKey("issues.Issue", null=True, blank=True,
                                              related_name="generated_user_stories",
@@ -116,16 +116,6 @@ class UserStory(NeighborsMixin, WatchedMixin, BlockedMixin, models.Model):
     def __repr__(self):
         return "<UserStory %s>" % (self.id)
 
-    def _get_prev_neighbor_filters(self, queryset):
-        conds = [{"order__lt": "{obj.order}"},
-                 {"order__lte": "{obj.order}", "ref__lt": "{obj.ref}"}]
-        return conds
-
-    def _get_next_neighbor_filters(self, queryset):
-        conds = [{"order__gt": "{obj.order}"},
-                 {"order__gte": "{obj.order}", "ref__gt": "{obj.ref}"}]
-        return conds
-
     def get_role_points(self):
         return self.role_points
 
@@ -171,13 +161,13 @@ reversion.register(UserStory)
 @receiver(models.signals.pre_save, sender=UserStory, dispatch_uid="user_story_ref_handler")
 def us_ref_handler(sender, instance, **kwargs):
     if not instance.id and instance.project:
-        instance.ref = ref_uniquely(instance.project, "last_us_ref", instance.__class__)
+        instance.ref = next_ref(instance.project, "last_us_ref")
 
 
 @receiver(models.signals.post_save, sender=UserStory,
           dispatch_uid="user_story_create_role_points_handler")
 def us_create_role_points_handler(sender, instance, **kwargs):
-    instance.project.update_role_points()
+    instance.project.update_role_points(user_stories=[instance])
 
 
 @receiver(models.signals.post_save, sender=UserStory,
@@ -189,5 +179,64 @@ def us_task_reassignation(sender, instance, created, **kwargs):
 
 @receiver(models.signals.pre_save, sender=UserStory, dispatch_uid="us-tags-normalization")
 def us_tags_normalization(sender, instance, **kwargs):
+    from taiga.projects.services import tags as tags_service
+
     if isinstance(instance.tags, (list, tuple)):
         instance.tags = list(map(lambda x: x.lower(), instance.tags))
+
+    tags_service.update_tags_dictionary_on_save(instance, "userstory")
+
+
+@receiver(models.signals.post_delete, sender=UserStory, dispatch_uid="us-tags-dictionary-delete")
+def us_tags_dictionary_delete(sender, instance, **kwargs):
+    from taiga.projects.services import tags as tags_service
+
+    tags_service.update_tags_dictionary_on_delete(instance, "userstory")
+
+
+# Stored points per role handlers
+@receiver(models.signals.pre_save, sender=RolePoints,
+          dispatch_uid="role_points_pre_save_store_points")
+def role_points_store_previous_points(sender, instance, **kwargs):
+    stored_values = get_stored_values(instance)
+    instance._previous_points_id = stored_values and stored_values["points_id"]
+
+
+@receiver(models.signals.post_save, sender=RolePoints,
+          dispatch_uid="role_points_post_save_update_points")
+def role_points_update_points(sender, instance, **kwargs):
+    from taiga.projects.services import points as points_service
+
+    previous_points_id = getattr(instance, "_previous_points_id", None)
+    points_service.update_points_for_role_points_change(instance, previous_points_id)
+
+
+@receiver(models.signals.post_delete, sender=RolePoints,
+          dispatch_uid="role_points_post_delete_update_points")
+def role_points_delete_update_points(sender, instance, **kwargs):
+    from taiga.projects.services import points as points_service
+
+    points_service.update_points_for_role_points_delete([(instance.user_story_id,
+                                                          instance.role_id,
+                                                          instance.points_id)])
+
+
+@receiver(models.signals.pre_save, sender=UserStory,
+          dispatch_uid="user_story_pre_save_store_milestone")
+def us_store_previous_milestone(sender, instance, **kwargs):
+    stored_values = get_stored_values(instance)
+    instance._previous_milestone_id = stored_values and stored_values["milestone_id"]
+    instance._previous_is_closed = stored_values and stored_values["is_closed"]
+
+
+@receiver(models.signals.post_save, sender=UserStory,
+          dispatch_uid="user_story_post_save_update_points")
+def us_update_points(sender, instance, created, **kwargs):
+    from taiga.projects.services import points as points_service
+
+    # The role points of new user stories are created later
+    if created:
+        return
+
+    points_service.update_points_for_userstory_change(instance, instance._previous_milestone_id,
+                                                      instance._previous_is_closed)
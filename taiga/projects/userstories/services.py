@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
 from django.db import transaction
-from django.db import connection
+
+from taiga.projects.services.bulk_create import bulk_create_with_refs
+from taiga.projects.services.bulk_update_order import bulk_update_order
 
 from . import models
 import reversion
@@ -10,27 +12,31 @@ import reversion
 class UserStoriesService(object):
     @transaction.atomic
     def bulk_insert(self, project, user, data, callback_on_success=None):
+        """
+        Create a user story for each line of data with only one insert,
+        and return them. callback_on_success is called once, with the
+        list of created user stories.
+
+        The stored data is the same as the one of creating them one by
+        one: their role points are created here (once for all of them),
+        with undefined points, so the stored points don't change.
+        """
         items = filter(lambda s: len(s) > 0,
                     map(lambda s: s.strip(), data.split("\n")))
 
-        for item in items:
-            obj = models.UserStory.objects.create(subject=item, project=project, owner=user,
-                                                  status=project.default_us_status)
-            if callback_on_success:
-                callback_on_success(obj, True)
+        user_stories = [models.UserStory(subject=item, project=project, owner=user,
+                                         status=project.default_us_status)
+                        for item in items]
+        user_stories = bulk_create_with_refs(models.UserStory, project, "last_us_ref",
+                                             user_stories)
+        if not user_stories:
+            return []
 
-    @transaction.atomic
-    def bulk_update_order(self, project, user, data):
-        cursor = connection.cursor()
+        project.update_role_points(user_stories=user_stories)
 
-        sql = """
-        prepare bulk_update_order as update userstories_userstory set "order" = $1
-            where userstories_userstory.id = $2 and
-                  userstories_userstory.project_id = $3;
-        """
+        if callback_on_success:
+            callback_on_success(user_stories)
+        return user_stories
 
-        cursor.execute(sql)
-        for usid, usorder in data:
-            cursor.execute("EXECUTE bulk_update_order (%s, %s, %s);",
-                           (usorder, usid, project.id))
-        cursor.close()
+    def bulk_update_order(self, project, user, data):
+        return bulk_update_order(models.UserStory, project, data)
@@ -0,0 +1,3 @@
+ALTER TABLE userstories_userstory ADD COLUMN search_vector tsvector;
+CREATE INDEX userstories_userstory_search_vector_gin_index ON userstories_userstory USING gin (search_vector);
+CREATE TRIGGER userstories_userstory_search_vector_update BEFORE INSERT OR UPDATE OF subject, description ON userstories_userstory FOR EACH ROW EXECUTE PROCEDURE tsvector_update_trigger(search_vector, 'pg_catalog.simple', subject, description);
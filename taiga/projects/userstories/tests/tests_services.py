@@ -23,10 +23,33 @@ class UserStoriesServiceTestCase(test.TestCase):
         model = models.UserStory
         self.assertEqual(model.objects.count(), 0)
 
+        created = []
         service = services.UserStoriesService()
-        service.bulk_insert(self.project1, self.user1, "kk1\nkk2\n")
+        user_stories = service.bulk_insert(self.project1, self.user1, "kk1\nkk2\n",
+                                           callback_on_success=created.append)
 
         self.assertEqual(model.objects.count(), 2)
+        self.assertEqual(created, [user_stories])
+        self.assertEqual([us.subject for us in user_stories], ["kk1", "kk2"])
+        self.assertEqual(user_stories[1].ref, user_stories[0].ref + 1)
+
+    def test_bulk_insert_creates_the_same_data(self):
+        userstory1 = create_userstory(1, self.user1, self.project1)
+
+        service = services.UserStoriesService()
+        userstory2, = service.bulk_insert(self.project1, self.user1, "User Story 2")
+
+        roles = self.project1.roles.filter(computable=True)
+        for user_story in (userstory1, userstory2):
+            role_points = user_story.role_points.all()
+            self.assertEqual(sorted(role_points.values_list("role", flat=True)),
+                             sorted(roles.values_list("id", flat=True)))
+            self.assertTrue(all(rp.points.value is None for rp in role_points))
+
+        userstory1 = models.UserStory.objects.get(id=userstory1.id)
+        self.assertEqual(userstory2.ref, userstory1.ref + 1)
+        self.assertEqual(userstory2.status, userstory1.status)
+        self.assertEqual(userstory2.get_total_points(), userstory1.get_total_points())
 
     def test_bulk_order_update(self):
         userstory1 = create_userstory(1, self.user1, self.project1)
@@ -0,0 +1,3 @@
+ALTER TABLE wiki_wikipage ADD COLUMN search_vector tsvector;
+CREATE INDEX wiki_wikipage_search_vector_gin_index ON wiki_wikipage USING gin (search_vector);
+CREATE TRIGGER wiki_wikipage_search_vector_update BEFORE INSERT OR UPDATE OF slug, content ON wiki_wikipage FOR EACH ROW EXECUTE PROCEDURE tsvector_update_trigger(search_vector, 'pg_catalog.simple', slug, content);